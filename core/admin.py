@@ -1,16 +1,36 @@
 # core/admin.py
 from django.contrib import admin
+from django.db.models import Case, IntegerField, When
 from .models import Meeting, Task
+from . import search
 
-class MeetingAdmin(admin.ModelAdmin):
+
+class FullTextSearchMixin:
+    """Answer admin searches from the full-text index instead of LIKE scans."""
+    search_id_function = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not self.search_id_function:
+            return super().get_search_results(request, queryset, search_term)
+        ids = self.search_id_function(search_term)
+        if not ids:
+            return queryset.none(), False
+        # Best match first; the changelist keeps this ordering unless a column is sorted
+        rank = Case(*[When(id=pk, then=position) for position, pk in enumerate(ids)], output_field=IntegerField())
+        return queryset.filter(id__in=ids).order_by(rank), False
+
+
+class MeetingAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'status', 'created_at', 'user']
     list_filter = ['status', 'created_at']
     search_fields = ['title']
+    search_id_function = staticmethod(search.search_meeting_ids)
 
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['description', 'assignee', 'status', 'meeting']
     list_filter = ['status']  # Removed 'deadline' since it doesn't exist
     search_fields = ['description', 'assignee']
+    search_id_function = staticmethod(search.search_task_ids)
 
 admin.site.register(Meeting, MeetingAdmin)
 admin.site.register(Task, TaskAdmin)
@@ -4,12 +4,56 @@
 
 import os
 import re
+import hashlib
 import logging
 
 from . import hf_client
+from . import extractive
+from . import coreference
+from .conf import get_setting
+from .progress import NullProgress
 
 logger = logging.getLogger(__name__)
 
+# Bump when extract_action_items changes, so reprocessing re-runs it (core.reprocess)
+EXTRACTOR_VERSION = 3
+
+_SENTENCE_BREAK = r'(?<=[.!?])(?<!\bMr\.)(?<!\bMs\.)(?<!\bMx\.)(?<!\bDr\.)(?<!\bMrs\.)\s+|\n+'
+
+
+def chunk_fingerprint(text, max_length, min_length):
+    """Content hash of one BART call: model, length parameters and input text."""
+    key = f"{hf_client.MODELS['summarizer']}\0{max_length}\0{min_length}\0{text}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class SummaryChunkCache:
+    """
+    BART outputs keyed by chunk_fingerprint. `entries` are results from an
+    earlier run; `used` collects what this run needed (reused or new), which
+    is what gets stored for the next one. `fell_back` is set when BART
+    failed and generate_summary returned its extractive fallback instead.
+    """
+
+    def __init__(self, entries=None):
+        self.entries = dict(entries or {})
+        self.used = {}
+        self.hits = 0
+        self.misses = 0
+        self.fell_back = False
+
+    def summarize(self, text, max_length=150, min_length=30):
+        key = chunk_fingerprint(text, max_length, min_length)
+        if key in self.entries:
+            self.hits += 1
+            summary = self.entries[key]
+        else:
+            self.misses += 1
+            summary = hf_client.summarize_text(text, max_length=max_length, min_length=min_length)
+        if summary.strip():
+            self.used[key] = summary
+        return summary
+
 
 class MeetingAIProcessor:
     def __init__(self):
@@ -17,29 +61,59 @@ class MeetingAIProcessor:
         # No local models to load — all inference happens via API
         logger.info("AI Processor ready. Models will be called via HuggingFace API.")
 
-    def convert_audio_to_text(self, audio_path):
+    def convert_audio_to_text(self, audio_path, with_segments=False):
         try:
             logger.info("Converting audio file into text...")
-            transcript = hf_client.transcribe_audio(audio_path)
+            if with_segments:
+                transcript, segments = hf_client.transcribe_audio(audio_path, return_segments=True)
+            else:
+                transcript, segments = hf_client.transcribe_audio(audio_path), []
             if transcript:
                 logger.info("Audio converted successfully.")
-                return transcript.strip()
-            return None
+                return (transcript.strip(), segments) if with_segments else transcript.strip()
+            return (None, []) if with_segments else None
         except Exception as e:
             logger.error(f"Error in audio conversion: {str(e)}")
-            return None
+            return (None, []) if with_segments else None
 
-    def generate_summary(self, text):
+    def generate_summary(self, text, progress=None, chunk_cache=None):
+        """
+        Summarize `text` according to settings.SUMMARY_MODE:
+
+        - "hybrid" (default): long texts are first shrunk locally by the
+          extractive stage (SUMMARY_EXTRACTIVE_RATIO of the words), then
+          summarized by BART — fewer API calls for the same meeting.
+        - "abstractive": send every word to BART (previous behaviour).
+        - "extractive": fully offline; no API calls.
+
+        If the BART API fails, an extractive summary is returned instead
+        (and chunk_cache.fell_back is set, so it isn't recorded as current).
+        `progress` (a core.progress tracker) is advanced per BART chunk.
+        With a `chunk_cache` (SummaryChunkCache), BART calls whose input and
+        parameters are unchanged since the cached run are not repeated.
+        """
+        progress = progress or NullProgress()
+        summarize = chunk_cache.summarize if chunk_cache is not None else hf_client.summarize_text
+        mode = get_setting('SUMMARY_MODE', 'hybrid')
+        original_text = text
         try:
-            logger.info("Generating summary...")
+            logger.info(f"Generating summary ({mode} mode)...")
             if len(text.split()) < 50:
                 return "Text too short to summarize."
 
+            if mode == 'extractive':
+                return self._extractive_summary(text)
+
             max_chunk = 512  # words (~700 tokens), safe for BART's 1024-token limit
             words = text.split()
 
+            if mode == 'hybrid' and len(words) > max_chunk:
+                ratio = float(get_setting('SUMMARY_EXTRACTIVE_RATIO', 0.3))
+                words = extractive.extract_summary(text, ratio=ratio, min_words=max_chunk).split()
+                text = ' '.join(words)
+
             if len(words) <= max_chunk:
-                summary = hf_client.summarize_text(
+                summary = summarize(
                     text, max_length=150, min_length=30
                 )
             else:
@@ -48,22 +122,28 @@ class MeetingAIProcessor:
                     chunk = ' '.join(words[i:i + max_chunk])
                     chunks.append(chunk)
 
+                # One extra step for the final pass over the combined chunk summaries
+                total_steps = len(chunks) + 1
                 summaries = []
-                for chunk in chunks:
-                    chunk_summary = hf_client.summarize_text(
+                for i, chunk in enumerate(chunks, 1):
+                    chunk_summary = summarize(
                         chunk, max_length=100, min_length=20
                     )
                     summaries.append(chunk_summary)
+                    progress.advance(i, total_steps)
 
                 combined_summary = ' '.join(summaries)
 
                 if len(combined_summary.split()) > 100:
-                    summary = hf_client.summarize_text(
+                    summary = summarize(
                         combined_summary, max_length=200, min_length=50
                     )
                 else:
                     summary = combined_summary
 
+            if not summary.strip():
+                raise RuntimeError("Summarization API returned an empty summary.")
+
             logger.info("Summary generated successfully.")
             return summary.strip()
 
@@ -71,18 +151,32 @@ class MeetingAIProcessor:
             logger.error(f"Error in summarization: {str(e)}")
             import traceback
             logger.debug(traceback.format_exc())
-            return "Error generating summary."
+            if chunk_cache is not None:
+                chunk_cache.fell_back = True
+            try:
+                logger.info("Falling back to extractive summary.")
+                return self._extractive_summary(original_text)
+            except Exception as fallback_error:
+                logger.error(f"Extractive fallback failed: {fallback_error}")
+                return "Error generating summary."
+
+    def _extractive_summary(self, text):
+        """Offline summary: the most central sentences, capped at ~200 words."""
+        return extractive.extract_summary(text, ratio=0.15, min_words=50, max_words=200)
 
     def extract_action_items(self, text):
         """
         Extract action items using improved semantic and pattern matching.
         MIGRATED: Uses regex for sentence splitting and HF NER API for entities.
+        Pronoun assignees ("She will ...") are resolved locally (core.coreference).
         """
         try:
             logger.info("Extracting action items...")
 
-            # Sentence segmentation via regex (replaces spaCy doc.sents)
-            sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', text) if s.strip()]
+            # Sentence segmentation via regex (replaces spaCy doc.sents); line
+            # breaks also end a sentence, so "Name: ..." speaker lines stay
+            # apart, and honorifics ("Ms. Lee") don't
+            sentences = [s.strip() for s in re.split(_SENTENCE_BREAK, text) if s.strip()]
 
             # Extract all PERSON entities from the full text in one API call
             all_entities = hf_client.extract_entities(text)
@@ -93,17 +187,20 @@ class MeetingAIProcessor:
             logger.info(f"NER detected persons: {self._person_names}")
 
             action_items = []
+            resolver = coreference.PronounResolver(self._person_names)
 
             for sentence in sentences:
+                sentence = resolver.start(sentence)
+
                 # Skip very short sentences
-                if len(sentence.split()) < 5:
-                    continue
+                if len(sentence.split()) >= 5:
+                    # Look for clear action patterns with person + action + optional deadline
+                    action_found = self._extract_from_sentence(sentence, resolver)
 
-                # Look for clear action patterns with person + action + optional deadline
-                action_found = self._extract_from_sentence(sentence)
+                    if action_found:
+                        action_items.append(action_found)
 
-                if action_found:
-                    action_items.append(action_found)
+                resolver.finish(sentence)
 
             # Remove exact duplicates only
             unique_items = []
@@ -122,20 +219,33 @@ class MeetingAIProcessor:
             logger.error(f"Error extracting action items: {str(e)}")
             return []
 
-    def _extract_from_sentence(self, sentence):
+    def _extract_from_sentence(self, sentence, resolver=None):
         """
         Extract single action item from one sentence using multiple strategies.
         MIGRATED: Removed unused spaCy nlp(sentence) call.
+        `resolver` (a coreference.PronounResolver) resolves pronoun subjects.
         """
-        # Strategy 1: Look for "Person + will/should/must + action"
-        person_action_pattern = r'([A-Z][a-z]+)\s+(will|should|must|needs?\s+to|has\s+to)\s+([^.!?]+)'
-        match = re.search(person_action_pattern, sentence)
+        # Strategy 1: Look for "Person/pronoun + will/should/must + action"
+        person_action_pattern = (
+            r"\b([A-Z][a-z]+|I|[Hh]e|[Ss]he|[Tt]hey|[Ww]e|[Yy]ou)"
+            r"(?:\s+(will|should|must|needs?\s+to|has\s+to|have\s+to|(?:is|am|are)\s+going\s+to)\s+|'ll\s+)"
+            r"([^.!?]+)"
+        )
+        match = next(
+            (m for m in re.finditer(person_action_pattern, sentence)
+             if m.group(1).lower() not in coreference.NOT_PEOPLE),
+            None,
+        )
 
         if match:
             person = match.group(1)
-            action_verb = match.group(2)
             action_desc = match.group(3).strip()
 
+            if person.lower() in coreference.PRONOUNS:
+                person = resolver.resolve(person, sentence, match.start()) if resolver else ""
+            if person and resolver:
+                resolver.mention(person)
+
             # Extract deadline from the action description
             deadline = self._extract_deadline_from_text(sentence)
 
@@ -227,10 +337,16 @@ class MeetingAIProcessor:
 
         return None
 
-    def process_meeting(self, audio_file_path):
+    def process_meeting(self, audio_file_path, progress=None, chunk_cache=None):
         """
         Complete pipeline: audio → text → summary → action items
+
+        Returns (transcript, summary, action_items, segments), where
+        segments are the timestamped transcript segments from Whisper.
+        Stage changes are published to `progress` (a core.progress tracker);
+        `chunk_cache` collects the BART chunk summaries (see SummaryChunkCache).
         """
+        progress = progress or NullProgress()
         try:
             logger.info("=" * 60)
             logger.info("STARTING COMPLETE MEETING PROCESSING PIPELINE")
@@ -238,21 +354,24 @@ class MeetingAIProcessor:
 
             # Step 1: Convert audio to text
             logger.info("STEP 1: Converting audio to text...")
-            transcript = self.convert_audio_to_text(audio_file_path)
+            progress.start('transcribe', size=os.path.getsize(audio_file_path) / (1024 * 1024))
+            transcript, segments = self.convert_audio_to_text(audio_file_path, with_segments=True)
 
             if not transcript:
                 logger.warning("Audio conversion failed. Stopping pipeline.")
-                return None, None, None
+                return None, None, None, []
 
             logger.info(f"Transcript generated! ({len(transcript.split())} words)")
 
             # Step 2: Generate summary
             logger.info("STEP 2: Generating summary...")
-            summary = self.generate_summary(transcript)
+            progress.start('summarize', size=len(transcript.split()))
+            summary = self.generate_summary(transcript, progress, chunk_cache)
             logger.info(f"Summary generated! ({len(summary.split())} words)")
 
             # Step 3: Extract action items
             logger.info("STEP 3: Extracting action items...")
+            progress.start('extract', size=len(transcript.split()))
             action_items = self.extract_action_items(transcript)
             logger.info(f"Found {len(action_items)} action items!")
 
@@ -260,17 +379,18 @@ class MeetingAIProcessor:
             logger.info("MEETING PROCESSING COMPLETED SUCCESSFULLY!")
             logger.info("=" * 60)
 
-            return transcript, summary, action_items
+            return transcript, summary, action_items, segments
 
         except Exception as e:
             logger.error(f"Error in complete meeting processing: {str(e)}")
-            return None, None, None
+            return None, None, None, []
 
-    def process_text_only(self, text):
+    def process_text_only(self, text, progress=None, chunk_cache=None):
         """
         Pipeline for text input: text → summary → action items
         (Skip audio conversion for testing)
         """
+        progress = progress or NullProgress()
         try:
             logger.info("=" * 60)
             logger.info("STARTING TEXT-ONLY PROCESSING PIPELINE")
@@ -278,11 +398,13 @@ class MeetingAIProcessor:
 
             # Step 1: Generate summary
             logger.info("STEP 1: Generating summary...")
-            summary = self.generate_summary(text)
+            progress.start('summarize', size=len(text.split()))
+            summary = self.generate_summary(text, progress, chunk_cache)
             logger.info(f"Summary generated! ({len(summary.split())} words)")
 
             # Step 2: Extract action items
             logger.info("STEP 2: Extracting action items...")
+            progress.start('extract', size=len(text.split()))
             action_items = self.extract_action_items(text)
             logger.info(f"Found {len(action_items)} action items!")
 
@@ -0,0 +1,182 @@
+# REST API (v1) for meetings, tasks and Q&A, for internal tools.
+# Routed under /api/<version>/ (URL path versioning, settings.REST_FRAMEWORK).
+# - ?fields=id,title,transcript picks fields; transcripts, insights and nested
+#   tasks are only serialized, and their columns only read, on request
+# - lists use cursor pagination, so deep pages cost the same as the first
+# - GET responses carry an ETag; a matching If-None-Match gets a 304, and for
+#   a single meeting that is decided from updated_at before serializing
+# - tasks/bulk/ sets many task statuses in one request (core.task_status)
+
+import hashlib
+
+from django.db.models import Count, Prefetch
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, quote_etag
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from .models import Meeting, Task
+from .serializers import MeetingSerializer, TaskSerializer, columns_for
+from . import task_status
+from .llm_gateway import LLMGatewayBusy
+from . import ratelimit
+from .views import get_rag_processor
+
+
+class MeetingPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class TaskPagination(CursorPagination):
+    ordering = ('id',)
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class SparseFieldsViewMixin:
+    """Parses ?fields= and hands the selection to the serializer."""
+
+    def requested_fields(self):
+        if not hasattr(self, '_fields'):
+            raw = self.request.query_params.get('fields', '')
+            fields = [name.strip() for name in raw.split(',') if name.strip()]
+            unknown = set(fields) - set(self.serializer_class.field_names())
+            if unknown:
+                raise ValidationError({'fields': f"Unknown field(s): {', '.join(sorted(unknown))}"})
+            if not fields:
+                optional = getattr(self.serializer_class.Meta, 'optional_fields', ())
+                fields = [name for name in self.serializer_class.field_names() if name not in optional]
+            self._fields = fields
+        return self._fields
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method == 'GET':
+            kwargs.setdefault('fields', self.requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """ETag on GET responses (a hash of the body unless the view set one) and 304s."""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method != 'GET' or response.status_code != 200:
+            return response
+        if not response.has_header('ETag'):
+            response.render()
+            response['ETag'] = quote_etag(hashlib.md5(response.content).hexdigest())
+        response['Cache-Control'] = 'private, no-cache'
+        return get_conditional_response(request, etag=response['ETag'], response=response)
+
+
+class MeetingViewSet(ConditionalGetMixin, SparseFieldsViewMixin, mixins.ListModelMixin,
+                     mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """The user's meetings. `ask/` answers a question about one of them."""
+
+    serializer_class = MeetingSerializer
+    pagination_class = MeetingPagination
+
+    def get_queryset(self):
+        queryset = Meeting.objects.filter(user=self.request.user)
+        if self.action == 'ask':
+            return queryset
+        fields = self.requested_fields()
+        queryset = queryset.only(*columns_for(MeetingSerializer, fields), 'created_at', 'updated_at')
+        if 'task_count' in fields:
+            queryset = queryset.annotate(task_count=Count('task'))
+        if 'tasks' in fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                'task_set', Task.objects.only(*columns_for(TaskSerializer, (
+                    'meeting', 'description', 'assignee', 'deadline', 'status',
+                ))).order_by('id'),
+            ))
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        # pk is an int (core/api_urls.py), so a bad id is a 404, not a query error
+        updated_at = get_object_or_404(
+            Meeting.objects.filter(user=request.user).values_list('updated_at', flat=True), pk=kwargs['pk'],
+        )
+        # Task writes bump updated_at too, so it covers every field
+        etag = quote_etag(f"meeting-{kwargs['pk']}-{updated_at.timestamp()}-{'+'.join(self.requested_fields())}")
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        response = super().retrieve(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
+
+    @action(detail=True, methods=['post'])
+    def ask(self, request, pk=None, version=None):
+        """{"question": "..."} -> the same answer as the meeting page's Q&A."""
+        meeting = self.get_object()
+        data = request.data if isinstance(request.data, dict) else {}
+        question = str(data.get('question', '')).strip()
+        if meeting.status != 'completed':
+            return Response({'error': 'Meeting has not been processed yet.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not question:
+            return Response({'error': 'Please enter a question.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        refusal = ratelimit.throttle(request, 'ask', ratelimit.question_cost(request, meeting, question))
+        if refusal:
+            return Response(
+                {'error': refusal['message'], 'retry_after': refusal['retry_after'], 'scope': refusal['scope']},
+                status=status.HTTP_429_TOO_MANY_REQUESTS, headers={'Retry-After': str(refusal['retry_after'])},
+            )
+        try:
+            result = get_rag_processor().ask_question(
+                meeting.transcript, meeting.summary, question,
+                user_key=request.user.id, meeting_id=meeting.id, insights=meeting.insights,
+            )
+        except LLMGatewayBusy as e:
+            return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS,
+                            headers={'Retry-After': str(e.retry_after)})
+        except Exception as e:
+            return Response({'error': f'Error generating answer: {str(e)}'},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response(result)
+
+
+class TaskViewSet(ConditionalGetMixin, SparseFieldsViewMixin, mixins.ListModelMixin,
+                  mixins.RetrieveModelMixin, mixins.UpdateModelMixin, viewsets.GenericViewSet):
+    """
+    The user's tasks, filterable by ?meeting= and ?status=. Only the status
+    can be changed; `bulk/` changes many in one request.
+    """
+
+    serializer_class = TaskSerializer
+    pagination_class = TaskPagination
+
+    def get_queryset(self):
+        queryset = Task.objects.filter(meeting__user=self.request.user)
+        if self.request.method == 'GET':
+            queryset = queryset.only(*columns_for(TaskSerializer, self.requested_fields()))
+        params = self.request.query_params
+        if params.get('meeting'):
+            if not params['meeting'].isdigit():
+                raise ValidationError({'meeting': 'Expected a meeting id.'})
+            queryset = queryset.filter(meeting_id=params['meeting'])
+        if params.get('status'):
+            queryset = queryset.filter(status=params['status'])
+        return queryset
+
+    @action(detail=False, methods=['patch', 'post'])
+    def bulk(self, request, version=None):
+        """{"tasks": [{"id": 1, "status": "completed"}, ...]} -> the new states."""
+        try:
+            data = request.data if isinstance(request.data, dict) else {}
+            updates = task_status.parse_updates(data.get('tasks'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        tasks, missing = task_status.apply_statuses(request.user, updates)
+        if missing:
+            return Response({'error': 'Some tasks were not found; nothing was changed.', 'missing': missing},
+                            status=status.HTTP_404_NOT_FOUND)
+        return Response({'tasks': tasks})
@@ -0,0 +1,39 @@
+# core/api_urls.py
+# REST API routes (core/api.py), included by core/urls.py under /api/<version>/.
+# DRF imports `requests` when it loads, which worker boot avoids (core.startup),
+# so this module doesn't import core.api: each route builds its viewset view on
+# its first request. Route names follow DRF's router (<basename>-<action>).
+from django.urls import path
+
+
+def _viewset(name, actions, **initkwargs):
+    """View for `actions` of core.api.<name>, created on first use."""
+    view = None
+
+    def lazy_view(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            from . import api
+            view = getattr(api, name).as_view(actions, **initkwargs)
+        return view(request, *args, **kwargs)
+
+    # Like every DRF view; SessionAuthentication enforces CSRF itself
+    lazy_view.csrf_exempt = True
+    return lazy_view
+
+
+urlpatterns = [
+    path('meetings/', _viewset('MeetingViewSet', {'get': 'list'}, basename='api-meeting', detail=False),
+         name='api-meeting-list'),
+    path('meetings/<int:pk>/', _viewset('MeetingViewSet', {'get': 'retrieve'}, basename='api-meeting', detail=True),
+         name='api-meeting-detail'),
+    path('meetings/<int:pk>/ask/', _viewset('MeetingViewSet', {'post': 'ask'}, basename='api-meeting', detail=True),
+         name='api-meeting-ask'),
+    path('tasks/', _viewset('TaskViewSet', {'get': 'list'}, basename='api-task', detail=False),
+         name='api-task-list'),
+    path('tasks/bulk/', _viewset('TaskViewSet', {'patch': 'bulk', 'post': 'bulk'}, basename='api-task', detail=False),
+         name='api-task-bulk'),
+    path('tasks/<int:pk>/', _viewset('TaskViewSet', {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update'},
+                                     basename='api-task', detail=True),
+         name='api-task-detail'),
+]
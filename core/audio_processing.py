@@ -0,0 +1,365 @@
+# Local audio preprocessing before transcription.
+# Whisper works on 16 kHz mono audio, so uploading 48 kHz stereo WAV files
+# wastes bandwidth and time. This module decodes the upload, downmixes and
+# resamples it to 16 kHz mono, cuts silence with a NumPy voice-activity
+# detector, and re-encodes it to a compact codec.
+#
+# ffmpeg is used when it is on PATH (any input format, Opus/FLAC output).
+# Without it, PCM WAV files are handled with the standard library + NumPy
+# and re-encoded as 16 kHz mono 16-bit WAV; other formats pass through.
+
+import os
+import io
+import time
+import wave
+import shutil
+import logging
+import subprocess
+
+import numpy as np
+
+from .conf import get_setting
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+
+# Codec name → (ffmpeg output args, MIME type sent to the Whisper API)
+_CODECS = {
+    "opus": (["-c:a", "libopus", "-b:a", "24k", "-application", "voip", "-f", "ogg"], "audio/ogg"),
+    "flac": (["-c:a", "flac", "-f", "flac"], "audio/flac"),
+    "wav": (["-c:a", "pcm_s16le", "-f", "wav"], "audio/wav"),
+}
+
+
+def ffmpeg_available():
+    return shutil.which("ffmpeg") is not None
+
+
+def decode_audio(file_path, sample_rate=TARGET_SAMPLE_RATE):
+    """
+    Decode an audio file to mono 16-bit PCM at `sample_rate`.
+
+    Args:
+        file_path: Path to the audio file.
+        sample_rate: Output sample rate in Hz.
+
+    Returns:
+        1-D int16 NumPy array of samples.
+    """
+    if ffmpeg_available():
+        cmd = [
+            "ffmpeg", "-nostdin", "-v", "error", "-i", file_path,
+            "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "-acodec", "pcm_s16le", "pipe:1",
+        ]
+        result = subprocess.run(cmd, capture_output=True, check=True)
+        return np.frombuffer(result.stdout, dtype=np.int16)
+
+    if os.path.splitext(file_path)[1].lower() != ".wav":
+        raise RuntimeError("ffmpeg is not installed; only PCM WAV files can be decoded locally.")
+
+    with wave.open(file_path, "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        source_rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+
+    samples = _pcm_to_float(raw, width)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if source_rate != sample_rate:
+        from math import gcd
+        from scipy.signal import resample_poly
+        g = gcd(source_rate, sample_rate)
+        samples = resample_poly(samples, sample_rate // g, source_rate // g)
+
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def _pcm_to_float(raw, width):
+    """Convert little-endian PCM bytes of `width` bytes/sample to float32 in [-1, 1]."""
+    if width == 1:
+        return (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    if width == 2:
+        return np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    if width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = (b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16))
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        return ints.astype(np.float32) / 8388608
+    if width == 4:
+        return np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648
+    raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+
+
+def encode_audio(samples, sample_rate=TARGET_SAMPLE_RATE, codec=None):
+    """
+    Encode mono int16 samples with a compact codec.
+
+    Args:
+        samples: 1-D int16 NumPy array.
+        sample_rate: Sample rate of `samples` in Hz.
+        codec: "opus", "flac" or "wav". Defaults to settings.AUDIO_TARGET_CODEC.
+
+    Returns:
+        Tuple of (encoded bytes, MIME type).
+    """
+    codec = codec or get_setting("AUDIO_TARGET_CODEC", "opus")
+    if codec not in _CODECS:
+        raise ValueError(f"Unknown audio codec {codec!r}. Choose from: {', '.join(_CODECS)}")
+
+    if ffmpeg_available():
+        output_args, content_type = _CODECS[codec]
+        cmd = [
+            "ffmpeg", "-nostdin", "-v", "error",
+            "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+            *output_args, "pipe:1",
+        ]
+        result = subprocess.run(cmd, input=samples.astype("<i2").tobytes(), capture_output=True, check=True)
+        return result.stdout, content_type
+
+    # Standard-library fallback: 16-bit mono WAV
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype("<i2").tobytes())
+    return buffer.getvalue(), "audio/wav"
+
+
+def archive_audio(file_path, out_path, bitrate="16k"):
+    """
+    Transcode a recording for long-term storage: mono, 16 kHz, low-bitrate
+    Opus. The timeline is unchanged, so transcript timestamps still apply.
+    Without ffmpeg, PCM WAV files are rewritten as 16 kHz mono 16-bit WAV.
+
+    Args:
+        file_path: Path to the audio file.
+        out_path: Path the archive copy is written to.
+        bitrate: Opus bitrate in ffmpeg notation, e.g. "16k".
+
+    Returns:
+        File extension of the written format (".ogg" or ".wav").
+    """
+    if ffmpeg_available():
+        cmd = [
+            "ffmpeg", "-nostdin", "-v", "error", "-y", "-i", file_path,
+            "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE),
+            "-c:a", "libopus", "-b:a", bitrate, "-application", "voip", "-f", "ogg", out_path,
+        ]
+        subprocess.run(cmd, capture_output=True, check=True)
+        return ".ogg"
+
+    data, _ = encode_audio(decode_audio(file_path), codec="wav")
+    with open(out_path, "wb") as out:
+        out.write(data)
+    return ".wav"
+
+
+# ─── Voice-Activity Detection ───────────────────────────────────────────
+
+
+def _frame_features(samples, sample_rate, frame_len, block_frames=8192):
+    """
+    Per-frame energy (dBFS), speech-band energy ratio and spectral flatness.
+
+    Frames are non-overlapping and processed in blocks so memory stays
+    bounded for hour-long recordings.
+    """
+    n_frames = len(samples) // frame_len
+    frames_all = samples[: n_frames * frame_len].reshape(n_frames, frame_len)
+
+    freqs = np.fft.rfftfreq(frame_len, d=1.0 / sample_rate)
+    speech_band = (freqs >= 300) & (freqs <= 3400)
+    window = np.hanning(frame_len).astype(np.float32)
+
+    energy_db = np.empty(n_frames, dtype=np.float32)
+    band_ratio = np.empty(n_frames, dtype=np.float32)
+    flatness = np.empty(n_frames, dtype=np.float32)
+
+    for start in range(0, n_frames, block_frames):
+        frames = frames_all[start:start + block_frames].astype(np.float32) / 32768
+        stop = start + len(frames)
+
+        energy_db[start:stop] = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+
+        power = np.abs(np.fft.rfft(frames * window, axis=1)) ** 2 + 1e-12
+        band_ratio[start:stop] = power[:, speech_band].sum(axis=1) / power.sum(axis=1)
+        band_power = power[:, speech_band]
+        flatness[start:stop] = np.exp(np.mean(np.log(band_power), axis=1)) / np.mean(band_power, axis=1)
+
+    return energy_db, band_ratio, flatness
+
+
+def _close_gaps(mask, max_gap):
+    """Fill runs of False shorter than `max_gap` frames between True runs."""
+    if max_gap <= 0 or not mask.any():
+        return mask
+    edges = np.diff(np.concatenate(([1], mask.astype(np.int8), [1])))
+    gap_starts = np.flatnonzero(edges == -1)
+    gap_ends = np.flatnonzero(edges == 1)
+    mask = mask.copy()
+    for gs, ge in zip(gap_starts, gap_ends):
+        # Leading/trailing silence is never "between" speech
+        if gs > 0 and ge < len(mask) and ge - gs < max_gap:
+            mask[gs:ge] = True
+    return mask
+
+
+def _runs(mask):
+    """Return (start, end) index pairs of True runs in a boolean array."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def detect_speech(samples, sample_rate=TARGET_SAMPLE_RATE, frame_ms=30, energy_margin_db=12.0,
+                  min_voiced_ms=120, min_speech_ms=250, min_silence_ms=600, pad_ms=200):
+    """
+    Find speech regions with an energy + spectral voice-activity detector.
+
+    A frame is speech when its energy is `energy_margin_db` above the
+    estimated noise floor, most of its energy sits in the 300-3400 Hz
+    speech band, and its spectrum is not flat (rejects hiss and hum).
+
+    Args:
+        samples: 1-D int16 NumPy array.
+        sample_rate: Sample rate of `samples` in Hz.
+        frame_ms: Analysis frame length.
+        energy_margin_db: Required energy above the noise floor.
+        min_voiced_ms: Runs of speech-like frames shorter than this are
+            dropped before pauses are bridged (isolated frames of noise).
+        min_speech_ms: Speech bursts shorter than this are dropped.
+        min_silence_ms: Pauses shorter than this are kept as speech.
+        pad_ms: Padding added around each region so word edges survive.
+
+    Returns:
+        List of (start_sample, end_sample) tuples, sorted and non-overlapping.
+    """
+    frame_len = int(sample_rate * frame_ms / 1000)
+    if len(samples) < frame_len:
+        return [(0, len(samples))] if len(samples) else []
+
+    energy_db, band_ratio, flatness = _frame_features(samples, sample_rate, frame_len)
+
+    noise_floor = np.percentile(energy_db, 10)
+    threshold = max(noise_floor + energy_margin_db, -55.0)
+    speech = (energy_db > threshold) & (band_ratio > 0.4) & (flatness < 0.6)
+
+    # A single noise frame often passes (one frame's periodogram of white noise
+    # has a flatness near 0.56); bridging pauses first would merge scattered
+    # frames of loud hiss into one long "speech" region
+    min_voiced = max(1, int(min_voiced_ms / frame_ms))
+    for start, end in _runs(speech):
+        if end - start < min_voiced:
+            speech[start:end] = False
+
+    speech = _close_gaps(speech, int(min_silence_ms / frame_ms))
+    min_frames = max(1, int(min_speech_ms / frame_ms))
+    pad = int(sample_rate * pad_ms / 1000)
+
+    regions = []
+    for start, end in _runs(speech):
+        if end - start < min_frames:
+            continue
+        s = max(0, int(start) * frame_len - pad)
+        e = min(len(samples), int(end) * frame_len + pad)
+        if regions and s <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], e)
+        else:
+            regions.append((s, e))
+    return regions
+
+
+def remove_silence(samples, sample_rate=TARGET_SAMPLE_RATE):
+    """
+    Cut non-speech regions out of `samples`.
+
+    Args:
+        samples: 1-D int16 NumPy array.
+        sample_rate: Sample rate of `samples` in Hz.
+
+    Returns:
+        Tuple of (speech-only samples, timestamp map). The map is a list of
+        (processed_start_s, original_start_s, duration_s) tuples, one per
+        kept region; pass it to `map_to_original_time`. If no speech is
+        found the audio is returned unchanged.
+    """
+    regions = detect_speech(samples, sample_rate)
+    if not regions:
+        return samples, [(0.0, 0.0, len(samples) / sample_rate)]
+
+    timestamp_map = []
+    offset = 0
+    for start, end in regions:
+        timestamp_map.append((offset / sample_rate, start / sample_rate, (end - start) / sample_rate))
+        offset += end - start
+
+    speech = np.concatenate([samples[start:end] for start, end in regions])
+    return speech, timestamp_map
+
+
+def map_to_original_time(t, timestamp_map):
+    """Map a time (seconds) in silence-stripped audio back to the original recording."""
+    if not timestamp_map:
+        return t
+    from bisect import bisect_right
+    starts = [entry[0] for entry in timestamp_map]
+    i = max(0, bisect_right(starts, t) - 1)
+    processed_start, original_start, duration = timestamp_map[i]
+    return original_start + min(t - processed_start, duration)
+
+
+def base64_size(n_bytes):
+    """Length of `n_bytes` bytes once base64-encoded."""
+    return 4 * ((n_bytes + 2) // 3)
+
+
+def preprocess_audio(file_path, base64_payload=False):
+    """
+    Decode, downmix, resample and re-encode an audio file for Whisper.
+
+    Args:
+        file_path: Path to the original audio file.
+        base64_payload: The bytes will be sent base64-encoded in JSON (the
+            timestamped Whisper request), which adds a third to their size.
+
+    Returns:
+        Tuple of (audio bytes, MIME type, stats dict). The stats dict holds
+        original_bytes, processed_bytes, upload_bytes (what is actually
+        sent), compression_ratio (original_bytes / upload_bytes),
+        duration_s, speech_s, timestamp_map (see `remove_silence`) and
+        elapsed_s.
+    """
+    started = time.perf_counter()
+    original_bytes = os.path.getsize(file_path)
+
+    samples = decode_audio(file_path)
+    duration_s = len(samples) / TARGET_SAMPLE_RATE
+
+    if get_setting("AUDIO_VAD_ENABLED", True):
+        samples, timestamp_map = remove_silence(samples)
+    else:
+        timestamp_map = [(0.0, 0.0, duration_s)]
+
+    audio_bytes, content_type = encode_audio(samples)
+
+    upload_bytes = base64_size(len(audio_bytes)) if base64_payload else len(audio_bytes)
+    stats = {
+        "original_bytes": original_bytes,
+        "processed_bytes": len(audio_bytes),
+        "upload_bytes": upload_bytes,
+        "compression_ratio": original_bytes / max(upload_bytes, 1),
+        "duration_s": duration_s,
+        "speech_s": len(samples) / TARGET_SAMPLE_RATE,
+        "timestamp_map": timestamp_map,
+        "elapsed_s": time.perf_counter() - started,
+    }
+    logger.info(
+        f"Audio preprocessing: {original_bytes / 1e6:.2f} MB -> "
+        f"{upload_bytes / 1e6:.2f} MB sent{' as base64' if base64_payload else ''} "
+        f"({stats['compression_ratio']:.1f}x, "
+        f"{content_type}, {stats['speech_s']:.0f}s speech of {duration_s:.0f}s audio) "
+        f"in {stats['elapsed_s']:.2f}s"
+    )
+    return audio_bytes, content_type, stats
@@ -0,0 +1,282 @@
+# Batch ingest of archived recordings and transcripts.
+# Files run across a process pool. Workers only call the APIs (Whisper,
+# BART, NER, the insights call) and return results. The parent process
+# does every database and storage write, so SQLite never sees concurrent
+# writers. A semaphore shared by all workers bounds concurrent HF API
+# requests. Identical audio goes through the same content-hash reuse as
+# web uploads. A JSON checkpoint records each finished file so an
+# interrupted run can resume.
+
+import os
+import csv
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+TEXT_EXTENSIONS = ('.txt', '.md')
+
+# Per-process state of a pool worker (see init_worker)
+_worker = {}
+
+
+def _audio_extensions():
+    from .uploads import ALLOWED_AUDIO_EXTENSIONS
+    return ALLOWED_AUDIO_EXTENSIONS
+
+
+def file_kind(path):
+    """"audio", "text", or None for files the ingest doesn't handle."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in _audio_extensions():
+        return "audio"
+    if ext in TEXT_EXTENSIONS:
+        return "text"
+    return None
+
+
+def _title_for(path):
+    return os.path.splitext(os.path.basename(path))[0].replace("_", " ").strip() or "Untitled meeting"
+
+
+def scan_directory(root, recursive=True):
+    """
+    Ingest items for the supported files under `root`, sorted by path.
+
+    Returns:
+        List of {"path", "title", "user"} dicts (user None = the command's default).
+    """
+    paths = []
+    if recursive:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            paths.extend(os.path.join(dirpath, name) for name in filenames)
+    else:
+        paths = [os.path.join(root, name) for name in os.listdir(root)]
+    return [
+        {"path": os.path.abspath(path), "title": _title_for(path), "user": None}
+        for path in sorted(paths)
+        if os.path.isfile(path) and not os.path.basename(path).startswith(".") and file_kind(path)
+    ]
+
+
+def read_manifest(path):
+    """
+    Ingest items from a CSV (header with `path`, optional `title`, `user`)
+    or JSON Lines manifest. Relative paths are resolved against the
+    manifest's directory.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    items = []
+    for number, row in enumerate(rows, 1):
+        if not row.get("path"):
+            raise ValueError(f"Manifest row {number} has no path")
+        file_path = os.path.abspath(os.path.join(base, row["path"]))
+        items.append({
+            "path": file_path,
+            "title": (row.get("title") or "").strip() or _title_for(file_path),
+            "user": (row.get("user") or "").strip() or None,
+        })
+    return items
+
+
+class Checkpoint:
+    """
+    Finished items of an ingest run, saved after every item so a rerun
+    skips them. Failed items are recorded too but are retried on resume.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.items = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.items = json.load(f).get("items", {})
+
+    @staticmethod
+    def key(item):
+        return f"{item['user_id']}:{item['content_hash']}:{item['path']}"
+
+    def is_done(self, item):
+        return self.items.get(self.key(item), {}).get("status") == "done"
+
+    def mark(self, item, status, **details):
+        self.items[self.key(item)] = {"status": status, **details}
+        self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "items": self.items}, f, indent=1)
+        os.replace(tmp, self.path)
+
+
+def init_worker(api_slots, insights):
+    """Pool initializer: set up Django (spawned workers) and the shared API limit."""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+    from . import hf_client
+    from .ai_processor import MeetingAIProcessor
+
+    hf_client.limit_concurrency(api_slots)
+    _worker["processor"] = MeetingAIProcessor()
+    _worker["rag"] = None
+    if insights:
+        try:
+            from .rag_processor import MeetingRAGProcessor
+            _worker["rag"] = MeetingRAGProcessor()
+        except Exception as e:
+            logger.warning(f"Ingest worker {os.getpid()} runs without insights: {e}")
+
+
+def process_file(job):
+    """
+    Run the pipeline for one file in a pool worker. No database access.
+
+    Args:
+        job: {"key", "path", "kind"} ("audio" or "text").
+
+    Returns:
+        Dict with key, seconds and either error or transcript, summary,
+        action_items, segments, chunks (BART outputs by fingerprint),
+        summary_fell_back (BART failed; the summary is extractive) and
+        insights (None when not generated).
+    """
+    from .ai_processor import SummaryChunkCache
+
+    started = time.perf_counter()
+    processor = _worker["processor"]
+    cache = SummaryChunkCache()
+    try:
+        if job["kind"] == "audio":
+            transcript, summary, action_items, segments = processor.process_meeting(job["path"], chunk_cache=cache)
+            if not transcript:
+                raise RuntimeError("Transcription failed")
+        else:
+            with open(job["path"], encoding="utf-8", errors="replace") as f:
+                transcript = f.read().strip()
+            if not transcript:
+                raise RuntimeError("Empty text file")
+            _, summary, action_items = processor.process_text_only(transcript, chunk_cache=cache)
+            if summary is None:
+                raise RuntimeError("Text processing failed")
+            segments = []
+
+        insights = None
+        if _worker["rag"] is not None:
+            try:
+                insights = _worker["rag"].generate_insights(transcript, summary)
+            except Exception as e:
+                logger.warning(f"Could not precompute insights for {job['path']}: {e}")
+
+        return {
+            "key": job["key"],
+            "transcript": transcript,
+            "summary": summary,
+            "action_items": action_items,
+            "segments": segments,
+            "chunks": cache.used,
+            "summary_fell_back": cache.fell_back,
+            "insights": insights,
+            "seconds": time.perf_counter() - started,
+        }
+    except Exception as e:
+        return {"key": job["key"], "error": str(e), "seconds": time.perf_counter() - started}
+
+
+def store_result(item, result, stored_audio=None):
+    """
+    Create the meeting for a processed item (parent process).
+
+    Args:
+        item: Ingest item with path, title, user_id, kind and content_hash.
+        result: process_file's result (without error).
+        stored_audio: Storage name of an identical file already stored, to
+            share instead of writing another copy.
+
+    Returns:
+        The completed Meeting.
+    """
+    from django.core.files import File
+    from .models import Meeting
+    from . import reprocess, uploads
+
+    meeting = Meeting(title=item["title"][:200], status="processing", user_id=item["user_id"])
+    if item["kind"] == "audio":
+        meeting.content_hash = item["content_hash"]
+        if stored_audio:
+            meeting.audio_file = stored_audio
+        else:
+            with open(item["path"], "rb") as f:
+                meeting.audio_file.save(os.path.basename(item["path"]), File(f), save=False)
+    meeting.save()
+
+    uploads.save_results(
+        meeting, result["transcript"], result["summary"], result["action_items"],
+        result["segments"], result["chunks"], result.get("summary_fell_back", False),
+    )
+    if result.get("insights"):
+        meeting.insights = result["insights"]
+        reprocess.record(meeting, "insights")
+        meeting.save(update_fields=["insights", "pipeline"])
+    return meeting
+
+
+def reuse_result(item, source):
+    """Create the meeting for an item whose audio matches the completed meeting `source`."""
+    from .models import Meeting
+    from . import uploads
+
+    meeting = Meeting.objects.create(
+        title=item["title"][:200],
+        audio_file=source.audio_file.name,
+        content_hash=item["content_hash"],
+        status="processing",
+        user_id=item["user_id"],
+    )
+    uploads.copy_results(source, meeting)
+    return meeting
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def throughput_report(outcomes, wall_seconds):
+    """
+    Aggregate per-item outcomes ({"status", "bytes", "seconds"}) of a run.
+
+    Returns:
+        Dict with counts per status, processed megabytes, wall time,
+        files and MB per minute, and p50/p95 per-file processing seconds.
+    """
+    counts = {}
+    for outcome in outcomes:
+        counts[outcome["status"]] = counts.get(outcome["status"], 0) + 1
+    worked = [o for o in outcomes if o["status"] in ("processed", "reused")]
+    megabytes = sum(o["bytes"] for o in worked) / (1024 * 1024)
+    seconds = [o["seconds"] for o in outcomes if o["status"] == "processed"]
+    minutes = wall_seconds / 60 if wall_seconds > 0 else None
+    return {
+        "counts": counts,
+        "megabytes": megabytes,
+        "wall_seconds": wall_seconds,
+        "files_per_minute": len(worked) / minutes if minutes else None,
+        "mb_per_minute": megabytes / minutes if minutes else None,
+        "file_seconds_p50": _percentile(seconds, 0.5),
+        "file_seconds_p95": _percentile(seconds, 0.95),
+    }
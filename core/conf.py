@@ -0,0 +1,10 @@
+# Settings access that also works outside Django (e.g. standalone scripts
+# importing core.hf_client or core.ai_processor).
+
+
+def get_setting(name, default):
+    """Read a Django setting, falling back to `default` when unconfigured."""
+    from django.conf import settings as django_settings
+    if not django_settings.configured:
+        return default
+    return getattr(django_settings, name, default)
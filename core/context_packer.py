@@ -0,0 +1,121 @@
+# Context assembly for RAG prompts.
+# Retrieved chunks overlap (sliding windows) and the summary often repeats
+# transcript sentences, so sending the raw top-k chunks wastes tokens. The
+# packer merges overlapping/adjacent hits into spans, drops duplicate
+# sentences, and fills a fixed token budget in score order.
+
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text):
+    """Rough Llama token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Leading words of `text` within `max_tokens` (estimate_tokens), or ""."""
+    limit = max_tokens * 4
+    words, length = [], 0
+    for word in text.split():
+        length += len(word) + (1 if words else 0)
+        if length > limit:
+            break
+        words.append(word)
+    return " ".join(words)
+
+
+def _normalize(sentence):
+    return re.sub(r"\W+", " ", sentence.lower()).strip()
+
+
+def merge_hits(hits, gap=0):
+    """
+    Merge hits that overlap or touch within the same document.
+
+    Args:
+        hits: Dicts with "source", "start", "end" (word offsets) and "score".
+        gap: Hits separated by at most this many words are merged too.
+
+    Returns:
+        List of merged span dicts (source, start, end, score = best hit
+        score), sorted by score descending.
+    """
+    spans = []
+    for source in {h["source"] for h in hits}:
+        current = None
+        for hit in sorted((h for h in hits if h["source"] == source), key=lambda h: h["start"]):
+            if current and hit["start"] <= current["end"] + gap:
+                current["end"] = max(current["end"], hit["end"])
+                current["score"] = max(current["score"], hit["score"])
+            else:
+                current = {"source": source, "start": hit["start"], "end": hit["end"], "score": hit["score"]}
+                spans.append(current)
+    return sorted(spans, key=lambda s: s["score"], reverse=True)
+
+
+def pack_context(hits, documents, budget_tokens):
+    """
+    Build a de-duplicated context that fits `budget_tokens`. Sentences are
+    taken in score order until one doesn't fit; that one is cut to the
+    budget that is left.
+
+    Args:
+        hits: Retrieved chunks as dicts with "source", "start", "end" and
+            "score"; start/end are word offsets into `documents[source]`.
+        documents: Mapping of source name to its list of words.
+        budget_tokens: Maximum estimated tokens of packed context.
+
+    Returns:
+        Tuple of (blocks, stats). Each block is {"text", "score", "source"}
+        in score order; stats has tokens_used, tokens_naive and
+        tokens_saved (vs. sending every hit verbatim).
+    """
+    naive_tokens = sum(
+        estimate_tokens(" ".join(documents[h["source"]][h["start"]:h["end"]])) for h in hits
+    )
+
+    from .extractive import split_sentences
+
+    seen = set()
+    blocks = []
+    used = 0
+    full = False
+    for span in merge_hits(hits):
+        text = " ".join(documents[span["source"]][span["start"]:span["end"]])
+        kept = []
+        for sentence in split_sentences(text):
+            key = _normalize(sentence)
+            if not key or key in seen:
+                continue
+            cost = estimate_tokens(sentence) + 1
+            if used + cost > budget_tokens:
+                # The first sentence that doesn't fit is cut to the remaining
+                # budget; ASR output can be one unpunctuated "sentence"
+                sentence = truncate_to_tokens(sentence, budget_tokens - used - 1)
+                cost = estimate_tokens(sentence) + 1
+                full = True
+                if not sentence:
+                    break
+            seen.add(key)
+            kept.append(sentence)
+            used += cost
+            if full:
+                break
+        if kept:
+            blocks.append({"text": " ".join(kept), "score": span["score"], "source": span["source"]})
+        if full:
+            break
+
+    stats = {
+        "tokens_used": used,
+        "tokens_naive": naive_tokens,
+        "tokens_saved": max(0, naive_tokens - used),
+    }
+    logger.info(
+        f"RAG context packed: {used} tokens in {len(blocks)} block(s) "
+        f"(naive {naive_tokens}, saved {stats['tokens_saved']})."
+    )
+    return blocks, stats
@@ -0,0 +1,171 @@
+# Pronoun resolution for action-item assignees.
+# "She will send the deck" should be assigned to whoever "she" is. A
+# lightweight recency heuristic is enough for meeting talk, and it needs no
+# model or API call: the resolver is fed the sentences in order, once,
+# and remembers the current speaker (from "Alice: ..." labels in pasted
+# notes) and the people mentioned recently (NER person names from the
+# existing NER call, speaker labels, and named subjects of action items).
+#   I              -> the current speaker
+#   he / she / they -> the one compatible person in the nearest sentence
+#                      (within WINDOW) that names anyone other than the speaker
+#   we / you       -> unresolved (a group or the listener)
+# A person's pronouns are only known when the transcript shows them: an
+# honorific ("Ms. Lee") or a possessive/reflexive in the same clause as the
+# name ("Sarah shared her notes"). Names are never used to guess. He/she
+# match people with those pronouns or unknown ones; "they" is often plural,
+# so it only matches people known to use they. Two or more compatible
+# people in that nearest sentence ("Alice will email Bob. He ...") are
+# ambiguous, and so is anything else unresolved: the assignee is left empty
+# rather than guessed.
+
+import re
+
+FIRST_PERSON = {"i"}
+THIRD_PERSON = {"he", "she", "they"}
+UNRESOLVED = {"we", "you"}
+PRONOUNS = FIRST_PERSON | THIRD_PERSON | UNRESOLVED
+
+# Capitalized words that start "X will ..." sentences but are never people
+NOT_PEOPLE = {
+    "it", "this", "that", "there", "these", "those", "what", "which", "who",
+    "nothing", "everything", "then", "so", "also",
+}
+
+# Headings in pasted notes that look like speaker labels
+NOT_SPEAKERS = {
+    "task", "tasks", "note", "notes", "agenda", "summary", "decision", "decisions",
+    "action", "actions", "update", "updates", "attendees", "date", "time",
+    "subject", "re", "next steps", "q", "a", "question", "answer",
+}
+
+# Words that show which pronouns a person uses, by the pronoun they imply
+HONORIFICS = {"mr": "he", "mrs": "she", "ms": "she", "miss": "she", "mx": "they"}
+POSSESSIVES = {
+    "his": "he", "himself": "he",
+    "her": "she", "hers": "she", "herself": "she",
+    "their": "they", "theirs": "they", "themself": "they", "themselves": "they",
+}
+
+WINDOW = 3   # sentences a mention stays available to he/she/they
+
+_SPEAKER_LABEL = re.compile(
+    r"^\s*(?:\[[\d:.]+\]\s*)?([A-Z][\w'-]*(?:\s[A-Z][\w'-]*)?)\s*:\s+(?=\S)"
+)
+_HONORIFIC = re.compile(r"\b(Mr|Mrs|Ms|Miss|Mx)\.?\s+([A-Z][\w'-]*)")
+_POSSESSIVE = re.compile(r"\b(" + "|".join(POSSESSIVES) + r")\b", re.IGNORECASE)
+# Where a clause (and so a name's reach over a possessive) ends, reported speech included
+_CLAUSE_END = re.compile(
+    r"[,;:]|\b(?:and|but|or|so|because|while|when|if|that|said|says|told|asked|"
+    r"thinks|thought|mentioned|noted)\b",
+    re.IGNORECASE,
+)
+_UNKNOWN = object()   # conflicting evidence
+
+
+class PronounResolver:
+    """
+    One linear pass over a transcript's sentences: call start() for each
+    sentence, resolve() for pronoun subjects in it, then finish().
+    """
+
+    def __init__(self, person_names=(), window=WINDOW):
+        names = sorted({name for name in person_names if name}, key=len, reverse=True)
+        self._names = (
+            re.compile(r"\b(?:" + "|".join(map(re.escape, names)) + r")\b") if names else None
+        )
+        self.window = window
+        self.speaker = None
+        self.pronouns = {}   # name -> "he" / "she" / "they", from the transcript
+        self._recent = []    # (sentence index, name), oldest first, one entry per name
+        self._subjects = []  # subjects of the current sentence
+        self._index = -1
+
+    def start(self, sentence):
+        """Begin the next sentence; returns it without a leading speaker label."""
+        self._index += 1
+        match = _SPEAKER_LABEL.match(sentence)
+        if match and match.group(1).lower() not in NOT_SPEAKERS:
+            self.speaker = match.group(1)
+            self._remember(self.speaker)
+            sentence = sentence[match.end():]
+        self._learn(sentence, self._named(sentence))
+        return sentence
+
+    def mention(self, name):
+        """Record `name` as the subject of an action in the current sentence."""
+        self._subjects.append(name)
+
+    def _remember(self, name):
+        self._recent = [entry for entry in self._recent if entry[1] != name]
+        self._recent.append((self._index, name))
+
+    def _named(self, sentence, end=None):
+        if self._names is None:
+            return []
+        return [m.group(0) for m in self._names.finditer(sentence, 0, len(sentence) if end is None else end)]
+
+    def _note(self, name, pronoun):
+        known = self.pronouns.get(name)
+        if known is None:
+            self.pronouns[name] = pronoun
+        elif known is not _UNKNOWN and known != pronoun:
+            self.pronouns[name] = _UNKNOWN
+
+    def _learn(self, sentence, names):
+        """Note pronouns the sentence shows for the people in `names`."""
+        for title, name in _HONORIFIC.findall(sentence):
+            self._note(name, HONORIFICS[title.lower()])
+        for name in dict.fromkeys(names):
+            position = re.search(r"\b" + re.escape(name) + r"\b", sentence)
+            if position is None:
+                continue
+            rest = sentence[position.end():]
+            stop = _CLAUSE_END.search(rest)
+            clause = rest[:stop.start()] if stop else rest
+            if self._named(clause):
+                continue   # another person in the clause; the possessive could be theirs
+            possessive = _POSSESSIVE.search(clause)
+            if possessive:
+                self._note(name, POSSESSIVES[possessive.group(1).lower()])
+
+    def finish(self, sentence):
+        """Record the people named in the sentence just processed."""
+        self._learn(sentence, self._subjects)
+        for name in self._named(sentence) + self._subjects:
+            self._remember(name)
+        self._subjects = []
+        oldest = self._index - self.window
+        self._recent = [entry for entry in self._recent if entry[0] > oldest]
+
+    def _compatible(self, name, pronoun):
+        known = self.pronouns.get(name)
+        if pronoun == "they":
+            return known == "they"
+        return known is None or known is _UNKNOWN or known == pronoun
+
+    def resolve(self, pronoun, sentence="", position=0):
+        """
+        Person `pronoun` (at `position` in `sentence`) refers to, or "" if
+        it can't be resolved or is ambiguous.
+        """
+        pronoun = pronoun.lower()
+        if pronoun in FIRST_PERSON:
+            return self.speaker or ""
+        if pronoun not in THIRD_PERSON:
+            return ""
+
+        # Nearest sentence first: names earlier in this one, then recent ones
+        groups = [[name for name in self._named(sentence, position) if name != self.speaker]]
+        for index in range(self._index - 1, self._index - self.window - 1, -1):
+            groups.append([name for i, name in self._recent if i == index and name != self.speaker])
+
+        for names in groups:
+            if not names:
+                continue
+            compatible = {name for name in names if self._compatible(name, pronoun)}
+            if len(compatible) == 1:
+                return compatible.pop()
+            if compatible:
+                return ""   # ambiguous
+            # Nobody here fits (e.g. "he" after "Sarah ... her"): look further back
+        return ""
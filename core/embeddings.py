@@ -0,0 +1,59 @@
+# Stored dense chunk embeddings for meeting Q&A.
+# When a dense retriever is configured (RAG_RETRIEVER=dense/hybrid-dense),
+# each meeting's LSA model and float16 chunk embeddings are computed once at
+# processing time and saved as one .npz file per meeting in default storage,
+# so Q&A only has to encode the question.
+
+import io
+import logging
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_DIR = "embeddings"
+
+
+def embeddings_path(meeting_id):
+    return f"{EMBEDDINGS_DIR}/meeting_{meeting_id}.npz"
+
+
+def save_embeddings(meeting_id, state):
+    """
+    Write a DenseRetriever state (see core.retrieval) for a meeting.
+
+    Returns:
+        Size of the stored file in bytes.
+    """
+    import numpy as np
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **state)
+    path = embeddings_path(meeting_id)
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    default_storage.save(path, ContentFile(buffer.getvalue()))
+    return buffer.tell()
+
+
+def load_embeddings(meeting_id):
+    """Stored state for a meeting as a dict of arrays, or None if missing/unreadable."""
+    import numpy as np
+
+    path = embeddings_path(meeting_id)
+    if not default_storage.exists(path):
+        return None
+    try:
+        with default_storage.open(path, "rb") as f:
+            with np.load(io.BytesIO(f.read()), allow_pickle=False) as data:
+                return {name: data[name] for name in data.files}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read embeddings for meeting {meeting_id}: {e}")
+        return None
+
+
+def delete_embeddings(meeting_id):
+    path = embeddings_path(meeting_id)
+    if default_storage.exists(path):
+        default_storage.delete(path)
@@ -0,0 +1,151 @@
+# Streaming export of meetings with their tasks.
+# Meetings are read with QuerySet.iterator(chunk_size=...) (a server-side
+# cursor on PostgreSQL) and their tasks are prefetched per chunk, so memory
+# stays flat however many meetings are exported. Each format is a generator
+# of text pieces that the view streams (StreamingHttpResponse) and the
+# export_meetings command writes to a file.
+
+import csv
+import json
+
+from django.db.models import Prefetch
+
+from .models import Meeting, Task
+
+FORMATS = {
+    # name: (content type, file extension)
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "csv": ("text/csv", "csv"),
+    "md": ("text/markdown", "md"),
+}
+
+DEFAULT_CHUNK_SIZE = 500
+BUFFER_SIZE = 64 * 1024   # characters per streamed piece
+
+
+def meetings(user=None, chunk_size=DEFAULT_CHUNK_SIZE, include_transcript=False):
+    """Meetings (all, or `user`'s) in id order, with tasks, read in chunks."""
+    columns = ['id', 'title', 'status', 'created_at', 'updated_at', 'summary', 'audio_file', 'user__username']
+    if include_transcript:
+        columns.append('transcript')
+    queryset = Meeting.objects.select_related('user').only(*columns).order_by('id').prefetch_related(
+        Prefetch('task_set', queryset=Task.objects.only(
+            'id', 'meeting', 'description', 'assignee', 'deadline_text', 'status',
+        ).order_by('id')),
+    )
+    if user is not None:
+        queryset = queryset.filter(user=user)
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def _record(meeting, include_transcript):
+    record = {
+        "id": meeting.id,
+        "title": meeting.title,
+        "owner": meeting.user.username if meeting.user else None,
+        "status": meeting.status,
+        "created_at": meeting.created_at.isoformat(),
+        "updated_at": meeting.updated_at.isoformat(),
+        "audio_file": meeting.audio_file.name or None,
+        "summary": meeting.summary,
+        "tasks": [
+            {
+                "id": task.id,
+                "description": task.description,
+                "assignee": task.assignee,
+                "deadline": task.deadline_text or "",
+                "status": task.status,
+            }
+            for task in meeting.task_set.all()
+        ],
+    }
+    if include_transcript:
+        record["transcript"] = meeting.transcript
+    return record
+
+
+def _jsonl(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+class _Line:
+    """File-like target for csv.writer that hands back each written row."""
+
+    def write(self, value):
+        return value
+
+
+def _csv(records, include_transcript):
+    writer = csv.writer(_Line())
+    header = ["id", "title", "owner", "status", "created_at", "updated_at", "audio_file", "summary", "tasks"]
+    if include_transcript:
+        header.append("transcript")
+    yield writer.writerow(header)
+    for record in records:
+        # One row per meeting; tasks go in one cell, a line each
+        tasks = "\n".join(
+            f"[{task['status']}] {task['description']}"
+            + (f" ({', '.join(filter(None, (task['assignee'], task['deadline'])))})"
+               if task['assignee'] or task['deadline'] else "")
+            for task in record["tasks"]
+        )
+        row = [record[name] if name != "tasks" else tasks for name in header]
+        yield writer.writerow(row)
+
+
+def _markdown(records, include_transcript):
+    for record in records:
+        parts = [f"# {record['title']}\n\n", f"*{record['created_at'][:10]} · {record['status']}*\n\n"]
+        if record["summary"]:
+            parts.append(f"## Summary\n\n{record['summary']}\n\n")
+        if record["tasks"]:
+            parts.append("## Action items\n\n")
+            for task in record["tasks"]:
+                details = ", ".join(filter(None, (task["assignee"], task["deadline"])))
+                check = "x" if task["status"] == "completed" else " "
+                parts.append(f"- [{check}] {task['description']}" + (f" — {details}" if details else "") + "\n")
+            parts.append("\n")
+        if include_transcript and record.get("transcript"):
+            parts.append(f"## Transcript\n\n{record['transcript']}\n\n")
+        parts.append("---\n\n")
+        yield "".join(parts)
+
+
+def _buffered(pieces, size=BUFFER_SIZE):
+    """
+    Join small pieces into ~`size` character chunks, so each write isn't one
+    row. The first piece goes out alone, so the download starts at once.
+    """
+    buffer, length = [], 0
+    for number, piece in enumerate(pieces):
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size or number == 0:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def export(fmt, user=None, include_transcript=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Generator of the export's text in `fmt` ("jsonl", "csv" or "md").
+    Nothing is queried until the first piece is requested.
+
+    Raises:
+        ValueError: Unknown format.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}")
+
+    def pieces():
+        records = (_record(m, include_transcript) for m in meetings(user, chunk_size, include_transcript))
+        if fmt == "jsonl":
+            yield from _jsonl(records)
+        elif fmt == "csv":
+            yield from _csv(records, include_transcript)
+        else:
+            yield from _markdown(records, include_transcript)
+
+    return _buffered(pieces())
@@ -0,0 +1,118 @@
+# Local extractive summarization (TextRank over TF-IDF sentence similarity).
+# Runs before the BART API calls to drop filler sentences, so long meetings
+# need fewer summarization requests, and doubles as an offline summarizer
+# when the HuggingFace API is unavailable.
+
+import re
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def split_sentences(text):
+    """Regex sentence segmentation at . ! ? (action-item extraction also splits at line breaks)."""
+    return [s.strip() for s in re.split(r'(?<=[.!?])\s+', text) if s.strip()]
+
+
+def rank_sentences(sentences, damping=0.85, max_iter=100, tol=1e-6):
+    """
+    Score sentences by TextRank centrality.
+
+    Builds a sparse cosine-similarity graph from TF-IDF vectors and runs
+    power iteration on it, so memory grows with the number of shared terms
+    rather than with sentences squared.
+
+    Args:
+        sentences: List of sentence strings.
+        damping: PageRank damping factor.
+        max_iter: Maximum power-iteration steps.
+        tol: L1 convergence tolerance.
+
+    Returns:
+        NumPy array of scores aligned with `sentences` (higher is more central).
+    """
+    from scipy import sparse
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    n = len(sentences)
+    if n <= 2:
+        return np.ones(n)
+
+    try:
+        tfidf = TfidfVectorizer(stop_words="english").fit_transform(sentences)
+    except ValueError:
+        # Only stop words / no vocabulary — fall back to document order
+        return np.linspace(1.0, 0.5, n)
+
+    # Rows are L2-normalised, so the dot product is the cosine similarity
+    similarity = (tfidf @ tfidf.T).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+
+    row_sums = np.asarray(similarity.sum(axis=1)).ravel()
+    inv = np.divide(1.0, row_sums, out=np.zeros_like(row_sums), where=row_sums > 0)
+    transition_t = (sparse.diags(inv) @ similarity).T.tocsr()
+    dangling = row_sums == 0
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        # Sentences with no neighbours spread their score uniformly
+        updated = (1 - damping) / n + damping * (transition_t @ scores + scores[dangling].sum() / n)
+        if np.abs(updated - scores).sum() < tol:
+            scores = updated
+            break
+        scores = updated
+    return scores
+
+
+def extract_summary(text, ratio=0.3, min_words=0, max_words=None):
+    """
+    Keep the most central sentences of `text`, in their original order.
+
+    Args:
+        text: Input text.
+        ratio: Fraction of the words to keep.
+        min_words: Never shrink below this many words.
+        max_words: Optional hard cap on kept words; a single sentence longer
+            than the cap is cut to its leading words.
+
+    Returns:
+        The extracted text.
+    """
+    sentences = split_sentences(text)
+    word_counts = np.array([len(s.split()) for s in sentences])
+    total_words = int(word_counts.sum())
+
+    budget = max(int(total_words * ratio), min_words)
+    if max_words is not None:
+        budget = min(budget, max_words)
+    if budget >= total_words or not sentences:
+        return text
+
+    # Sentences may overshoot the budget slightly, never the hard cap
+    limit = budget * 1.1 if max_words is None else min(budget * 1.1, max_words)
+    scores = rank_sentences(sentences)
+    keep = []
+    used = 0
+    for idx in np.argsort(-scores, kind="stable"):
+        if used >= budget:
+            break
+        if used and used + word_counts[idx] > limit:
+            continue
+        keep.append(idx)
+        used += word_counts[idx]
+
+    if max_words is not None and used > max_words:
+        # The top sentence alone is over the cap
+        (idx,) = keep
+        sentences[idx] = " ".join(sentences[idx].split()[:max_words])
+        used = max_words
+
+    extracted = " ".join(sentences[i] for i in sorted(keep))
+    logger.info(
+        f"Extractive stage kept {len(keep)}/{len(sentences)} sentences "
+        f"({total_words} -> {used} words)."
+    )
+    return extracted
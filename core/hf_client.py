@@ -4,15 +4,24 @@
 import os
 import time
 import json
+import base64
 import requests
 import logging
+from contextlib import nullcontext
 
 logger = logging.getLogger(__name__)
 
 HF_TOKEN = os.environ.get("HF_TOKEN", "")
 
+# Set AUDIO_PREPROCESSING=false to upload original audio files untouched
+AUDIO_PREPROCESSING = os.environ.get("AUDIO_PREPROCESSING", "true").lower() == "true"
+
 API_BASE = "https://router.huggingface.co/hf-inference/models"
 
+# Optional semaphore bounding concurrent API requests, shared across the
+# processes of a batch ingest (see limit_concurrency and core.batch)
+_api_slots = None
+
 MODELS = {
     "whisper": f"{API_BASE}/openai/whisper-large-v3",
     "summarizer": f"{API_BASE}/facebook/bart-large-cnn",
@@ -30,6 +39,12 @@ def _get_headers():
     return {"Authorization": f"Bearer {HF_TOKEN}"}
 
 
+def limit_concurrency(semaphore):
+    """Make every API request in this process hold `semaphore` (None to lift the limit)."""
+    global _api_slots
+    _api_slots = semaphore
+
+
 def call_hf_api(url, payload=None, data=None, content_type=None, max_retries=5):
     """
     Make a request to the HuggingFace Inference API with retry logic.
@@ -52,13 +67,15 @@ def call_hf_api(url, payload=None, data=None, content_type=None, max_retries=5):
 
     for attempt in range(1, max_retries + 1):
         try:
-            if data is not None:
-                if content_type:
-                    headers["Content-Type"] = content_type
-                response = requests.post(url, headers=headers, data=data)
-            else:
-                headers["Content-Type"] = "application/json"
-                response = requests.post(url, headers=headers, json=payload)
+            # Only the request holds a slot; cold-start waits below don't
+            with _api_slots or nullcontext():
+                if data is not None:
+                    if content_type:
+                        headers["Content-Type"] = content_type
+                    response = requests.post(url, headers=headers, data=data)
+                else:
+                    headers["Content-Type"] = "application/json"
+                    response = requests.post(url, headers=headers, json=payload)
 
             if response.status_code == 200:
                 return response.json()
@@ -111,32 +128,137 @@ _AUDIO_MIME_TYPES = {
 }
 
 
-def transcribe_audio(file_path):
+def _read_original_audio(file_path):
+    """Return (bytes, MIME type) of the untouched audio file."""
+    ext = os.path.splitext(file_path)[1].lower()
+    content_type = _AUDIO_MIME_TYPES.get(ext, "audio/wav")
+    logger.info(f"Detected content type: {content_type}")
+
+    with open(file_path, "rb") as f:
+        return f.read(), content_type
+
+
+def _prepare_audio(file_path, preprocess, base64_payload=False):
+    """
+    Return (bytes, MIME type, timestamp map) for upload.
+
+    The timestamp map comes from voice-activity detection and is None when
+    the original, uncut audio is uploaded. `base64_payload` only changes
+    the reported sizes: the original would be sent base64-encoded as well.
+    """
+    if preprocess and AUDIO_PREPROCESSING:
+        try:
+            from . import audio_processing
+            audio_bytes, content_type, stats = audio_processing.preprocess_audio(file_path, base64_payload)
+            if stats["processed_bytes"] < stats["original_bytes"]:
+                return audio_bytes, content_type, stats["timestamp_map"]
+            # Already compact (e.g. low-bitrate MP3) — re-encoding doesn't help
+        except Exception as e:
+            logger.warning(f"Audio preprocessing failed, uploading original file: {e}")
+
+    audio_bytes, content_type = _read_original_audio(file_path)
+    return audio_bytes, content_type, None
+
+
+def _build_segments(chunks, timestamp_map):
+    """
+    Turn Whisper timestamp chunks into (transcript, segments).
+
+    The transcript is the chunk texts joined by single spaces, so each
+    segment's char_start/char_end index exactly into it. Times are mapped
+    back to the original recording when silence was cut before upload.
+    """
+    from .audio_processing import map_to_original_time
+
+    parts = []
+    segments = []
+    offset = 0
+    for chunk in chunks:
+        text = (chunk.get("text") or "").strip()
+        if not text:
+            continue
+        start, end = (chunk.get("timestamp") or [None, None])[:2]
+        # Map Whisper's times (upload time) first; the fallbacks below are
+        # already in original-recording time
+        if timestamp_map:
+            if start is not None:
+                start = map_to_original_time(start, timestamp_map)
+            if end is not None:
+                end = map_to_original_time(end, timestamp_map)
+        if start is None:
+            start = segments[-1]["end"] if segments else 0.0
+        if end is None:
+            end = start
+
+        if parts:
+            offset += 1  # joining space
+        segments.append({
+            "start": round(float(start), 2),
+            "end": round(float(max(end, start)), 2),
+            "char_start": offset,
+            "char_end": offset + len(text),
+        })
+        parts.append(text)
+        offset += len(text)
+
+    return " ".join(parts), segments
+
+
+def transcribe_audio(file_path, preprocess=True, return_segments=False):
     """
     Transcribe an audio file using openai/whisper-large-v3.
 
     Args:
         file_path: Path to the audio file.
+        preprocess: Downmix/resample/re-encode locally before upload
+            (see core.audio_processing). Falls back to the original
+            bytes if preprocessing fails.
+        return_segments: Ask Whisper for timestamps and also return the
+            transcript segments.
 
     Returns:
-        Transcribed text string, or None on failure.
+        Transcribed text string, or None on failure. With
+        `return_segments`, a (text, segments) tuple where each segment is a
+        dict with start/end (seconds in the original recording) and
+        char_start/char_end (offsets into the text).
     """
     logger.info(f"Sending audio to HF Whisper API: {file_path}")
 
-    ext = os.path.splitext(file_path)[1].lower()
-    content_type = _AUDIO_MIME_TYPES.get(ext, "audio/wav")
-    logger.info(f"Detected content type: {content_type}")
-
-    with open(file_path, "rb") as f:
-        audio_bytes = f.read()
+    audio_bytes, content_type, timestamp_map = _prepare_audio(file_path, preprocess, base64_payload=return_segments)
+
+    started = time.perf_counter()
+    if return_segments:
+        # The raw-bytes request takes no parameters, so timestamps are only
+        # available through the JSON payload, with the audio base64-encoded
+        # (a third larger; preprocess_audio reports the bytes actually sent)
+        payload = {
+            "inputs": base64.b64encode(audio_bytes).decode("ascii"),
+            "parameters": {"return_timestamps": True},
+        }
+        sent = len(payload["inputs"])
+        result = call_hf_api(MODELS["whisper"], payload=payload)
+    else:
+        sent = len(audio_bytes)
+        result = call_hf_api(MODELS["whisper"], data=audio_bytes, content_type=content_type)
+    logger.info(
+        f"Whisper request ({sent / 1e6:.2f} MB sent) took {time.perf_counter() - started:.1f}s"
+    )
 
-    result = call_hf_api(MODELS["whisper"], data=audio_bytes, content_type=content_type)
+    if not (isinstance(result, dict) and "text" in result):
+        logger.error(f"Unexpected Whisper API response: {result}")
+        return (None, []) if return_segments else None
 
-    if isinstance(result, dict) and "text" in result:
+    if not return_segments:
         return result["text"].strip()
 
-    logger.error(f"Unexpected Whisper API response: {result}")
-    return None
+    chunks = result.get("chunks") or []
+    if not chunks:
+        logger.warning("Whisper returned no timestamp chunks; storing transcript without segments.")
+        return result["text"].strip(), []
+
+    text, segments = _build_segments(chunks, timestamp_map)
+    logger.info(f"Transcript split into {len(segments)} timestamped segments.")
+    return text, segments
 
 
 def summarize_text(text, max_length=150, min_length=30):
@@ -0,0 +1,96 @@
+# Precomputed "meeting insights".
+# Most Q&A traffic is the same handful of questions (topics, owners,
+# decisions, deadlines, risks). After a meeting completes they are answered
+# together in one batched Groq call and stored on Meeting.insights; the Q&A
+# endpoint serves matching questions from there and only runs live RAG for
+# anything else.
+
+import re
+import logging
+
+from .context_packer import estimate_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+# key -> (canonical question, shown as a suggestion chip; paraphrases matched in full)
+INSIGHT_QUESTIONS = {
+    "topics": (
+        "What were the main topics?",
+        r"(what (were|are) )?(the )?(main|key) (topics|points|themes)( discussed| covered)?"
+        r"|what (was|were) (discussed|covered)",
+    ),
+    "owners": (
+        "Who has action items?",
+        r"who (has|have|owns|got) (the |any )?action items"
+        r"|(what are |list )?(the )?action items( and (their )?owners)?"
+        r"|who is responsible for what|what are the next steps",
+    ),
+    "decisions": (
+        "What decisions were made?",
+        r"what decisions (were|have been) (made|taken|reached)"
+        r"|(what (were|are) |list )?(the )?(key )?decisions( made)?|what was decided",
+    ),
+    "deadlines": (
+        "What are the deadlines?",
+        r"(what (are|were) |list )?(the |any )?(key |upcoming )?(deadlines|due dates)"
+        r"|when is everything due",
+    ),
+    "risks": (
+        "What risks were raised?",
+        r"what (risks|concerns|blockers)( were| have been)? (raised|identified|mentioned)"
+        r"|(what (are|were) |list )?(the |any )?(open )?(risks|concerns|blockers)",
+    ),
+}
+
+_PATTERNS = {key: re.compile(pattern) for key, (_, pattern) in INSIGHT_QUESTIONS.items()}
+
+
+def _normalize(question):
+    text = re.sub(r"[^\w\s]", " ", question.lower())
+    text = re.sub(r"\s+", " ", text).strip()
+    text = re.sub(r"^(please |can you (tell me |list )?)", "", text)
+    return re.sub(r" (in|from|during|of) (this|the) meeting$", "", text)
+
+
+def match_insight(question):
+    """
+    Insight key for a question, or None. Only the canonical questions and
+    close paraphrases match, so specific questions ("who approves the
+    budget?") still go to live RAG.
+    """
+    text = _normalize(question)
+    for key, (canonical, _) in INSIGHT_QUESTIONS.items():
+        if text == _normalize(canonical) or _PATTERNS[key].fullmatch(text):
+            return key
+    return None
+
+
+def build_context(transcript, summary, budget_tokens):
+    """
+    Summary plus transcript for the insights prompt. Transcripts over the
+    token budget are shortened with the local extractive summarizer, then
+    cut to the budget, since the words-per-token ratio is only an estimate.
+    """
+    transcript = transcript or ""
+    summary_part = f"Summary:\n{summary}\n\n" if summary else ""
+    remaining = max(0, budget_tokens - estimate_tokens(summary_part))
+    if estimate_tokens(transcript) > remaining:
+        from .extractive import extract_summary
+        # ~0.75 words per token
+        transcript = extract_summary(transcript, ratio=1.0, max_words=max(1, int(remaining * 0.75)))
+        transcript = truncate_to_tokens(transcript, remaining)
+    return f"{summary_part}Transcript:\n{transcript}"
+
+
+def clean_insights(data):
+    """Keep known keys with non-empty string answers from the model's JSON reply."""
+    if not isinstance(data, dict):
+        return {}
+    cleaned = {}
+    for key in INSIGHT_QUESTIONS:
+        answer = data.get(key)
+        if isinstance(answer, list):
+            answer = "\n".join(f"- {item}" for item in answer if str(item).strip())
+        if isinstance(answer, str) and answer.strip():
+            cleaned[key] = answer.strip()
+    return cleaned
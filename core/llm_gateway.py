@@ -0,0 +1,322 @@
+# Managed gateway for Groq chat completions.
+# One pooled client per process, a bounded number of in-flight requests,
+# fair round-robin queuing between users, explicit timeouts, retry with
+# backoff on 429/5xx, and rolling queue/latency metrics. AsyncLLMGateway is
+# the asyncio counterpart used by the async views (one per event loop).
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque, OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class LLMGatewayBusy(Exception):
+    """Raised when a request cannot be admitted (queue full or wait timed out)."""
+
+    def __init__(self, message, retry_after=5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    __slots__ = ("granted",)
+
+    def __init__(self):
+        self.granted = False
+
+
+class FairLimiter:
+    """
+    Bounded semaphore that admits waiters round-robin by key (e.g. user id),
+    so one user's burst can't starve everyone else.
+    """
+
+    def __init__(self, max_concurrency, max_queue):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._cond = threading.Condition()
+        self._active = 0
+        self._queued = 0
+        self._waiting = OrderedDict()  # key -> deque of tickets
+        self._rotation = deque()       # keys with waiting tickets, in turn order
+
+    @property
+    def active(self):
+        return self._active
+
+    @property
+    def queued(self):
+        return self._queued
+
+    def _dispatch(self):
+        while self._active < self.max_concurrency and self._rotation:
+            key = self._rotation.popleft()
+            tickets = self._waiting[key]
+            tickets.popleft().granted = True
+            self._active += 1
+            self._queued -= 1
+            if tickets:
+                self._rotation.append(key)
+            else:
+                del self._waiting[key]
+        self._cond.notify_all()
+
+    def acquire(self, key, timeout):
+        with self._cond:
+            if self._active < self.max_concurrency and not self._rotation:
+                self._active += 1
+                return
+            if self._queued >= self.max_queue:
+                raise LLMGatewayBusy("Too many questions are waiting. Please try again shortly.")
+
+            ticket = _Ticket()
+            if key not in self._waiting:
+                self._waiting[key] = deque()
+                self._rotation.append(key)
+            self._waiting[key].append(ticket)
+            self._queued += 1
+
+            deadline = time.monotonic() + timeout
+            while not ticket.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting[key].remove(ticket)
+                    self._queued -= 1
+                    if not self._waiting[key]:
+                        del self._waiting[key]
+                        self._rotation.remove(key)
+                    raise LLMGatewayBusy("The assistant is busy. Please try again in a moment.")
+                self._cond.wait(remaining)
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._dispatch()
+
+
+class AsyncFairLimiter:
+    """
+    asyncio version of FairLimiter: waiters are futures on the current event
+    loop instead of threads blocked on a condition variable.
+    """
+
+    def __init__(self, max_concurrency, max_queue):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._active = 0
+        self._queued = 0
+        self._waiting = OrderedDict()  # key -> deque of futures
+        self._rotation = deque()
+
+    @property
+    def active(self):
+        return self._active
+
+    @property
+    def queued(self):
+        return self._queued
+
+    def _dispatch(self):
+        while self._active < self.max_concurrency and self._rotation:
+            key = self._rotation.popleft()
+            waiters = self._waiting[key]
+            waiters.popleft().set_result(None)
+            self._active += 1
+            self._queued -= 1
+            if waiters:
+                self._rotation.append(key)
+            else:
+                del self._waiting[key]
+
+    def _withdraw(self, key, waiter):
+        self._waiting[key].remove(waiter)
+        self._queued -= 1
+        if not self._waiting[key]:
+            del self._waiting[key]
+            self._rotation.remove(key)
+
+    async def acquire(self, key, timeout):
+        if self._active < self.max_concurrency and not self._rotation:
+            self._active += 1
+            return
+        if self._queued >= self.max_queue:
+            raise LLMGatewayBusy("Too many questions are waiting. Please try again shortly.")
+
+        waiter = asyncio.get_running_loop().create_future()
+        if key not in self._waiting:
+            self._waiting[key] = deque()
+            self._rotation.append(key)
+        self._waiting[key].append(waiter)
+        self._queued += 1
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                # Granted at the same moment; hand the slot on
+                self.release()
+            else:
+                self._withdraw(key, waiter)
+                waiter.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                raise LLMGatewayBusy("The assistant is busy. Please try again in a moment.") from None
+            raise
+
+    def release(self):
+        self._active -= 1
+        self._dispatch()
+
+
+class LLMGateway:
+    """
+    Wraps a Groq client's chat.completions.create with admission control,
+    timeouts, retries and metrics. Thread-safe; share one per process.
+    """
+
+    RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+    limiter_class = FairLimiter
+
+    def __init__(self, client, max_concurrency=4, timeout=30.0, max_retries=3,
+                 max_queue=50, queue_timeout=20.0, latency_window=500):
+        self.client = client
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.queue_timeout = queue_timeout
+        self.limiter = self.limiter_class(max_concurrency, max_queue)
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._queue_waits = deque(maxlen=latency_window)
+        self._counters = {"requests": 0, "retries": 0, "rejected": 0, "errors": 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def _record(self, queued_at, started):
+        finished = time.perf_counter()
+        with self._lock:
+            self._queue_waits.append(started - queued_at)
+            self._latencies.append(finished - started)
+
+    def _retry_delay(self, attempt, error):
+        """Exponential backoff with jitter, honouring Retry-After when sent."""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), 30.0)
+            except ValueError:
+                pass
+        return min(0.5 * (2 ** attempt), 8.0) * (0.5 + random.random())
+
+    def _is_retryable(self, error):
+        import groq
+        if isinstance(error, (groq.APITimeoutError, groq.APIConnectionError)):
+            return True
+        return isinstance(error, groq.APIStatusError) and error.status_code in self.RETRYABLE_STATUS
+
+    def chat(self, user_key=None, **create_kwargs):
+        """
+        Run a chat completion on behalf of `user_key`.
+
+        Args:
+            user_key: Fair-queuing key (e.g. the user id); None shares one lane.
+            **create_kwargs: Passed to client.chat.completions.create.
+
+        Returns:
+            The completion response.
+
+        Raises:
+            LLMGatewayBusy: The request could not be admitted in time.
+        """
+        queued_at = time.perf_counter()
+        try:
+            self.limiter.acquire(user_key, self.queue_timeout)
+        except LLMGatewayBusy:
+            self._count("rejected")
+            logger.warning(f"LLM gateway rejected request (queue depth {self.limiter.queued}).")
+            raise
+
+        started = time.perf_counter()
+        try:
+            self._count("requests")
+            for attempt in range(self.max_retries + 1):
+                try:
+                    return self.client.chat.completions.create(timeout=self.timeout, **create_kwargs)
+                except Exception as e:
+                    if attempt >= self.max_retries or not self._is_retryable(e):
+                        self._count("errors")
+                        raise
+                    delay = self._retry_delay(attempt, e)
+                    self._count("retries")
+                    logger.warning(f"Groq request failed ({e}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                    time.sleep(delay)
+        finally:
+            self.limiter.release()
+            self._record(queued_at, started)
+
+    @staticmethod
+    def _percentile(values, q):
+        if not values:
+            return None
+        ordered = sorted(values)
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    def metrics(self):
+        """Snapshot of queue depth, in-flight requests, counters and latency percentiles."""
+        with self._lock:
+            latencies = list(self._latencies)
+            waits = list(self._queue_waits)
+            counters = dict(self._counters)
+        return {
+            "in_flight": self.limiter.active,
+            "queue_depth": self.limiter.queued,
+            "max_concurrency": self.limiter.max_concurrency,
+            **counters,
+            "latency_p50_s": self._percentile(latencies, 0.5),
+            "latency_p95_s": self._percentile(latencies, 0.95),
+            "queue_wait_p50_s": self._percentile(waits, 0.5),
+            "queue_wait_p95_s": self._percentile(waits, 0.95),
+        }
+
+
+class AsyncLLMGateway(LLMGateway):
+    """
+    LLMGateway for an async Groq client (groq.AsyncGroq). Bound to the event
+    loop it is first used on; waiting requests hold no thread.
+    """
+
+    limiter_class = AsyncFairLimiter
+
+    async def achat(self, user_key=None, **create_kwargs):
+        """Async `chat`: same admission control, retries and metrics."""
+        queued_at = time.perf_counter()
+        try:
+            await self.limiter.acquire(user_key, self.queue_timeout)
+        except LLMGatewayBusy:
+            self._count("rejected")
+            logger.warning(f"LLM gateway rejected request (queue depth {self.limiter.queued}).")
+            raise
+
+        started = time.perf_counter()
+        try:
+            self._count("requests")
+            for attempt in range(self.max_retries + 1):
+                try:
+                    return await self.client.chat.completions.create(timeout=self.timeout, **create_kwargs)
+                except Exception as e:
+                    if attempt >= self.max_retries or not self._is_retryable(e):
+                        self._count("errors")
+                        raise
+                    delay = self._retry_delay(attempt, e)
+                    self._count("retries")
+                    logger.warning(f"Groq request failed ({e}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+        finally:
+            self.limiter.release()
+            self._record(queued_at, started)
@@ -0,0 +1,72 @@
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply the audio retention policy: transcode processed recordings older than "
+        "AUDIO_ARCHIVE_AFTER_DAYS to low-bitrate Opus and delete those older than "
+        "AUDIO_DELETE_AFTER_DAYS. Transcripts and results are kept. Meant to run daily (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archive-after', type=int, default=settings.AUDIO_ARCHIVE_AFTER_DAYS,
+                            help="Days before audio is archived; 0 skips archiving (default: AUDIO_ARCHIVE_AFTER_DAYS).")
+        parser.add_argument('--delete-after', type=int, default=settings.AUDIO_DELETE_AFTER_DAYS,
+                            help="Days before audio is deleted; 0 skips deleting (default: AUDIO_DELETE_AFTER_DAYS).")
+        parser.add_argument('--bitrate', default=settings.AUDIO_ARCHIVE_BITRATE,
+                            help="Opus bitrate of archive copies (default: AUDIO_ARCHIVE_BITRATE).")
+        parser.add_argument('--limit', type=int, help="Handle at most this many files per step.")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would change without writing.")
+
+    def handle(self, *args, **options):
+        archive_after, delete_after = options['archive_after'], options['delete_after']
+        if archive_after < 0 or delete_after < 0:
+            raise CommandError("Ages must be 0 (off) or a number of days.")
+        if not archive_after and not delete_after:
+            raise CommandError("Nothing to do: set AUDIO_ARCHIVE_AFTER_DAYS / AUDIO_DELETE_AFTER_DAYS "
+                               "or pass --archive-after / --delete-after.")
+        dry_run = options['dry_run']
+        prefix = "[dry run] " if dry_run else ""
+
+        # Deleting first, so audio about to be deleted isn't transcoded
+        deleted = deleted_bytes = 0
+        gone = set()
+        if delete_after:
+            due = retention.due_files(('original', 'archived'), delete_after, options['limit'])
+            for name, meeting_ids in due.items():
+                gone.add(name)
+                reclaimed = retention.delete_file(name, meeting_ids, dry_run)
+                deleted += 1
+                deleted_bytes += reclaimed
+                self.stdout.write(f"{prefix}Deleted {name} (meetings {', '.join(map(str, meeting_ids))}): "
+                                  f"{reclaimed / 1e6:.1f} MB")
+
+        archived = kept = failed = archived_bytes = 0
+        if archive_after and (not delete_after or archive_after < delete_after):
+            due = retention.due_files(('original',), archive_after, options['limit'])
+            for name, meeting_ids in due.items():
+                if name in gone:   # only possible in a dry run
+                    continue
+                try:
+                    reclaimed = retention.archive_file(name, meeting_ids, options['bitrate'], dry_run)
+                except (OSError, RuntimeError, subprocess.CalledProcessError) as e:
+                    failed += 1
+                    self.stderr.write(f"Could not archive {name}: {e}")
+                    continue
+                if not reclaimed:
+                    kept += 1
+                    continue
+                archived += 1
+                archived_bytes += reclaimed
+                self.stdout.write(f"{prefix}Archived {name} (meetings {', '.join(map(str, meeting_ids))}): "
+                                  f"{reclaimed / 1e6:.1f} MB reclaimed")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Deleted {deleted} file(s), archived {archived} ({kept} kept as is, {failed} failed); "
+            f"reclaimed {(deleted_bytes + archived_bytes) / 1e6:.1f} MB."
+        ))
@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from core.retrieval import build_retriever, evaluate, CrossFeatureReranker
+
+DEFAULT_DATASET = Path(__file__).resolve().parents[2] / 'benchmarks' / 'retrieval_questions.json'
+
+
+class Command(BaseCommand):
+    help = "Evaluate RAG retrievers offline (recall@k, MRR, latency) against a labeled question set."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', default=str(DEFAULT_DATASET),
+                            help="JSON list of {chunks: [...], questions: [{question, relevant: [idx]}]}.")
+        parser.add_argument('-k', type=int, default=3, help="Cut-off for recall@k.")
+        parser.add_argument('--retrievers', default='tfidf,bm25,dense,hybrid,hybrid-dense',
+                            help="Comma-separated retriever names.")
+
+    def handle(self, *args, **options):
+        with open(options['dataset'], encoding='utf-8') as f:
+            dataset = json.load(f)
+        k = options['k']
+
+        self.stdout.write(f"{'retriever':<24} {'recall@' + str(k):>9} {'MRR':>6} {'index ms':>9} {'query ms':>9}")
+        for name in options['retrievers'].split(','):
+            for rerank in (False, True):
+                result = evaluate(
+                    build_retriever(name.strip()), dataset, k=k,
+                    reranker=CrossFeatureReranker() if rerank else None,
+                )
+                label = name.strip() + (" + rerank" if rerank else "")
+                self.stdout.write(
+                    f"{label:<24} {result['recall_at_k']:>9.2f} {result['mrr']:>6.2f} "
+                    f"{result['index_ms']:>9.2f} {result['query_ms']:>9.2f}"
+                )
@@ -0,0 +1,74 @@
+import hashlib
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Meeting
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill content hashes for uploaded audio and collapse identical "
+        "files so every recording is stored once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report what would change without writing.")
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        # 1. Hash any meeting audio that predates upload hashing
+        missing = Meeting.objects.filter(content_hash='', audio_tier='original').exclude(audio_file='').exclude(audio_file__isnull=True)
+        new_hashes = {}
+        for meeting in missing.iterator():
+            storage = meeting.audio_file.storage
+            if not storage.exists(meeting.audio_file.name):
+                self.stderr.write(f"Missing file for meeting {meeting.id}: {meeting.audio_file.name}")
+                continue
+            hasher = hashlib.sha256()
+            with storage.open(meeting.audio_file.name, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    hasher.update(chunk)
+            new_hashes[meeting.id] = hasher.hexdigest()
+            if not dry_run:
+                Meeting.objects.filter(pk=meeting.pk).update(content_hash=new_hashes[meeting.id])
+
+        # 2. Group meetings by hash; the oldest file in each group is kept.
+        # Archived copies (apply_audio_retention) differ from the hashed bytes
+        groups = defaultdict(list)
+        rows = (
+            Meeting.objects.filter(audio_tier='original').exclude(audio_file='').exclude(audio_file__isnull=True)
+            .order_by('created_at').values_list('id', 'content_hash', 'audio_file')
+        )
+        for meeting_id, content_hash, name in rows:
+            content_hash = new_hashes.get(meeting_id, content_hash)
+            if content_hash:
+                groups[content_hash].append((meeting_id, name))
+
+        storage = Meeting._meta.get_field('audio_file').storage
+        reclaimed = 0
+        removed = 0
+        for members in groups.values():
+            keep = members[0][1]
+            duplicates = {name for _, name in members if name != keep}
+            if not duplicates:
+                continue
+            if not dry_run:
+                # Queryset updates skip auto_now; the cached page fragments are keyed on updated_at
+                Meeting.objects.filter(id__in=[mid for mid, name in members if name != keep]).update(
+                    audio_file=keep, updated_at=timezone.now(),
+                )
+            for name in duplicates:
+                if storage.exists(name):
+                    reclaimed += storage.size(name)
+                    removed += 1
+                    if not dry_run:
+                        storage.delete(name)
+
+        prefix = "[dry run] " if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Hashed {len(new_hashes)} file(s); removed {removed} duplicate file(s), "
+            f"reclaimed {reclaimed / 1e6:.1f} MB."
+        ))
@@ -0,0 +1,41 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core import export
+
+
+class Command(BaseCommand):
+    help = (
+        "Export meetings with their tasks as JSON Lines, CSV or Markdown. Meetings are "
+        "read in chunks and written as they arrive, so memory use doesn't grow with the export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=tuple(export.FORMATS), default='jsonl', help="Output format (default: jsonl).")
+        parser.add_argument('--output', '-o', help="File to write (default: stdout).")
+        parser.add_argument('--user', help="Only this user's meetings (default: all users).")
+        parser.add_argument('--transcript', action='store_true', help="Include full transcripts.")
+        parser.add_argument('--chunk-size', type=int, default=export.DEFAULT_CHUNK_SIZE,
+                            help="Meetings fetched per database round trip.")
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"Unknown user {options['user']!r}.")
+
+        pieces = export.export(options['format'], user, options['transcript'], options['chunk_size'])
+        if not options['output']:
+            for piece in pieces:
+                self.stdout.write(piece, ending='')
+            return
+
+        written = 0
+        with open(options['output'], 'w', encoding='utf-8', newline='') as out:
+            for piece in pieces:
+                out.write(piece)
+                written += len(piece)
+        self.stderr.write(f"Wrote {written / (1024 * 1024):.1f} MB to {options['output']}.")
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Meeting
+from core.rag_processor import MeetingRAGProcessor
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute Q&A insights (topics, owners, decisions, deadlines, risks) "
+        "for completed meetings that don't have them yet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('meeting_ids', nargs='*', type=int, help="Only these meetings (default: all).")
+        parser.add_argument('--force', action='store_true', help="Regenerate existing insights too.")
+
+    def handle(self, *args, **options):
+        meetings = Meeting.objects.filter(status='completed').exclude(transcript='')
+        if options['meeting_ids']:
+            meetings = meetings.filter(id__in=options['meeting_ids'])
+        if not options['force']:
+            meetings = meetings.filter(insights={})
+
+        rag = MeetingRAGProcessor()
+        done = failed = 0
+        for meeting in meetings.order_by('id').iterator():
+            try:
+                meeting.insights = rag.generate_insights(meeting.transcript, meeting.summary, user_key=meeting.user_id)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Meeting {meeting.id}: {e}")
+                continue
+            meeting.save(update_fields=['insights'])
+            done += 1
+            self.stdout.write(f"Meeting {meeting.id}: {len(meeting.insights)} insight(s)")
+
+        self.stdout.write(self.style.SUCCESS(f"Generated insights for {done} meeting(s), {failed} failed."))
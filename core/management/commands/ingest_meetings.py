@@ -0,0 +1,247 @@
+import os
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core import batch, uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Import archived recordings (and .txt/.md transcripts) as meetings: scan a directory "
+        "or read a CSV/JSONL manifest, process files across a process pool with a bounded "
+        "number of concurrent API requests, checkpoint for resume, and report throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="Directory to scan, or a .csv/.jsonl manifest (path, title, user).")
+        parser.add_argument('--user', required=True, help="Owner of the meetings (manifest rows may name another).")
+        parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                            help="Worker processes (default: up to 4).")
+        parser.add_argument('--api-concurrency', type=int, default=4,
+                            help="Maximum concurrent HuggingFace API requests across all workers.")
+        parser.add_argument('--checkpoint',
+                            help="Checkpoint file (default: .ingest-checkpoint.json in the directory, "
+                                 "or <manifest>.checkpoint.json).")
+        parser.add_argument('--no-recursive', action='store_true', help="Don't descend into subdirectories.")
+        parser.add_argument('--no-insights', action='store_true', help="Skip precomputing Q&A insights.")
+        parser.add_argument('--dry-run', action='store_true', help="Only show what would be imported.")
+
+    def handle(self, *args, **options):
+        source = options['source']
+        if options['workers'] < 1 or options['api_concurrency'] < 1:
+            raise CommandError("--workers and --api-concurrency must be at least 1.")
+        if os.path.isdir(source):
+            items = batch.scan_directory(source, recursive=not options['no_recursive'])
+            checkpoint_path = options['checkpoint'] or os.path.join(source, '.ingest-checkpoint.json')
+        elif os.path.isfile(source):
+            try:
+                items = batch.read_manifest(source)
+            except (ValueError, KeyError) as e:
+                raise CommandError(f"Invalid manifest: {e}")
+            checkpoint_path = options['checkpoint'] or f"{source}.checkpoint.json"
+        else:
+            raise CommandError(f"{source} is neither a directory nor a manifest file.")
+
+        self.outcomes = []
+        checkpoint = batch.Checkpoint(checkpoint_path)
+        candidates = self._plan(items, options['user'])
+        self.stdout.write(f"{len(items)} file(s), {len(candidates)} supported (checkpoint {checkpoint_path}).")
+        if options['dry_run']:
+            self._dry_run(candidates, checkpoint)
+            return
+
+        started = time.perf_counter()
+        self.total = len(candidates)
+        self.done = 0
+        self.dense = 'dense' in getattr(settings, 'RAG_RETRIEVER', 'hybrid')
+        self.rag = None
+        insights = not options['no_insights'] and getattr(settings, 'RAG_INSIGHTS', True)
+        try:
+            self._run_pool(candidates, checkpoint, options['workers'], options['api_concurrency'], insights)
+        except KeyboardInterrupt:
+            self.stderr.write("Interrupted; finished files are checkpointed, rerun the command to resume.")
+        finally:
+            self._report(time.perf_counter() - started)
+
+    def _plan(self, items, default_user):
+        """Resolve kinds and owners, dropping missing, unsupported and oversized files."""
+        users = {}
+
+        def user_id(username):
+            if username not in users:
+                user = User.objects.filter(username=username).only('id').first()
+                if user is None:
+                    raise CommandError(f"Unknown user {username!r}.")
+                users[username] = user.id
+            return users[username]
+
+        candidates = []
+        for item in items:
+            item['kind'] = batch.file_kind(item['path'])
+            if not item['kind'] or not os.path.isfile(item['path']):
+                self.stderr.write(f"Skipping {item['path']}: missing or unsupported file.")
+                continue
+            item['bytes'] = os.path.getsize(item['path'])
+            if item['kind'] == 'audio' and item['bytes'] > uploads.MAX_AUDIO_SIZE:
+                self.stderr.write(f"Skipping {item['path']}: larger than {uploads.MAX_AUDIO_SIZE // (1024 * 1024)} MB.")
+                continue
+            item['user_id'] = user_id(item['user'] or default_user)
+            candidates.append(item)
+        return candidates
+
+    def _dry_run(self, candidates, checkpoint):
+        """List what a run would do; hashes here, in this process, since nothing else runs."""
+        first_of_hash = set()
+        for item in candidates:
+            item['content_hash'] = uploads.hash_file(item['path'])
+            if checkpoint.is_done(item):
+                action = 'done'
+            elif item['kind'] == 'audio' and item['content_hash'] in first_of_hash:
+                action = 'twin'
+            else:
+                first_of_hash.add(item['content_hash'])
+                action = item['kind']
+            self.stdout.write(f"  {action:5} {item['path']}")
+
+    def _admit(self, item, checkpoint, first_of_hash, waiting, ready):
+        """
+        Route a hashed item: skip it (checkpoint), park it behind an identical
+        file of this batch, reuse an earlier meeting's results, or queue it
+        for processing.
+        """
+        item['key'] = checkpoint.key(item)
+        if checkpoint.is_done(item):
+            self._outcome(item, 'skipped', 0.0, "already done (checkpoint)")
+            return
+        if item['kind'] == 'audio':
+            # Identical audio in one batch is processed once; the rest reuse the results
+            if item['content_hash'] in first_of_hash:
+                waiting.setdefault(item['content_hash'], []).append(item)
+                return
+            # Audio already processed for an earlier meeting is reused without any API call
+            duplicate = uploads.find_duplicate(item['content_hash'])
+            if duplicate is not None and duplicate.status == 'completed':
+                self._reused(item, duplicate, checkpoint)
+                return
+            item['stored_audio'] = duplicate.audio_file.name if duplicate is not None else None
+            first_of_hash[item['content_hash']] = item
+        ready.append(item)
+
+    def _run_pool(self, candidates, checkpoint, workers, api_concurrency, insights):
+        if not candidates:
+            return
+
+        # Files are hashed in the pool as well; each is routed as its hash comes back
+        hashing = iter(candidates)
+        ready = deque()
+        first_of_hash, waiting = {}, {}
+        context = multiprocessing.get_context()
+        api_slots = context.BoundedSemaphore(api_concurrency)
+        # Workers never touch the database; don't let forked children inherit connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=batch.init_worker, initargs=(api_slots, insights)) as pool:
+            in_flight = {}
+            try:
+                while True:
+                    # Keep a short queue so an interrupt loses little submitted work;
+                    # files ready for processing go ahead of more hashing
+                    while len(in_flight) < workers * 2:
+                        if ready:
+                            item = ready.popleft()
+                            in_flight[pool.submit(batch.process_file, {
+                                'key': item['key'], 'path': item['path'], 'kind': item['kind'],
+                            })] = ('process', item)
+                        else:
+                            item = next(hashing, None)
+                            if item is None:
+                                break
+                            in_flight[pool.submit(uploads.hash_file, item['path'])] = ('hash', item)
+                    if not in_flight:
+                        break
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        stage, item = in_flight.pop(future)
+                        if stage == 'hash':
+                            self._hashed(item, future, checkpoint, first_of_hash, waiting, ready)
+                            continue
+                        twins = []
+                        if item['kind'] == 'audio':
+                            first_of_hash.pop(item['content_hash'], None)
+                            twins = waiting.pop(item['content_hash'], [])
+                        self._finished(item, future.result(), twins, checkpoint)
+            except KeyboardInterrupt:
+                for future in in_flight:
+                    future.cancel()
+                raise
+
+    def _hashed(self, item, future, checkpoint, first_of_hash, waiting, ready):
+        try:
+            item['content_hash'] = future.result()
+        except OSError as e:
+            self._outcome(item, 'failed', 0.0, f"failed: could not read the file ({e})")
+            return
+        self._admit(item, checkpoint, first_of_hash, waiting, ready)
+
+    def _finished(self, item, result, twins, checkpoint):
+        if 'error' in result:
+            for failed in [item, *twins]:
+                checkpoint.mark(failed, 'failed', error=result['error'])
+                self._outcome(failed, 'failed', result['seconds'], f"failed: {result['error']}")
+            return
+
+        meeting = batch.store_result(item, result, item.get('stored_audio'))
+        self._index(meeting)
+        checkpoint.mark(item, 'done', meeting_id=meeting.id, seconds=round(result['seconds'], 2))
+        self._outcome(item, 'processed', result['seconds'], f"meeting {meeting.id} ({result['seconds']:.1f}s)")
+        for twin in twins:
+            self._reused(twin, meeting, checkpoint)
+
+    def _reused(self, item, source, checkpoint):
+        meeting = batch.reuse_result(item, source)
+        self._index(meeting)
+        checkpoint.mark(item, 'done', meeting_id=meeting.id, reused_from=source.id)
+        self._outcome(item, 'reused', 0.0, f"meeting {meeting.id} (reused results of meeting {source.id})")
+
+    def _index(self, meeting):
+        """Store dense embeddings in this process when a dense retriever is configured."""
+        if not self.dense:
+            return
+        try:
+            if self.rag is None:
+                from core.rag_processor import MeetingRAGProcessor
+                self.rag = MeetingRAGProcessor()
+            self.rag.index_meeting(meeting)
+        except Exception as e:
+            self.stderr.write(f"Could not store embeddings for meeting {meeting.id}: {e}")
+
+    def _outcome(self, item, status, seconds, message):
+        self.done += 1
+        self.outcomes.append({'status': status, 'bytes': item['bytes'], 'seconds': seconds})
+        line = f"[{self.done}/{self.total}] {item['path']}: {message}"
+        self.stdout.write(self.style.ERROR(line) if status == 'failed' else line)
+
+    def _report(self, wall_seconds):
+        report = batch.throughput_report(self.outcomes, wall_seconds)
+        counts = report['counts']
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {counts.get('processed', 0)}, reused {counts.get('reused', 0)}, "
+            f"failed {counts.get('failed', 0)}, already done {counts.get('skipped', 0)} in {wall_seconds:.1f}s."
+        ))
+        if report['files_per_minute'] is not None and self.outcomes:
+            self.stdout.write(
+                f"Throughput: {report['files_per_minute']:.1f} files/min, "
+                f"{report['megabytes']:.1f} MB ({report['mb_per_minute']:.1f} MB/min)"
+            )
+        if report['file_seconds_p50'] is not None:
+            self.stdout.write(
+                f"Per-file processing: p50 {report['file_seconds_p50']:.1f}s, "
+                f"p95 {report['file_seconds_p95']:.1f}s"
+            )
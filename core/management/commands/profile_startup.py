@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import import_profile, BOOT_STATEMENT
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile worker boot (settings + URLconf) with `python -X importtime` "
+        "and fail if it exceeds the import budget or loads heavy AI modules."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help="Number of slowest imports to list.")
+        parser.add_argument('--budget-ms', type=int, default=None,
+                            help="Import-time budget (default: STARTUP_IMPORT_BUDGET_MS).")
+        parser.add_argument('--statement', default=BOOT_STATEMENT, help="Python code to profile.")
+
+    def handle(self, *args, **options):
+        budget = options['budget_ms'] or settings.STARTUP_IMPORT_BUDGET_MS
+        profile = import_profile(options['statement'])
+
+        self.stdout.write(f"{'module':<50} {'self ms':>9} {'cumul. ms':>10}")
+        for name, self_ms, cumulative_ms in profile['imports'][:options['top']]:
+            self.stdout.write(f"{name:<50} {self_ms:>9.1f} {cumulative_ms:>10.1f}")
+        self.stdout.write(
+            f"\nTotal import time: {profile['total_ms']:.0f} ms (budget {budget} ms), "
+            f"peak RSS: {profile['rss_mb']:.1f} MB"
+        )
+
+        problems = []
+        if profile['total_ms'] > budget:
+            problems.append(f"import time {profile['total_ms']:.0f} ms exceeds the {budget} ms budget")
+        if profile['heavy']:
+            problems.append(f"heavy modules imported at boot: {', '.join(profile['heavy'])}")
+        if problems:
+            raise CommandError("; ".join(problems))
+        self.stdout.write(self.style.SUCCESS("Startup is within budget."))
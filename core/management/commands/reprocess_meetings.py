@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Meeting
+from core import reprocess
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-run selected stages (summary, tasks, index, insights) of completed meetings "
+        "from their stored transcripts. Stages whose inputs are unchanged are skipped, "
+        "and unchanged BART chunk summaries are reused."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('meeting_ids', nargs='*', type=int, help="Only these meetings (default: all).")
+        parser.add_argument(
+            '--stage', action='append', choices=reprocess.STAGES, dest='stages',
+            help="Stage to run; repeat for several (default: all).",
+        )
+        parser.add_argument('--force', action='store_true', help="Run stages even when their inputs are unchanged.")
+        parser.add_argument('--dry-run', action='store_true', help="Only list each meeting's stale stages.")
+
+    def handle(self, *args, **options):
+        stages = tuple(options['stages'] or reprocess.STAGES)
+        meetings = Meeting.objects.filter(status='completed').exclude(transcript='')
+        if options['meeting_ids']:
+            meetings = meetings.filter(id__in=options['meeting_ids'])
+            missing = set(options['meeting_ids']) - set(meetings.values_list('id', flat=True))
+            if missing:
+                raise CommandError(f"Not completed or not found: {', '.join(map(str, sorted(missing)))}")
+
+        if options['dry_run']:
+            for meeting in meetings.order_by('id').iterator():
+                stale = [stage for stage in reprocess.stale_stages(meeting) if stage in stages]
+                self.stdout.write(f"Meeting {meeting.id}: {', '.join(stale) or 'up to date'}")
+            return
+
+        from core.ai_processor import MeetingAIProcessor
+        processor = MeetingAIProcessor()
+        rag = None
+        if {'index', 'insights'} & set(stages):
+            from core.rag_processor import MeetingRAGProcessor
+            rag = MeetingRAGProcessor()
+
+        totals = {"updated": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+        reused = summarized = 0
+        for meeting in meetings.order_by('id').iterator():
+            report = reprocess.reprocess(meeting, stages, force=options['force'], processor=processor, rag=rag)
+            parts = []
+            for stage in reprocess.STAGES:
+                if stage not in report:
+                    continue
+                status = report[stage]['status']
+                totals[status] += 1
+                parts.append(f"{stage} {status}")
+            summary = report.get('summary', {})
+            reused += summary.get('chunks_reused', 0)
+            summarized += summary.get('chunks_summarized', 0)
+            line = f"Meeting {meeting.id}: {', '.join(parts)}"
+            if report['stale']:
+                line += f" (still stale: {', '.join(report['stale'])})"
+            self.stdout.write(line)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Stages updated {totals['updated']}, unchanged {totals['unchanged']}, "
+            f"skipped {totals['skipped']}, failed {totals['failed']}; "
+            f"BART chunks reused {reused}, summarized {summarized}."
+        ))
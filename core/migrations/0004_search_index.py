@@ -0,0 +1,68 @@
+# Full-text search index for meetings and tasks (see core/search.py).
+# SQLite: FTS5 virtual tables keyed by the model id; they hold their own copy
+# of the indexed text, kept in sync by core/signals.py.
+# PostgreSQL: tsvector columns with GIN indexes on the model tables.
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE core_meeting_fts USING fts5("
+            "title, summary, transcript, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE core_task_fts USING fts5("
+            "description, assignee, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO core_meeting_fts (rowid, title, summary, transcript) "
+            "SELECT id, title, summary, transcript FROM core_meeting"
+        )
+        schema_editor.execute(
+            "INSERT INTO core_task_fts (rowid, description, assignee) "
+            "SELECT id, description, assignee FROM core_task"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE core_meeting ADD COLUMN search_vector tsvector")
+        schema_editor.execute("ALTER TABLE core_task ADD COLUMN search_vector tsvector")
+        schema_editor.execute(
+            "UPDATE core_meeting SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(summary, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(transcript, '')), 'C')"
+        )
+        schema_editor.execute(
+            "UPDATE core_task SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(assignee, '')), 'B')"
+        )
+        schema_editor.execute(
+            "CREATE INDEX core_meeting_search_gin ON core_meeting USING GIN (search_vector)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX core_task_search_gin ON core_task USING GIN (search_vector)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS core_meeting_fts")
+        schema_editor.execute("DROP TABLE IF EXISTS core_task_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE core_meeting DROP COLUMN IF EXISTS search_vector")
+        schema_editor.execute("ALTER TABLE core_task DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_task_deadline_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('start', models.FloatField()),
+                ('end', models.FloatField()),
+                ('char_start', models.PositiveIntegerField()),
+                ('char_end', models.PositiveIntegerField()),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segments', to='core.meeting')),
+            ],
+            options={
+                'ordering': ['meeting', 'position'],
+                'indexes': [models.Index(fields=['meeting', 'start'], name='segment_meeting_start_idx'), models.Index(fields=['meeting', 'char_start'], name='segment_meeting_char_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='transcriptsegment',
+            constraint=models.UniqueConstraint(fields=('meeting', 'position'), name='unique_segment_position'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_transcriptsegment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meeting',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
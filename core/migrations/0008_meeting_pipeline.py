@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_meeting_insights'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meeting',
+            name='pipeline',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_meeting_pipeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meeting',
+            name='audio_tier',
+            field=models.CharField(choices=[('original', 'Original'), ('archived', 'Archived'), ('deleted', 'Deleted')], default='original', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='audio_tiered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
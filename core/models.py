@@ -8,11 +8,21 @@ class Meeting(models.Model):
         ('completed', 'Completed'),
         ('failed', 'Failed'),
     ]
+    AUDIO_TIER_CHOICES = [
+        ('original', 'Original'),
+        ('archived', 'Archived'),
+        ('deleted', 'Deleted'),
+    ]
     
     title = models.CharField(max_length=200)
     audio_file = models.FileField(upload_to='meetings/', null=True, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # SHA-256 of the audio bytes
+    audio_tier = models.CharField(max_length=10, choices=AUDIO_TIER_CHOICES, default='original')  # see core.retention
+    audio_tiered_at = models.DateTimeField(null=True, blank=True)
     transcript = models.TextField(blank=True)
     summary = models.TextField(blank=True)
+    insights = models.JSONField(default=dict, blank=True)  # precomputed Q&A answers (see core.insights)
+    pipeline = models.JSONField(default=dict, blank=True)  # stage fingerprints and chunk summaries (see core.reprocess)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='processing')  
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -21,6 +31,57 @@ class Meeting(models.Model):
     def __str__(self):
         return self.title
 
+    def release_audio_file(self):
+        """
+        Delete the stored audio unless another meeting still references it
+        (identical uploads share one file; see core.uploads).
+        """
+        if not self.audio_file:
+            return False
+        shared = Meeting.objects.filter(audio_file=self.audio_file.name).exclude(pk=self.pk).exists()
+        if shared:
+            return False
+        self.audio_file.storage.delete(self.audio_file.name)
+        return True
+
+    def segments_for_span(self, char_start, char_end):
+        """Transcript segments overlapping the character range [char_start, char_end)."""
+        return self.segments.filter(char_end__gt=char_start, char_start__lt=char_end)
+
+    def segments_between(self, start, end):
+        """Transcript segments overlapping the time range [start, end) in seconds."""
+        return self.segments.filter(end__gt=start, start__lt=end)
+
+
+class TranscriptSegment(models.Model):
+    """
+    One timestamped Whisper segment. The text itself is not duplicated:
+    char_start/char_end index into Meeting.transcript.
+    """
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE, related_name='segments')
+    position = models.PositiveIntegerField()
+    start = models.FloatField()  # seconds in the original recording
+    end = models.FloatField()
+    char_start = models.PositiveIntegerField()
+    char_end = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['meeting', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['meeting', 'position'], name='unique_segment_position'),
+        ]
+        indexes = [
+            models.Index(fields=['meeting', 'start'], name='segment_meeting_start_idx'),
+            models.Index(fields=['meeting', 'char_start'], name='segment_meeting_char_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.meeting_id} [{self.start:.1f}s–{self.end:.1f}s]"
+
+    @property
+    def text(self):
+        return self.meeting.transcript[self.char_start:self.char_end]
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -0,0 +1,202 @@
+# Processing progress for meetings.
+# The pipeline publishes events (stage, chunk i/N, ETA) to the Django cache,
+# so status polling and the SSE stream never touch the database while a
+# meeting is processing. Stage durations are kept as moving averages and
+# drive the ETA of the next runs. With several workers, a shared cache
+# (settings.REDIS_URL) is needed for another worker to see the events.
+
+import re
+import time
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+STAGE_LABELS = {
+    "transcribe": "Transcribing speech",
+    "summarize": "Generating summary",
+    "extract": "Extracting action items",
+    "insights": "Preparing Q&A insights",
+}
+AUDIO_STAGES = ("transcribe", "summarize", "extract", "insights")
+TEXT_STAGES = ("summarize", "extract", "insights")
+
+STATE_TIMEOUT = 6 * 60 * 60   # seconds a progress entry is kept after its last event
+HISTORY_ALPHA = 0.3           # weight of the newest run in the stage-time averages
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9-]{8,64}")   # client-generated upload tokens (UUIDs)
+
+
+def _state_key(meeting_id):
+    return f"progress:meeting:{meeting_id}"
+
+
+def _token_key(token):
+    return f"progress:token:{token}"
+
+
+def _history_key(stage):
+    return f"progress:history:{stage}"
+
+
+def get_state(meeting_id):
+    """Latest progress event for a meeting, or None."""
+    return cache.get(_state_key(meeting_id))
+
+
+async def aget_state(meeting_id):
+    """Async `get_state`, for the async status views."""
+    return await cache.aget(_state_key(meeting_id))
+
+
+async def ameeting_for_token(token):
+    """(meeting_id, user_id) bound to an upload's progress token, or None."""
+    return await cache.aget(_token_key(token))
+
+
+def stage_history(stage):
+    """Moving averages {"seconds", "rate"} for a stage, or None before the first run."""
+    return cache.get(_history_key(stage))
+
+
+def record_stage(stage, seconds, size=None):
+    """Fold one stage run into its moving averages (rate = seconds per unit of size)."""
+    history = stage_history(stage) or {}
+    rate = seconds / size if size else None
+
+    def blend(old, new):
+        if new is None:
+            return old
+        return new if old is None else (1 - HISTORY_ALPHA) * old + HISTORY_ALPHA * new
+
+    cache.set(_history_key(stage), {
+        "seconds": blend(history.get("seconds"), seconds),
+        "rate": blend(history.get("rate"), rate),
+        "runs": history.get("runs", 0) + 1,
+    }, None)
+
+
+class ProgressTracker:
+    """
+    Publishes one meeting's progress. Call `start(stage)` at each stage,
+    `advance(done, total)` for chunks inside it, then `complete()` or
+    `fail()`. Every event bumps `version`, which the status endpoint uses
+    as its ETag.
+    """
+
+    def __init__(self, meeting_id, user_id, stages=AUDIO_STAGES):
+        self.meeting_id = meeting_id
+        self.user_id = user_id
+        self.stages = tuple(stages)
+        self.version = 0
+        self.stage = None
+        self.size = None
+        self.done = 0
+        self.total = None
+        self.started_at = time.time()
+        self.stage_started_at = self.started_at
+        # Identifies this run, so ETags from an earlier run of the meeting never match
+        self.run = int(self.started_at * 1000)
+
+    def bind_token(self, token):
+        """Let the upload page follow this meeting by a token it generated before the POST."""
+        if token and _TOKEN_RE.fullmatch(token):
+            cache.set(_token_key(token), (self.meeting_id, self.user_id), STATE_TIMEOUT)
+
+    def _finish_stage(self):
+        if self.stage is not None:
+            record_stage(self.stage, time.time() - self.stage_started_at, self.size)
+
+    def _eta(self):
+        """Seconds left: observed chunk rate for the current stage, history for the rest."""
+        now = time.time()
+        elapsed = now - self.stage_started_at
+        history = stage_history(self.stage) or {}
+        if self.total and self.done:
+            remaining = elapsed / self.done * (self.total - self.done)
+        elif history.get("rate") is not None and self.size:
+            remaining = max(0.0, history["rate"] * self.size - elapsed)
+        elif history.get("seconds") is not None:
+            remaining = max(0.0, history["seconds"] - elapsed)
+        else:
+            return None
+
+        # Stages that never ran (e.g. insights turned off) add nothing
+        for stage in self.stages[self.stages.index(self.stage) + 1:]:
+            later = stage_history(stage)
+            if later is not None:
+                remaining += later["seconds"]
+        return round(remaining)
+
+    def _publish(self, status, message=""):
+        self.version += 1
+        stage_index = self.stages.index(self.stage) if self.stage in self.stages else None
+        state = {
+            "meeting_id": self.meeting_id,
+            "user_id": self.user_id,
+            "run": self.run,
+            "version": self.version,
+            "status": status,
+            "stage": self.stage,
+            "stage_label": STAGE_LABELS.get(self.stage, ""),
+            "stage_index": stage_index,
+            "stage_count": len(self.stages),
+            "done": self.done,
+            "total": self.total,
+            "eta_seconds": self._eta() if status == "processing" and self.stage else None,
+            "elapsed_seconds": round(time.time() - self.started_at),
+            "message": message,
+            "as_of": time.time(),
+        }
+        try:
+            cache.set(_state_key(self.meeting_id), state, STATE_TIMEOUT)
+        except Exception as e:
+            # Progress is best-effort; never break processing over it
+            logger.warning(f"Could not publish progress for meeting {self.meeting_id}: {e}")
+        return state
+
+    def start(self, stage, size=None, total=None):
+        """
+        Enter `stage`. `size` is the stage's workload (audio MB, words) used
+        to scale the historical rate; `total` is its chunk count if known.
+        """
+        self._finish_stage()
+        self.stage = stage
+        self.size = size
+        self.done = 0
+        self.total = total
+        self.stage_started_at = time.time()
+        return self._publish("processing")
+
+    def advance(self, done, total=None):
+        """Report `done` of `total` chunks finished in the current stage."""
+        self.done = done
+        if total is not None:
+            self.total = total
+        return self._publish("processing")
+
+    def complete(self):
+        self._finish_stage()
+        self.stage = None
+        return self._publish("completed")
+
+    def fail(self, message=""):
+        self.stage = None
+        return self._publish("failed", message)
+
+
+class NullProgress:
+    """Stand-in tracker when nobody is following progress (e.g. management commands)."""
+
+    def start(self, stage, size=None, total=None):
+        pass
+
+    def advance(self, done, total=None):
+        pass
+
+    def complete(self):
+        pass
+
+    def fail(self, message=""):
+        pass
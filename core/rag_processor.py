@@ -1,138 +1,371 @@
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import json
+import hashlib
+import logging
+import weakref
+import asyncio
+import threading
+from collections import OrderedDict
+import httpx
 from groq import Groq
 from django.conf import settings as django_settings
 
+from .llm_gateway import LLMGateway, AsyncLLMGateway
+from .context_packer import pack_context
+from .retrieval import build_retriever, dense_component, CrossFeatureReranker
+from . import embeddings
+from .insights import INSIGHT_QUESTIONS, match_insight, build_context, clean_insights
+
+logger = logging.getLogger(__name__)
+
+# Shared by live answers and the batched insights call, so the two can't drift apart
+ANSWER_INSTRUCTIONS = (
+    "You are a helpful assistant that answers questions about meetings. "
+    "You MUST answer based ONLY on the provided meeting context. "
+    "If the context doesn't contain enough information to answer, say so clearly. "
+    "Keep your answers concise and to the point. "
+    "Do not make up information that is not in the context."
+)
+
 
 class MeetingRAGProcessor:
     """
     RAG (Retrieval-Augmented Generation) processor for meeting Q&A.
-    Uses TF-IDF for chunk retrieval and Groq API for answer generation.
+    Uses a pluggable retriever (hybrid BM25 + TF-IDF by default, see
+    core.retrieval) for chunk retrieval and Groq API for answer generation.
     """
 
     def __init__(self):
         api_key = getattr(django_settings, 'GROQ_API_KEY', None) or os.environ.get("GROQ_API_KEY")
         if not api_key:
             raise ValueError("GROQ_API_KEY is not configured. Set it in settings.py or as an environment variable.")
-        self.client = Groq(api_key=api_key)
+
+        max_concurrency = getattr(django_settings, 'GROQ_MAX_CONCURRENCY', 4)
+        timeout = getattr(django_settings, 'GROQ_TIMEOUT', 30.0)
+        self._api_key = api_key
+        self._limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        self._gateway_options = {
+            "max_concurrency": max_concurrency,
+            "timeout": timeout,
+            "max_retries": getattr(django_settings, 'GROQ_MAX_RETRIES', 3),
+            "max_queue": getattr(django_settings, 'GROQ_MAX_QUEUE', 50),
+            "queue_timeout": getattr(django_settings, 'GROQ_QUEUE_TIMEOUT', 20.0),
+        }
+        # One pooled HTTP client per process; retries are handled by the gateway
+        self.client = Groq(
+            api_key=api_key,
+            timeout=timeout,
+            max_retries=0,
+            http_client=httpx.Client(limits=self._limits, timeout=timeout),
+        )
+        self.gateway = LLMGateway(self.client, **self._gateway_options)
+        # Async clients/gateways for the async views, one per event loop
+        self._async_gateways = weakref.WeakKeyDictionary()
         self.model = "llama-3.3-70b-versatile"
+        # Retrieval candidates considered, and the token budget they are packed into
+        self.candidate_chunks = getattr(django_settings, 'RAG_CANDIDATE_CHUNKS', 6)
+        self.context_budget = getattr(django_settings, 'RAG_CONTEXT_TOKENS', 900)
 
-    def chunk_text(self, text, chunk_size=200, overlap=50):
-        """Split text into overlapping word chunks for better retrieval."""
-        words = text.split()
-        if len(words) <= chunk_size:
-            return [text]
+        # Retrieval: "hybrid" (BM25 + char n-gram TF-IDF), "hybrid-dense", "dense", "bm25" or "tfidf", plus optional reranking
+        self.retriever_name = getattr(django_settings, 'RAG_RETRIEVER', 'hybrid')
+        self.embedding_dim = getattr(django_settings, 'RAG_EMBEDDING_DIM', 128)
+        # Transcript budget for the batched insights call
+        self.insights_budget = getattr(django_settings, 'RAG_INSIGHTS_CONTEXT_TOKENS', 6000)
+        self.reranker = CrossFeatureReranker() if getattr(django_settings, 'RAG_RERANK', True) else None
+        self.rerank_depth = 20
+        self.index_cache_size = 32
+        self._index_cache = OrderedDict()
+        self._index_lock = threading.Lock()
 
+    def chunk_document(self, words, source, chunk_size=200, overlap=50):
+        """
+        Split a document's words into overlapping chunks, keeping each chunk's
+        word offsets so overlapping hits can be merged by the context packer.
+        """
+        if not words:
+            return []
         chunks = []
         start = 0
-        while start < len(words):
-            end = start + chunk_size
-            chunk = " ".join(words[start:end])
-            chunks.append(chunk)
+        while True:
+            end = min(start + chunk_size, len(words))
+            chunks.append({
+                "text": " ".join(words[start:end]),
+                "source": source,
+                "start": start,
+                "end": end,
+            })
+            if end >= len(words):
+                break
             start += chunk_size - overlap
-
         return chunks
 
-    def find_relevant_chunks(self, question, chunks, top_k=3):
-        """Find the most relevant text chunks using TF-IDF + cosine similarity."""
-        if not chunks:
-            return []
+    def _search(self, retriever, question, chunks, top_k):
+        """Query an indexed retriever, optionally reranking the top candidates."""
+        if self.reranker:
+            candidates = retriever.search(question, max(top_k, self.rerank_depth))
+            ranked = self.reranker.rerank(question, candidates, chunks, top_k=top_k)
+        else:
+            ranked = retriever.search(question, top_k)
+        return [
+            {"text": chunks[idx], "score": float(score), "index": int(idx)}
+            for idx, score in ranked if score > 0
+        ]
+
+    def _get_index(self, transcript, summary, meeting_id=None):
+        """
+        Chunks, documents and the indexed retriever for one meeting's text.
+        Indexes are cached per process (LRU) so follow-up questions about the
+        same meeting skip chunking and vectorization. With a dense retriever,
+        embeddings stored for `meeting_id` are reused when still current.
+        """
+        key = hashlib.sha1(f"{summary}\0{transcript}".encode("utf-8")).hexdigest()
+        with self._index_lock:
+            if key in self._index_cache:
+                self._index_cache.move_to_end(key)
+                return self._index_cache[key]
+
+        documents = {
+            "summary": (summary or "").split(),
+            "transcript": (transcript or "").split(),
+        }
+        chunks = []
+        for source, words in documents.items():
+            chunks.extend(self.chunk_document(words, source))
+        chunk_texts = [c["text"] for c in chunks]
+        retriever = None
+        if chunks:
+            retriever = build_retriever(self.retriever_name, self.embedding_dim)
+            dense = dense_component(retriever)
+            if dense is not None and meeting_id is not None:
+                state = embeddings.load_embeddings(meeting_id)
+                if state is not None:
+                    dense.preload(state)
+            retriever.index(chunk_texts)
+
+        entry = (documents, chunks, chunk_texts, retriever)
+        with self._index_lock:
+            self._index_cache[key] = entry
+            while len(self._index_cache) > self.index_cache_size:
+                self._index_cache.popitem(last=False)
+        return entry
 
-        # Combine question with chunks for TF-IDF vectorization
-        all_texts = [question] + chunks
-        vectorizer = TfidfVectorizer(stop_words="english")
-        tfidf_matrix = vectorizer.fit_transform(all_texts)
-
-        # Compute similarity between question (first) and all chunks
-        question_vec = tfidf_matrix[0:1]
-        chunk_vecs = tfidf_matrix[1:]
-        similarities = cosine_similarity(question_vec, chunk_vecs).flatten()
-
-        # Get top-k most similar chunks
-        top_k = min(top_k, len(chunks))
-        top_indices = similarities.argsort()[-top_k:][::-1]
-
-        # Filter out chunks with zero similarity
-        relevant = []
-        for idx in top_indices:
-            if similarities[idx] > 0:
-                relevant.append({
-                    "text": chunks[idx],
-                    "score": float(similarities[idx]),
-                })
-
-        return relevant
-
-    def generate_answer(self, question, context_chunks):
-        """Generate an answer using Groq API with retrieved context."""
+    def index_meeting(self, meeting):
+        """
+        Precompute and store the meeting's dense chunk embeddings (called at
+        processing time). No-op unless a dense retriever is configured.
+
+        Returns:
+            True if embeddings were written.
+        """
+        _, _, _, retriever = self._get_index(meeting.transcript, meeting.summary, meeting.id)
+        dense = dense_component(retriever)
+        if dense is None or dense.loaded:
+            return False
+        size = embeddings.save_embeddings(meeting.id, dense.state())
+        logger.info(f"Stored {dense.size} chunk embeddings for meeting {meeting.id} ({size / 1024:.1f} KB)")
+        return True
+
+    def _answer_messages(self, question, context_chunks):
+        """Chat messages asking the model to answer `question` from the retrieved context."""
         context = "\n\n---\n\n".join([c["text"] for c in context_chunks])
 
+        messages = [
+            {"role": "system", "content": ANSWER_INSTRUCTIONS},
+            {
+                "role": "user",
+                "content": (
+                    f"Meeting Context:\n{context}\n\n"
+                    f"Question: {question}\n\n"
+                    f"Answer based on the meeting context above:"
+                ),
+            },
+        ]
+        return messages
+
+    def _async_gateway(self):
+        """AsyncLLMGateway (with its own AsyncGroq client) for the running event loop."""
+        from groq import AsyncGroq
+
+        loop = asyncio.get_running_loop()
+        gateway = self._async_gateways.get(loop)
+        if gateway is None:
+            timeout = self._gateway_options["timeout"]
+            client = AsyncGroq(
+                api_key=self._api_key,
+                timeout=timeout,
+                max_retries=0,
+                http_client=httpx.AsyncClient(limits=self._limits, timeout=timeout),
+            )
+            gateway = self._async_gateways[loop] = AsyncLLMGateway(client, **self._gateway_options)
+        return gateway
+
+    def generate_answer(self, question, context_chunks, user_key=None):
+        """
+        Generate an answer using Groq API with retrieved context.
+        Requests go through the LLM gateway (fair per-user queuing, timeouts,
+        retries); raises LLMGatewayBusy when the request can't be admitted.
+        """
+        response = self.gateway.chat(
+            user_key=user_key,
+            model=self.model,
+            messages=self._answer_messages(question, context_chunks),
+            temperature=0.3,
+            max_tokens=512,
+        )
+
+        return response.choices[0].message.content.strip()
+
+    async def agenerate_answer(self, question, context_chunks, user_key=None):
+        """Async `generate_answer` through the event loop's AsyncLLMGateway."""
+        response = await self._async_gateway().achat(
+            user_key=user_key,
+            model=self.model,
+            messages=self._answer_messages(question, context_chunks),
+            temperature=0.3,
+            max_tokens=512,
+        )
+
+        return response.choices[0].message.content.strip()
+
+    def generate_insights(self, transcript, summary, user_key=None):
+        """
+        Answer every question in core.insights.INSIGHT_QUESTIONS with one
+        batched Groq call (JSON mode).
+
+        Returns:
+            Dict of insight key to answer text (keys the model skipped are omitted).
+        """
+        context = build_context(transcript, summary, self.insights_budget)
+        questions = "\n".join(f'- "{key}": {question}' for key, (question, _) in INSIGHT_QUESTIONS.items())
+
         messages = [
             {
                 "role": "system",
                 "content": (
-                    "You are a helpful assistant that answers questions about meetings. "
-                    "You MUST answer based ONLY on the provided meeting context. "
-                    "If the context doesn't contain enough information to answer, say so clearly. "
-                    "Keep your answers concise and to the point. "
-                    "Do not make up information that is not in the context."
+                    ANSWER_INSTRUCTIONS + " "
+                    "Reply with a JSON object that has exactly the requested keys, each mapped to a plain-text answer."
                 ),
             },
             {
                 "role": "user",
                 "content": (
                     f"Meeting Context:\n{context}\n\n"
-                    f"Question: {question}\n\n"
-                    f"Answer based on the meeting context above:"
+                    f"Answer each of these questions:\n{questions}"
                 ),
             },
         ]
 
-        response = self.client.chat.completions.create(
+        response = self.gateway.chat(
+            user_key=user_key,
             model=self.model,
             messages=messages,
             temperature=0.3,
-            max_tokens=512,
+            max_tokens=1500,
+            response_format={"type": "json_object"},
         )
 
-        return response.choices[0].message.content.strip()
+        try:
+            data = json.loads(response.choices[0].message.content)
+        except (TypeError, ValueError):
+            logger.warning("Insights response was not valid JSON; skipping.")
+            return {}
+        insights = clean_insights(data)
+        logger.info(f"Generated {len(insights)}/{len(INSIGHT_QUESTIONS)} meeting insights in one call.")
+        return insights
 
-    def ask_question(self, transcript, summary, question):
+    def _prepare(self, transcript, summary, question, meeting_id=None, insights=None):
         """
-        Full RAG pipeline: chunk → retrieve → generate answer.
-        Uses both transcript and summary for better context.
+        Everything in the Q&A pipeline except the LLM call.
+
+        Returns:
+            Tuple of (result, context). `result` is a finished response (a
+            precomputed insight, or nothing relevant found) and `context` is
+            None; otherwise `result` is None and `context` is the packed
+            (blocks, stats) to answer from.
         """
-        # Combine transcript and summary for richer context
-        full_text = f"Meeting Summary:\n{summary}\n\nFull Transcript:\n{transcript}"
+        insight = match_insight(question) if insights else None
+        if insight and insights.get(insight):
+            return {
+                "answer": insights[insight],
+                "sources": [],
+                "insight": insight,
+            }, None
 
-        # Step 1: Chunk the text
-        chunks = self.chunk_text(full_text)
+        # Step 1: Chunk and index the text (cached per meeting text)
+        documents, chunks, chunk_texts, retriever = self._get_index(transcript, summary, meeting_id)
 
         # Step 2: Find relevant chunks
-        relevant_chunks = self.find_relevant_chunks(question, chunks, top_k=4)
+        relevant_chunks = []
+        if retriever is not None:
+            relevant_chunks = self._search(retriever, question, chunk_texts, self.candidate_chunks)
 
+        not_found = {
+            "answer": "I couldn't find relevant information in this meeting to answer your question. Try rephrasing or asking something else.",
+            "sources": [],
+        }
         if not relevant_chunks:
-            return {
-                "answer": "I couldn't find relevant information in this meeting to answer your question. Try rephrasing or asking something else.",
-                "sources": [],
-            }
+            return not_found, None
 
-        # Step 3: Generate answer
-        answer = self.generate_answer(question, relevant_chunks)
+        # Step 3: Merge overlapping hits, drop repeated sentences, fit the token budget
+        hits = [{**chunks[c["index"]], "score": c["score"]} for c in relevant_chunks]
+        blocks, stats = pack_context(hits, documents, self.context_budget)
+        if not blocks:
+            # Nothing to ground an answer on; don't call the model
+            return not_found, None
+        return None, (blocks, stats)
 
+    @staticmethod
+    def _format_result(answer, context_blocks, context_stats):
         # Format sources (truncate for display)
         sources = []
-        for chunk in relevant_chunks:
-            text = chunk["text"]
+        for block in context_blocks:
+            text = block["text"]
             if len(text) > 200:
                 text = text[:200] + "..."
             sources.append({
                 "text": text,
-                "relevance": round(chunk["score"] * 100, 1),
+                "relevance": round(block["score"] * 100, 1),
             })
 
         return {
             "answer": answer,
             "sources": sources,
+            "context": context_stats,
         }
+
+    def ask_question(self, transcript, summary, question, user_key=None, meeting_id=None, insights=None):
+        """
+        Full RAG pipeline: chunk → retrieve → pack context → generate answer.
+        Summary and transcript are chunked separately; the retrieved chunks
+        are merged, de-duplicated and packed into RAG_CONTEXT_TOKENS.
+        `user_key` identifies the asker for fair queuing in the LLM gateway;
+        `meeting_id` lets a dense retriever load stored embeddings.
+        Questions matching a precomputed entry in `insights` are answered
+        from it without any retrieval or LLM call.
+        """
+        result, context = self._prepare(transcript, summary, question, meeting_id, insights)
+        if result is not None:
+            return result
+
+        # Step 4: Generate answer
+        context_blocks, context_stats = context
+        answer = self.generate_answer(question, context_blocks, user_key=user_key)
+        return self._format_result(answer, context_blocks, context_stats)
+
+    async def aask_question(self, transcript, summary, question, user_key=None, meeting_id=None, insights=None):
+        """
+        Async `ask_question`. Retrieval is CPU-bound and runs in a worker
+        thread; the Groq call is awaited, so a waiting question holds no
+        thread.
+        """
+        from asgiref.sync import sync_to_async
+
+        result, context = await sync_to_async(self._prepare, thread_sensitive=False)(
+            transcript, summary, question, meeting_id, insights
+        )
+        if result is not None:
+            return result
+
+        context_blocks, context_stats = context
+        answer = await self.agenerate_answer(question, context_blocks, user_key=user_key)
+        return self._format_result(answer, context_blocks, context_stats)
@@ -0,0 +1,199 @@
+# Token-bucket rate limiting for the expensive endpoints.
+# Each endpoint has a per-user bucket and a global bucket (settings.RATE_LIMITS),
+# stored in the default Django cache so all workers share them once
+# settings.REDIS_URL points at a shared Redis server. A request is charged a cost
+# that grows with its input size and is admitted only if both buckets hold
+# enough tokens. Users who have already spent most of their own bucket can't
+# take the last RATE_LIMIT_GLOBAL_RESERVE of the global bucket, so the shared
+# capacity is split fairly under load instead of going to the heaviest user.
+
+import re
+import time
+import logging
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+from .conf import get_setting
+from .insights import match_insight
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"s": 1, "second": 1, "m": 60, "minute": 60, "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+
+_RATE = re.compile(r"\s*(\d+(?:\.\d+)?)\s*/\s*([a-z]+)\s*")
+
+LOCK_TIMEOUT = 2        # seconds a bucket lock is held at most (if its holder dies)
+LOCK_ATTEMPTS = 50      # 50 x 2 ms before giving up on the lock
+
+
+def parse_rate(rate):
+    """
+    "30/minute" -> (capacity 30.0, period 60 seconds); None for "" or None.
+
+    Raises:
+        ValueError: The rate is not "<number>/<period>".
+    """
+    if not rate:
+        return None
+    match = _RATE.fullmatch(rate.lower())
+    if not match or match.group(2) not in PERIODS:
+        raise ValueError(f"Invalid rate {rate!r}; expected e.g. '30/minute'")
+    return float(match.group(1)), PERIODS[match.group(2)]
+
+
+class TokenBucket:
+    """
+    Cache-stored bucket of `capacity` tokens refilled at capacity/period per
+    second. The state is (tokens, timestamp); reads and writes happen under
+    `locked()`.
+    """
+
+    def __init__(self, key, capacity, period):
+        self.key = key
+        self.capacity = capacity
+        self.period = period
+        self.refill_rate = capacity / period
+
+    def level(self, now):
+        state = cache.get(self.key)
+        if state is None:
+            return self.capacity
+        tokens, updated = state
+        return min(self.capacity, tokens + max(0.0, now - updated) * self.refill_rate)
+
+    def store(self, tokens, now):
+        # Once full again the entry is no longer needed
+        cache.set(self.key, (tokens, now), timeout=int(self.period) + 60)
+
+    def wait_for(self, tokens_needed, level):
+        """Seconds until the bucket holds `tokens_needed`."""
+        return max(0.0, tokens_needed - level) / self.refill_rate
+
+
+@contextmanager
+def locked(keys):
+    """
+    Hold cache locks on `keys` (cache.add is atomic on every backend).
+    If a lock can't be taken in time the check runs unlocked: a rare
+    over-admission beats failing the request.
+    """
+    acquired = []
+    try:
+        for key in keys:
+            lock_key = f"{key}:lock"
+            for _ in range(LOCK_ATTEMPTS):
+                if cache.add(lock_key, 1, LOCK_TIMEOUT):
+                    acquired.append(lock_key)
+                    break
+                time.sleep(0.002)
+            else:
+                logger.warning(f"Rate limiter ran without the lock on {key}.")
+        yield
+    finally:
+        for lock_key in acquired:
+            cache.delete(lock_key)
+
+
+def _buckets(endpoint, user_id):
+    limits = get_setting('RATE_LIMITS', {}).get(endpoint, {})
+    buckets = {}
+    for scope, rate in (("user", limits.get("user")), ("global", limits.get("global"))):
+        parsed = parse_rate(rate)
+        if parsed:
+            key = f"ratelimit:{endpoint}:" + (f"user:{user_id}" if scope == "user" else "global")
+            buckets[scope] = TokenBucket(key, *parsed)
+    return buckets
+
+
+def check(endpoint, user_id, cost=1.0):
+    """
+    Charge `cost` tokens for one request to `endpoint` by `user_id`.
+
+    Returns:
+        Dict with allowed (bool), scope ("user" or "global" when refused),
+        retry_after (seconds, rounded up) and remaining (tokens left in the
+        user's bucket, or None without one).
+    """
+    if not get_setting('RATE_LIMIT_ENABLED', True):
+        return {"allowed": True, "scope": None, "retry_after": 0, "remaining": None}
+
+    buckets = _buckets(endpoint, user_id)
+    user_bucket = buckets.get("user")
+    global_bucket = buckets.get("global")
+    reserve_share = get_setting('RATE_LIMIT_GLOBAL_RESERVE', 0.2)
+
+    with locked([b.key for b in (user_bucket, global_bucket) if b]):
+        now = time.time()
+        decision = {"allowed": True, "scope": None, "retry_after": 0, "remaining": None}
+
+        if user_bucket:
+            # A request larger than the whole bucket is charged a full bucket
+            user_cost = min(cost, user_bucket.capacity)
+            user_level = user_bucket.level(now)
+            if user_level < user_cost:
+                decision.update(allowed=False, scope="user", retry_after=user_bucket.wait_for(user_cost, user_level))
+
+        if decision["allowed"] and global_bucket:
+            global_cost = min(cost, global_bucket.capacity)
+            global_level = global_bucket.level(now)
+            needed = global_cost
+            if user_bucket and user_level - user_cost < user_bucket.capacity / 2:
+                needed += global_bucket.capacity * reserve_share
+            if global_level < needed:
+                decision.update(allowed=False, scope="global", retry_after=global_bucket.wait_for(needed, global_level))
+
+        if decision["allowed"]:
+            if user_bucket:
+                user_bucket.store(user_level - user_cost, now)
+                decision["remaining"] = user_level - user_cost
+            if global_bucket:
+                global_bucket.store(global_level - global_cost, now)
+
+    if not decision["allowed"]:
+        decision["retry_after"] = max(1, int(decision["retry_after"] + 0.999))
+        logger.warning(
+            f"Rate limited {endpoint} for user {user_id} ({decision['scope']} bucket, "
+            f"cost {cost:.1f}, retry in {decision['retry_after']}s)."
+        )
+    return decision
+
+
+def request_cost(request, bytes_per_unit):
+    """1 unit plus one per `bytes_per_unit` of request body (from Content-Length, before parsing)."""
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        length = 0
+    return 1.0 + length / bytes_per_unit
+
+
+def question_cost(request, meeting, question):
+    """Cost of a Q&A question: free when served from precomputed insights."""
+    key = match_insight(question)
+    if key and (meeting.insights or {}).get(key):
+        return 0
+    return request_cost(request, 2000)
+
+
+def format_wait(seconds):
+    if seconds < 90:
+        return f'{seconds} seconds'
+    return f'{round(seconds / 60)} minutes'
+
+
+def throttle(request, endpoint, cost):
+    """
+    Charge `cost` against the endpoint's limits for the requesting user.
+    Returns None when admitted, else check()'s refusal with a user-facing message.
+    """
+    if cost <= 0:
+        return None
+    decision = check(endpoint, request.user.id, cost)
+    if decision['allowed']:
+        return None
+    if decision['scope'] == 'user':
+        message = f"You've reached the limit for this action. Please try again in {format_wait(decision['retry_after'])}."
+    else:
+        message = f"The service is at capacity. Please try again in {format_wait(decision['retry_after'])}."
+    return {**decision, 'message': message}
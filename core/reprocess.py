@@ -0,0 +1,241 @@
+# Incremental reprocessing of stored meetings.
+# Each stage's output is recorded on Meeting.pipeline with a fingerprint of
+# its inputs (transcript, settings, model, extractor version). Reprocessing
+# runs only the requested stages whose fingerprint changed, never Whisper,
+# and the summary stage reuses every BART chunk summary whose input and
+# parameters are unchanged (see ai_processor.SummaryChunkCache).
+
+import re
+import json
+import hashlib
+import logging
+
+from .conf import get_setting
+from .insights import INSIGHT_QUESTIONS
+
+logger = logging.getLogger(__name__)
+
+# In run order: the index and insights are built from the summary
+STAGES = ("summary", "tasks", "index", "insights")
+
+
+def _digest(*parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def summary_fingerprint(transcript):
+    from .hf_client import MODELS
+    return _digest(
+        transcript,
+        get_setting('SUMMARY_MODE', 'hybrid'),
+        get_setting('SUMMARY_EXTRACTIVE_RATIO', 0.3),
+        MODELS["summarizer"],
+    )
+
+
+def tasks_fingerprint(transcript):
+    from .hf_client import MODELS
+    from .ai_processor import EXTRACTOR_VERSION
+    return _digest(transcript, EXTRACTOR_VERSION, MODELS["ner"])
+
+
+def insights_fingerprint(transcript, summary):
+    questions = json.dumps({key: question for key, (question, _) in INSIGHT_QUESTIONS.items()}, sort_keys=True)
+    return _digest(transcript, summary, questions, get_setting('RAG_INSIGHTS_CONTEXT_TOKENS', 6000))
+
+
+def fingerprints(meeting):
+    """Current input fingerprint of each fingerprinted stage."""
+    return {
+        "summary": summary_fingerprint(meeting.transcript),
+        "tasks": tasks_fingerprint(meeting.transcript),
+        "insights": insights_fingerprint(meeting.transcript, meeting.summary),
+    }
+
+
+def record(meeting, stage, chunk_summaries=None):
+    """
+    Mark `stage` of `meeting` as current (call after producing its output;
+    the caller saves). The summary stage also keeps `chunk_summaries`, the
+    BART outputs by chunk fingerprint (SummaryChunkCache.used).
+    """
+    pipeline = dict(meeting.pipeline or {})
+    if stage == "summary":
+        entry = {"fingerprint": summary_fingerprint(meeting.transcript)}
+        if chunk_summaries is not None:
+            entry["chunks"] = chunk_summaries
+    elif stage == "tasks":
+        entry = {"fingerprint": tasks_fingerprint(meeting.transcript)}
+    elif stage == "insights":
+        entry = {"fingerprint": insights_fingerprint(meeting.transcript, meeting.summary)}
+    else:
+        raise ValueError(f"Stage {stage!r} has no fingerprint")
+    pipeline[stage] = entry
+    meeting.pipeline = pipeline
+
+
+def stale_stages(meeting):
+    """Fingerprinted stages whose recorded fingerprint no longer matches the inputs."""
+    recorded = meeting.pipeline or {}
+    return [
+        stage for stage, current in fingerprints(meeting).items()
+        if recorded.get(stage, {}).get("fingerprint") != current
+    ]
+
+
+def _task_key(description):
+    return re.sub(r"\W+", " ", (description or "").lower()).strip()
+
+
+def _replace_tasks(meeting, action_items):
+    """
+    Swap the meeting's tasks for `action_items`. A task whose description is
+    extracted again keeps its row and status, so completed tasks stay
+    completed; a changed assignee or deadline is updated on that row.
+    """
+    from .models import Task
+
+    existing = {}
+    for task in Task.objects.filter(meeting=meeting).order_by('id'):
+        existing.setdefault(_task_key(task.description), []).append(task)
+
+    kept = added = updated = 0
+    for item in action_items:
+        matches = existing.get(_task_key(item.get('description')))
+        if matches:
+            task = matches.pop(0)
+            changes = {'assignee': item.get('assignee') or '', 'deadline_text': item.get('deadline') or ''}
+            changed = [field for field, value in changes.items() if (getattr(task, field) or '') != value]
+            if changed:
+                for field in changed:
+                    setattr(task, field, changes[field])
+                task.save(update_fields=changed)
+                updated += 1
+            kept += 1
+            continue
+        Task.objects.create(
+            meeting=meeting,
+            description=item.get('description', ''),
+            assignee=item.get('assignee', ''),
+            deadline_text=item.get('deadline', ''),
+            status=item.get('status', 'pending'),
+        )
+        added += 1
+
+    leftover = [task for tasks in existing.values() for task in tasks]
+    # Delete one by one so the search index signals fire
+    for task in leftover:
+        task.delete()
+    return {"kept": kept, "added": added, "updated": updated, "removed": len(leftover)}
+
+
+def reprocess(meeting, stages=STAGES, force=False, processor=None, rag=None):
+    """
+    Re-run `stages` of a completed meeting from its stored transcript.
+
+    Args:
+        meeting: The Meeting (its transcript is the input; audio is not used).
+        stages: Any of STAGES; they always run in STAGES order.
+        force: Run stages even when their fingerprint is unchanged, and
+            summarize every chunk again.
+        processor: MeetingAIProcessor to use (created if needed).
+        rag: MeetingRAGProcessor to use (created if needed).
+
+    Returns:
+        Dict of stage -> {"status": "updated" | "unchanged" | "skipped" |
+        "failed", ...details}, plus "stale": fingerprinted stages that were
+        not requested but are now out of date.
+    """
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+    if not meeting.transcript:
+        raise ValueError(f"Meeting {meeting.id} has no transcript to reprocess")
+
+    from .ai_processor import MeetingAIProcessor, SummaryChunkCache
+
+    recorded = meeting.pipeline or {}
+    report = {}
+    fields = {'pipeline', 'updated_at'}
+
+    def get_processor():
+        nonlocal processor
+        if processor is None:
+            processor = MeetingAIProcessor()
+        return processor
+
+    def get_rag():
+        nonlocal rag
+        if rag is None:
+            from .rag_processor import MeetingRAGProcessor
+            rag = MeetingRAGProcessor()
+        return rag
+
+    for stage in STAGES:
+        if stage not in stages:
+            continue
+        try:
+            if stage == "summary":
+                entry = recorded.get("summary", {})
+                if not force and meeting.summary and entry.get("fingerprint") == summary_fingerprint(meeting.transcript):
+                    report[stage] = {"status": "unchanged"}
+                    continue
+                cache = SummaryChunkCache(None if force else entry.get("chunks"))
+                summary = get_processor().generate_summary(meeting.transcript, chunk_cache=cache)
+                if cache.fell_back:
+                    # Keep the stored summary and fingerprint, so the next run retries BART
+                    report[stage] = {"status": "failed", "error": "summarization API failed"}
+                    continue
+                report[stage] = {
+                    "status": "updated" if summary != meeting.summary else "unchanged",
+                    "chunks_reused": cache.hits,
+                    "chunks_summarized": cache.misses,
+                }
+                meeting.summary = summary
+                record(meeting, "summary", cache.used)
+                fields.add('summary')
+
+            elif stage == "tasks":
+                if not force and recorded.get("tasks", {}).get("fingerprint") == tasks_fingerprint(meeting.transcript):
+                    report[stage] = {"status": "unchanged"}
+                    continue
+                changes = _replace_tasks(meeting, get_processor().extract_action_items(meeting.transcript))
+                changed = changes["added"] or changes["removed"] or changes["updated"]
+                report[stage] = {"status": "updated" if changed else "unchanged", **changes}
+                record(meeting, "tasks")
+
+            elif stage == "index":
+                # The in-memory index is keyed by content and rebuilds itself;
+                # only stored dense embeddings need writing (when stale)
+                if 'dense' not in get_setting('RAG_RETRIEVER', 'hybrid'):
+                    report[stage] = {"status": "skipped", "reason": "no stored index for this retriever"}
+                    continue
+                written = get_rag().index_meeting(meeting)
+                report[stage] = {"status": "updated" if written else "unchanged"}
+
+            elif stage == "insights":
+                current = insights_fingerprint(meeting.transcript, meeting.summary)
+                if not force and meeting.insights and recorded.get("insights", {}).get("fingerprint") == current:
+                    report[stage] = {"status": "unchanged"}
+                    continue
+                meeting.insights = get_rag().generate_insights(
+                    meeting.transcript, meeting.summary, user_key=meeting.user_id,
+                )
+                record(meeting, "insights")
+                fields.add('insights')
+                report[stage] = {"status": "updated", "insights": len(meeting.insights)}
+
+        except Exception as e:
+            logger.warning(f"Reprocessing stage {stage} of meeting {meeting.id} failed: {e}")
+            report[stage] = {"status": "failed", "error": str(e)}
+
+    meeting.save(update_fields=sorted(fields))
+    report["stale"] = [stage for stage in stale_stages(meeting) if stage not in stages]
+    logger.info(f"Reprocessed meeting {meeting.id}: " + ", ".join(
+        f"{stage} {report[stage]['status']}" for stage in STAGES if stage in report
+    ))
+    return report
@@ -0,0 +1,166 @@
+# Retention and tiering of processed meeting audio.
+# Once a meeting is processed its recording is rarely played again, yet it
+# is by far the largest thing stored for it. After AUDIO_ARCHIVE_AFTER_DAYS
+# the original is replaced by a low-bitrate mono Opus copy (about 7 MB per
+# hour at 16 kbit/s), and after AUDIO_DELETE_AFTER_DAYS the audio is deleted.
+# Transcripts, summaries, segments and tasks are never touched.
+#
+# One stored file can back several meetings (identical uploads share it, see
+# core.uploads), so files are handled as a whole: a file moves to the next
+# tier only when every meeting using it is completed and old enough, and all
+# of those meetings are updated together. Queryset updates skip auto_now, so
+# updated_at is set explicitly; the cached page fragments depend on it.
+
+import os
+import logging
+import tempfile
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Meeting
+from . import storage as file_storage
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = 'meetings/archive'
+CHECK_BATCH = 500   # candidate files checked per query in due_files
+
+
+def _unblocked(names, tiers, cutoff):
+    """`names` (in order) whose every meeting is due, as name -> meeting ids."""
+    users = defaultdict(list)
+    blocked = set()
+    rows = Meeting.objects.filter(audio_file__in=names).values_list(
+        'id', 'audio_file', 'status', 'audio_tier', 'created_at',
+    )
+    for meeting_id, name, status, tier, created_at in rows:
+        users[name].append(meeting_id)
+        if status != 'completed' or tier not in tiers or created_at >= cutoff:
+            blocked.add(name)
+    return {name: sorted(users[name]) for name in names if name not in blocked}
+
+
+def due_files(tiers, older_than_days, limit=None):
+    """
+    Stored audio files whose every meeting is completed, in one of `tiers`,
+    and created more than `older_than_days` ago.
+
+    Candidates are checked CHECK_BATCH files at a time, so `limit` counts
+    only files that are due: a file held back by a younger or unfinished
+    meeting doesn't use up a slot.
+
+    Returns:
+        Dict of storage name -> ids of the meetings using it, oldest first.
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    rows = (
+        Meeting.objects.filter(status='completed', audio_tier__in=tiers, created_at__lt=cutoff)
+        .exclude(audio_file='').exclude(audio_file__isnull=True)
+        .order_by('created_at').values_list('audio_file', flat=True)
+    )
+    due = {}
+    seen = set()
+    batch = []
+    for name in rows.iterator():
+        if name in seen:
+            continue
+        seen.add(name)
+        batch.append(name)
+        if len(batch) == CHECK_BATCH:
+            due.update(_unblocked(batch, tiers, cutoff))
+            batch = []
+            if limit and len(due) >= limit:
+                break
+    if batch:
+        due.update(_unblocked(batch, tiers, cutoff))
+    return dict(list(due.items())[:limit]) if limit else due
+
+
+def _move(name, meeting_ids, new_name, tier):
+    """
+    Point the meetings using `name` at `new_name` (in `tier`). Returns False,
+    changing nothing, if a meeting started using the file since it was picked.
+    """
+    with transaction.atomic():
+        current = Meeting.objects.select_for_update().filter(audio_file=name).values_list('id', flat=True)
+        if set(current) != set(meeting_ids):
+            logger.info(f"Skipped {name}: a newer meeting uses it.")
+            return False
+        now = timezone.now()
+        Meeting.objects.filter(id__in=meeting_ids).update(
+            audio_file=new_name, audio_tier=tier, audio_tiered_at=now, updated_at=now,
+        )
+    return True
+
+
+def archive_file(name, meeting_ids, bitrate='16k', dry_run=False):
+    """
+    Replace a stored recording with a low-bitrate copy (audio_processing.archive_audio).
+    The original is kept when the copy would not be smaller.
+
+    Returns:
+        Bytes reclaimed (0 when the file was kept).
+
+    Raises:
+        FileNotFoundError: The file is missing from storage.
+        RuntimeError / subprocess.CalledProcessError: It could not be transcoded.
+    """
+    from .audio_processing import archive_audio
+
+    storage = Meeting._meta.get_field('audio_file').storage
+    if not storage.exists(name):
+        raise FileNotFoundError(name)
+    before = storage.size(name)
+
+    field_file = Meeting(audio_file=name).audio_file
+    fd, tmp_path = tempfile.mkstemp(prefix='meetingly-archive-')
+    os.close(fd)
+    try:
+        with file_storage.local_audio(field_file) as path:
+            extension = archive_audio(path, tmp_path, bitrate)
+        after = os.path.getsize(tmp_path)
+        if after >= before:
+            logger.info(f"Kept {name}: archive copy is not smaller ({after} >= {before} bytes).")
+            return 0
+        if dry_run:
+            return before - after
+
+        stem = os.path.splitext(os.path.basename(name))[0]
+        with open(tmp_path, 'rb') as f:
+            new_name = storage.save(f"{ARCHIVE_DIR}/{stem}{extension}", File(f))
+    finally:
+        os.remove(tmp_path)
+
+    try:
+        moved = _move(name, meeting_ids, new_name, 'archived')
+    except Exception:
+        storage.delete(new_name)
+        raise
+    if not moved:
+        storage.delete(new_name)
+        return 0
+    storage.delete(name)
+    logger.info(f"Archived {name} as {new_name}: {before} -> {after} bytes.")
+    return before - after
+
+
+def delete_file(name, meeting_ids, dry_run=False):
+    """
+    Delete a stored recording and clear audio_file on its meetings.
+
+    Returns:
+        Bytes reclaimed (0 when the file was kept).
+    """
+    storage = Meeting._meta.get_field('audio_file').storage
+    size = storage.size(name) if storage.exists(name) else 0
+    if dry_run:
+        return size
+    if not _move(name, meeting_ids, '', 'deleted'):
+        return 0
+    storage.delete(name)
+    logger.info(f"Deleted {name} ({size} bytes).")
+    return size
@@ -0,0 +1,437 @@
+# Pluggable retrievers for meeting Q&A.
+# Every retriever indexes a list of chunk strings once and then answers
+# search(question, top_k) with (chunk index, score) pairs, scores in [0, 1].
+# Lexical retrievers (TF-IDF, BM25) and a local dense retriever (LSA) can be
+# fused, and all of them can be evaluated offline with `evaluate` (see the
+# benchmark_retrievers management command).
+
+import re
+import time
+import hashlib
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _top_k(scores, top_k):
+    """Indices of the top-k positive scores, best first."""
+    top_k = min(top_k, len(scores))
+    if top_k <= 0:
+        return []
+    idx = np.argpartition(-scores, top_k - 1)[:top_k]
+    idx = idx[np.argsort(-scores[idx], kind="stable")]
+    return [(int(i), float(scores[i])) for i in idx if scores[i] > 0]
+
+
+class Retriever:
+    """Base interface: index(chunks) once, then search(question, top_k)."""
+
+    name = "base"
+
+    def index(self, chunks):
+        raise NotImplementedError
+
+    def score_many(self, questions):
+        """Scores as a (questions x chunks) NumPy array, higher is better."""
+        raise NotImplementedError
+
+    def score(self, question):
+        """Scores for every indexed chunk (NumPy array, higher is better)."""
+        return self.score_many([question])[0]
+
+    def search(self, question, top_k=5):
+        """Return [(chunk_index, score), ...] for the best `top_k` chunks."""
+        return _top_k(self.score(question), top_k)
+
+    def search_many(self, questions, top_k=5):
+        """Batched `search`: one matrix product for all questions."""
+        if not questions:
+            return []
+        return [_top_k(row, top_k) for row in self.score_many(questions)]
+
+
+class TfidfRetriever(Retriever):
+    """
+    Cosine similarity over TF-IDF vectors. `analyzer="char_wb"` matches
+    sub-word n-grams, so "approval" still finds "approve".
+    """
+
+    def __init__(self, analyzer="word", ngram_range=(1, 1)):
+        self.analyzer = analyzer
+        self.ngram_range = ngram_range
+        self.name = "tfidf" if analyzer == "word" else f"tfidf-{analyzer}"
+
+    def index(self, chunks):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        kwargs = {"stop_words": "english"} if self.analyzer == "word" else {}
+        self.vectorizer = TfidfVectorizer(analyzer=self.analyzer, ngram_range=self.ngram_range,
+                                          sublinear_tf=True, **kwargs)
+        try:
+            self.matrix = self.vectorizer.fit_transform(chunks)
+        except ValueError:
+            # No usable vocabulary (e.g. only stop words)
+            self.matrix = None
+        self.size = len(chunks)
+        return self
+
+    def score_many(self, questions):
+        if self.matrix is None:
+            return np.zeros((len(questions), self.size))
+        queries = self.vectorizer.transform(questions)
+        # Rows are L2-normalised, so the dot product is the cosine similarity
+        return (queries @ self.matrix.T).toarray()
+
+
+class BM25Retriever(Retriever):
+    """
+    Okapi BM25 over a precomputed sparse (chunks x terms) weight matrix, so
+    a query is one sparse matrix-vector product.
+    """
+
+    name = "bm25"
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+
+    def index(self, chunks):
+        from scipy import sparse
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        self.size = len(chunks)
+        self.vectorizer = CountVectorizer(stop_words="english")
+        try:
+            tf = self.vectorizer.fit_transform(chunks).tocsr().astype(np.float64)
+        except ValueError:
+            self.weights = None
+            return self
+
+        n_docs = tf.shape[0]
+        doc_len = np.asarray(tf.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() or 1.0
+        df = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+        # Saturated term frequency, computed only on non-zero entries
+        norm = self.k1 * (1 - self.b + self.b * doc_len / avg_len)
+        row_norm = np.repeat(norm, np.diff(tf.indptr))
+        data = tf.data * (self.k1 + 1) / (tf.data + row_norm)
+        weights = sparse.csr_matrix((data, tf.indices, tf.indptr), shape=tf.shape)
+        self.weights = (weights @ sparse.diags(idf)).tocsr()
+        # Upper bound used to map raw BM25 scores into [0, 1]
+        self.max_score = float(self.weights.sum(axis=1).max()) or 1.0
+        return self
+
+    def score_many(self, questions):
+        if self.weights is None:
+            return np.zeros((len(questions), self.size))
+        queries = self.vectorizer.transform(questions)
+        queries.data[:] = 1  # each query term counts once
+        raw = (queries @ self.weights.T).toarray()
+        return raw / self.max_score
+
+
+class LSAEncoder:
+    """
+    Local CPU sentence encoder: TF-IDF followed by truncated SVD (latent
+    semantic analysis). Fitted per meeting, so terms that co-occur in that
+    meeting ("budget", "spend", "allocation") land close together even when
+    a question shares no words with the answer.
+    """
+
+    def __init__(self, dim=128):
+        self.dim = dim
+        self.vectorizer = None
+        self.components = None
+
+    def fit(self, texts):
+        from sklearn.decomposition import TruncatedSVD
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True)
+        try:
+            matrix = self.vectorizer.fit_transform(texts)
+        except ValueError:
+            self.vectorizer = None
+            return self
+        dim = min(self.dim, matrix.shape[0] - 1, matrix.shape[1] - 1)
+        if dim < 1:
+            self.vectorizer = None
+            return self
+        svd = TruncatedSVD(n_components=dim, algorithm="randomized", random_state=0)
+        svd.fit(matrix)
+        self.components = svd.components_.astype(np.float16)
+        return self
+
+    def encode(self, texts):
+        """L2-normalised float32 embeddings, one row per text."""
+        if self.vectorizer is None:
+            return np.zeros((len(texts), 1), dtype=np.float32)
+        vectors = self.vectorizer.transform(texts) @ self.components.T.astype(np.float32)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    def to_arrays(self):
+        if self.vectorizer is None:
+            return {}
+        return {
+            "terms": self.vectorizer.get_feature_names_out().astype(str),
+            "idf": self.vectorizer.idf_.astype(np.float32),
+            "components": self.components,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        encoder = cls(dim=arrays["components"].shape[0])
+        encoder.vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True,
+                                             vocabulary=list(arrays["terms"]))
+        encoder.vectorizer.idf_ = arrays["idf"].astype(np.float64)
+        encoder.components = arrays["components"]
+        return encoder
+
+
+def fingerprint(chunks):
+    """Content hash of a chunk list, used to detect stale stored embeddings."""
+    digest = hashlib.sha1()
+    for chunk in chunks:
+        digest.update(chunk.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class DenseRetriever(Retriever):
+    """
+    Cosine similarity over dense LSA embeddings. Chunk embeddings are kept as
+    float16 (they can be precomputed at processing time and stored, see
+    core.embeddings) and all questions are scored with one matrix product.
+    """
+
+    name = "dense"
+
+    def __init__(self, dim=128):
+        self.dim = dim
+        self._preloaded = None
+        self.loaded = False
+
+    def preload(self, state):
+        """Use stored embeddings on the next index() if they match its chunks."""
+        self._preloaded = state
+
+    def index(self, chunks):
+        from .extractive import split_sentences
+
+        self.size = len(chunks)
+        self.fingerprint = fingerprint(chunks)
+        state, self._preloaded = self._preloaded, None
+        if state is not None and str(state["fingerprint"]) == self.fingerprint and "components" in state:
+            self.encoder = LSAEncoder.from_arrays(state)
+            self.embeddings = state["embeddings"]
+            self.loaded = True
+            return self
+
+        # Fit on sentences: far more rows than chunks, so better co-occurrence statistics
+        sentences = list(dict.fromkeys(s for chunk in chunks for s in split_sentences(chunk)))
+        self.encoder = LSAEncoder(self.dim).fit(sentences or chunks)
+        self.embeddings = self.encoder.encode(chunks).astype(np.float16)
+        self.loaded = False
+        return self
+
+    def state(self):
+        """Arrays needed to restore this index without refitting."""
+        return {
+            "fingerprint": np.array(self.fingerprint),
+            "embeddings": self.embeddings,
+            **self.encoder.to_arrays(),
+        }
+
+    def score_many(self, questions):
+        queries = self.encoder.encode(questions)
+        scores = queries @ self.embeddings.T.astype(np.float32)
+        return np.clip(scores, 0.0, None)
+
+
+class HybridRetriever(Retriever):
+    """
+    Weighted fusion of several retrievers. Each retriever's scores are
+    min-max normalised over the chunks before weighting, so BM25 and cosine
+    scores are comparable.
+    """
+
+    name = "hybrid"
+
+    def __init__(self, retrievers, weights=None):
+        self.retrievers = retrievers
+        self.weights = weights or [1.0 / len(retrievers)] * len(retrievers)
+
+    def index(self, chunks):
+        for retriever in self.retrievers:
+            retriever.index(chunks)
+        self.size = len(chunks)
+        return self
+
+    def score_many(self, questions):
+        fused = np.zeros((len(questions), self.size))
+        for retriever, weight in zip(self.retrievers, self.weights):
+            scores = retriever.score_many(questions)
+            if not scores.size:
+                continue
+            top = scores.max(axis=1, keepdims=True)
+            fused += weight * np.divide(scores, top, out=np.zeros_like(scores, dtype=float), where=top > 0)
+        return fused
+
+
+class CrossFeatureReranker:
+    """
+    Local reranker over the top-N candidates. It scores each (question,
+    chunk) pair on features that bag-of-words retrieval can't see: how many
+    query terms the chunk covers, shared bigrams, and how closely the
+    matched terms sit together. It then blends that with the first-stage
+    score.
+    """
+
+    def __init__(self, weights=(0.5, 0.25, 0.15, 0.10)):
+        self.w_first, self.w_coverage, self.w_bigram, self.w_proximity = weights
+
+    @staticmethod
+    def _tokens(text):
+        return re.findall(r"[a-z0-9]+", text.lower())
+
+    def rerank(self, question, candidates, chunks, top_k=5):
+        """
+        Args:
+            question: The user question.
+            candidates: [(chunk_index, first_stage_score), ...].
+            chunks: All indexed chunk strings.
+            top_k: Number of results to keep.
+
+        Returns:
+            Reordered [(chunk_index, score), ...].
+        """
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+        q_tokens = [t for t in self._tokens(question) if t not in ENGLISH_STOP_WORDS]
+        if not q_tokens or not candidates:
+            return candidates[:top_k]
+        q_terms = set(q_tokens)
+        q_bigrams = set(zip(q_tokens, q_tokens[1:]))
+        best_first = max(score for _, score in candidates) or 1.0
+
+        reranked = []
+        for idx, first_score in candidates:
+            tokens = self._tokens(chunks[idx])
+            positions = [i for i, t in enumerate(tokens) if t in q_terms]
+            matched = {tokens[i] for i in positions}
+
+            coverage = len(matched) / len(q_terms)
+            bigram = (len(q_bigrams & set(zip(tokens, tokens[1:]))) / len(q_bigrams)) if q_bigrams else 0.0
+            if len(matched) > 1:
+                span = positions[-1] - positions[0] + 1
+                proximity = min(1.0, len(matched) * 4 / span)
+            else:
+                proximity = 0.0
+
+            score = (self.w_first * first_score / best_first + self.w_coverage * coverage
+                     + self.w_bigram * bigram + self.w_proximity * proximity)
+            reranked.append((idx, score * best_first))
+
+        reranked.sort(key=lambda item: item[1], reverse=True)
+        return reranked[:top_k]
+
+
+RETRIEVER_NAMES = ("tfidf", "bm25", "dense", "hybrid", "hybrid-dense")
+
+
+def build_retriever(name="hybrid", dense_dim=128):
+    """
+    Create a retriever by name: "tfidf", "bm25", "dense" (local LSA
+    embeddings), "hybrid" (BM25 + char n-gram TF-IDF) or "hybrid-dense"
+    (hybrid plus dense).
+    """
+    if name == "tfidf":
+        return TfidfRetriever()
+    if name == "bm25":
+        return BM25Retriever()
+    if name == "dense":
+        return DenseRetriever(dense_dim)
+    if name == "hybrid":
+        return HybridRetriever(
+            [BM25Retriever(), TfidfRetriever(analyzer="char_wb", ngram_range=(3, 5))],
+            weights=[0.6, 0.4],
+        )
+    if name == "hybrid-dense":
+        return HybridRetriever(
+            [BM25Retriever(), TfidfRetriever(analyzer="char_wb", ngram_range=(3, 5)), DenseRetriever(dense_dim)],
+            weights=[0.5, 0.3, 0.2],
+        )
+    raise ValueError(f"Unknown retriever {name!r}. Choose from: {', '.join(RETRIEVER_NAMES)}")
+
+
+def dense_component(retriever):
+    """The DenseRetriever inside `retriever` (itself or a hybrid member), or None."""
+    if isinstance(retriever, DenseRetriever):
+        return retriever
+    for member in getattr(retriever, "retrievers", []):
+        if isinstance(member, DenseRetriever):
+            return member
+    return None
+
+
+def evaluate(retriever, dataset, k=4, reranker=None, candidates=20):
+    """
+    Offline retrieval benchmark.
+
+    Args:
+        retriever: An un-indexed Retriever.
+        dataset: List of {"chunks": [...], "questions": [{"question": str,
+            "relevant": [chunk indices]}]} meetings.
+        k: Cut-off for recall@k.
+        reranker: Optional CrossFeatureReranker applied to the top `candidates`.
+        candidates: First-stage depth when reranking.
+
+    Returns:
+        Dict with recall_at_k, mrr, questions, index_ms and query_ms (mean).
+    """
+    hits = 0
+    reciprocal_ranks = []
+    index_time = 0.0
+    query_time = 0.0
+    n_questions = 0
+
+    for meeting in dataset:
+        chunks = meeting["chunks"]
+        started = time.perf_counter()
+        retriever.index(chunks)
+        index_time += time.perf_counter() - started
+
+        questions = [item["question"] for item in meeting["questions"]]
+        started = time.perf_counter()
+        if reranker:
+            batches = [
+                reranker.rerank(question, first_stage, chunks, top_k=k)
+                for question, first_stage in zip(questions, retriever.search_many(questions, candidates))
+            ]
+        else:
+            batches = retriever.search_many(questions, k)
+        query_time += time.perf_counter() - started
+
+        for item, ranked in zip(meeting["questions"], batches):
+            relevant = set(item["relevant"])
+            ranked_ids = [idx for idx, _ in ranked]
+            if relevant & set(ranked_ids[:k]):
+                hits += 1
+            rank = next((pos for pos, idx in enumerate(ranked_ids, 1) if idx in relevant), None)
+            reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+            n_questions += 1
+
+    return {
+        "questions": n_questions,
+        "recall_at_k": hits / n_questions if n_questions else 0.0,
+        "mrr": float(np.mean(reciprocal_ranks)) if reciprocal_ranks else 0.0,
+        "index_ms": 1000 * index_time / max(len(dataset), 1),
+        "query_ms": 1000 * query_time / max(n_questions, 1),
+    }
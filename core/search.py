@@ -0,0 +1,334 @@
+# Full-text search over meetings and tasks.
+# SQLite uses FTS5 virtual tables, PostgreSQL uses tsvector columns with GIN
+# indexes (both created in migration 0004). Other databases fall back to LIKE.
+
+import re
+import logging
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Meeting, Task
+
+logger = logging.getLogger(__name__)
+
+# Private-use markers emitted by the database highlighter. The text is
+# HTML-escaped first and the markers are then swapped for <mark> tags, so
+# transcript content can never inject markup into the results page.
+_HL_START = "\ue000"
+_HL_END = "\ue001"
+
+MEETING_INDEXED_FIELDS = {"title", "summary", "transcript"}
+TASK_INDEXED_FIELDS = {"description", "assignee"}
+
+
+def _render_highlight(text):
+    """Escape `text` and turn highlight markers into <mark> tags."""
+    html = escape(text or "")
+    html = html.replace(_HL_START, "<mark>").replace(_HL_END, "</mark>")
+    return mark_safe(html)
+
+
+def _query_terms(query):
+    """Split a free-text query into plain word terms."""
+    return re.findall(r"\w+", query or "")
+
+
+def _limit_clause(limit):
+    """SQL LIMIT and its parameters; no limit when `limit` is None."""
+    return (" LIMIT %s", [limit]) if limit is not None else ("", [])
+
+
+class SQLiteFTSBackend:
+    """FTS5-backed search. Meeting/task ids are used as the FTS rowids."""
+
+    def index_meeting(self, meeting):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM core_meeting_fts WHERE rowid = %s", [meeting.id])
+            cursor.execute(
+                "INSERT INTO core_meeting_fts (rowid, title, summary, transcript) "
+                "VALUES (%s, %s, %s, %s)",
+                [meeting.id, meeting.title, meeting.summary, meeting.transcript],
+            )
+
+    def remove_meeting(self, meeting_id):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM core_meeting_fts WHERE rowid = %s", [meeting_id])
+
+    def index_task(self, task):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM core_task_fts WHERE rowid = %s", [task.id])
+            cursor.execute(
+                "INSERT INTO core_task_fts (rowid, description, assignee) VALUES (%s, %s, %s)",
+                [task.id, task.description, task.assignee],
+            )
+
+    def remove_task(self, task_id):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM core_task_fts WHERE rowid = %s", [task_id])
+
+    def _match_expression(self, query):
+        terms = _query_terms(query)
+        if not terms:
+            return ""
+        # Quote every term so FTS5 operators in user input are inert;
+        # the last term is a prefix match for search-as-you-type.
+        quoted = [f'"{t}"' for t in terms]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+
+    def search_meetings(self, query, user_id, limit):
+        match = self._match_expression(query)
+        if not match:
+            return []
+        user_clause = "AND core_meeting.user_id = %s " if user_id is not None else ""
+        limit_clause, limit_params = _limit_clause(limit)
+        params = [_HL_START, _HL_END, _HL_START, _HL_END, match]
+        params += [user_id] if user_id is not None else []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT core_meeting_fts.rowid, "
+                "       bm25(core_meeting_fts, 10.0, 4.0, 1.0) AS score, "
+                "       highlight(core_meeting_fts, 0, %s, %s), "
+                "       snippet(core_meeting_fts, -1, %s, %s, '…', 24) "
+                "FROM core_meeting_fts "
+                "JOIN core_meeting ON core_meeting.id = core_meeting_fts.rowid "
+                "WHERE core_meeting_fts MATCH %s " + user_clause +
+                "ORDER BY score" + limit_clause,
+                params + limit_params,
+            )
+            # bm25() is lower-is-better; flip the sign so rank is higher-is-better
+            return [(row[0], -row[1], row[2], row[3]) for row in cursor.fetchall()]
+
+    def search_tasks(self, query, user_id, limit):
+        match = self._match_expression(query)
+        if not match:
+            return []
+        user_clause = "AND core_meeting.user_id = %s " if user_id is not None else ""
+        limit_clause, limit_params = _limit_clause(limit)
+        params = [_HL_START, _HL_END, match]
+        params += [user_id] if user_id is not None else []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT core_task_fts.rowid, "
+                "       bm25(core_task_fts, 4.0, 1.0) AS score, "
+                "       highlight(core_task_fts, 0, %s, %s) "
+                "FROM core_task_fts "
+                "JOIN core_task ON core_task.id = core_task_fts.rowid "
+                "JOIN core_meeting ON core_meeting.id = core_task.meeting_id "
+                "WHERE core_task_fts MATCH %s " + user_clause +
+                "ORDER BY score" + limit_clause,
+                params + limit_params,
+            )
+            return [(row[0], -row[1], row[2]) for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend:
+    """tsvector/GIN-backed search with weighted fields and ts_headline snippets."""
+
+    config = "english"
+    title_headline = f"StartSel={_HL_START}, StopSel={_HL_END}, HighlightAll=true"
+    body_headline = f"StartSel={_HL_START}, StopSel={_HL_END}, MaxFragments=2, MaxWords=24, MinWords=8"
+
+    def index_meeting(self, meeting):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE core_meeting SET search_vector = "
+                "  setweight(to_tsvector(%s, coalesce(title, '')), 'A') || "
+                "  setweight(to_tsvector(%s, coalesce(summary, '')), 'B') || "
+                "  setweight(to_tsvector(%s, coalesce(transcript, '')), 'C') "
+                "WHERE id = %s",
+                [self.config, self.config, self.config, meeting.id],
+            )
+
+    def remove_meeting(self, meeting_id):
+        # The vector lives on the meeting row and is deleted with it
+        pass
+
+    def index_task(self, task):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE core_task SET search_vector = "
+                "  setweight(to_tsvector(%s, coalesce(description, '')), 'A') || "
+                "  setweight(to_tsvector(%s, coalesce(assignee, '')), 'B') "
+                "WHERE id = %s",
+                [self.config, self.config, task.id],
+            )
+
+    def remove_task(self, task_id):
+        pass
+
+    def search_meetings(self, query, user_id, limit):
+        if not _query_terms(query):
+            return []
+        user_clause = "AND m.user_id = %s " if user_id is not None else ""
+        limit_clause, limit_params = _limit_clause(limit)
+        params = [self.config, self.title_headline, self.config, self.body_headline,
+                  self.config, query]
+        params += [user_id] if user_id is not None else []
+        with connection.cursor() as cursor:
+            # Rank inside the GIN-filtered subquery first so ts_headline only
+            # runs over the `limit` rows that are actually displayed.
+            cursor.execute(
+                "SELECT hit.id, hit.score, "
+                "       ts_headline(%s, hit.title, hit.q, %s), "
+                "       ts_headline(%s, hit.summary || ' ' || hit.transcript, hit.q, %s) "
+                "FROM ("
+                "  SELECT m.id, m.title, m.summary, m.transcript, q, "
+                "         ts_rank_cd(m.search_vector, q) AS score "
+                "  FROM core_meeting m, websearch_to_tsquery(%s, %s) q "
+                "  WHERE m.search_vector @@ q " + user_clause +
+                "  ORDER BY score DESC" + limit_clause +
+                ") hit ORDER BY hit.score DESC",
+                params + limit_params,
+            )
+            return cursor.fetchall()
+
+    def search_tasks(self, query, user_id, limit):
+        if not _query_terms(query):
+            return []
+        user_clause = "AND m.user_id = %s " if user_id is not None else ""
+        limit_clause, limit_params = _limit_clause(limit)
+        params = [self.config, self.title_headline, self.config, query]
+        params += [user_id] if user_id is not None else []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT t.id, ts_rank_cd(t.search_vector, q) AS score, "
+                "       ts_headline(%s, t.description, q, %s) "
+                "FROM core_task t "
+                "JOIN core_meeting m ON m.id = t.meeting_id, "
+                "     websearch_to_tsquery(%s, %s) q "
+                "WHERE t.search_vector @@ q " + user_clause +
+                "ORDER BY score DESC" + limit_clause,
+                params + limit_params,
+            )
+            return cursor.fetchall()
+
+
+class LikeSearchBackend:
+    """Unindexed fallback for databases without a supported full-text engine."""
+
+    def index_meeting(self, meeting):
+        pass
+
+    def remove_meeting(self, meeting_id):
+        pass
+
+    def index_task(self, task):
+        pass
+
+    def remove_task(self, task_id):
+        pass
+
+    def _highlight(self, text, terms, window=None):
+        text = text or ""
+        if window:
+            lowered = text.lower()
+            positions = [lowered.find(t.lower()) for t in terms if t.lower() in lowered]
+            start = max(0, min(positions) - window // 2) if positions else 0
+            text = ("…" if start else "") + text[start:start + window]
+        pattern = "|".join(re.escape(t) for t in terms)
+        return re.sub(f"({pattern})", f"{_HL_START}\\1{_HL_END}", text, flags=re.IGNORECASE)
+
+    def search_meetings(self, query, user_id, limit):
+        terms = _query_terms(query)
+        if not terms:
+            return []
+        meetings = Meeting.objects.all()
+        if user_id is not None:
+            meetings = meetings.filter(user_id=user_id)
+        for term in terms:
+            meetings = meetings.filter(
+                Q(title__icontains=term) | Q(summary__icontains=term) | Q(transcript__icontains=term)
+            )
+        return [
+            (m.id, 0.0, self._highlight(m.title, terms),
+             self._highlight(f"{m.summary} {m.transcript}", terms, window=200))
+            for m in meetings.order_by("-created_at")[:limit]
+        ]
+
+    def search_tasks(self, query, user_id, limit):
+        terms = _query_terms(query)
+        if not terms:
+            return []
+        tasks = Task.objects.all()
+        if user_id is not None:
+            tasks = tasks.filter(meeting__user_id=user_id)
+        for term in terms:
+            tasks = tasks.filter(Q(description__icontains=term) | Q(assignee__icontains=term))
+        return [
+            (t.id, 0.0, self._highlight(t.description, terms))
+            for t in tasks.order_by("-created_at")[:limit]
+        ]
+
+
+def get_search_backend():
+    """Return the search backend for the active database vendor."""
+    if connection.vendor == "sqlite":
+        return SQLiteFTSBackend()
+    if connection.vendor == "postgresql":
+        return PostgresSearchBackend()
+    return LikeSearchBackend()
+
+
+def index_tasks(tasks):
+    """Index tasks written without post_save signals (bulk_create); failures are logged, not raised."""
+    backend = get_search_backend()
+    for task in tasks:
+        try:
+            backend.index_task(task)
+        except Exception as e:
+            logger.error(f"Failed to index task {task.id}: {e}")
+
+
+def search(user, query, limit=20):
+    """
+    Ranked, highlighted full-text search over a user's meetings and tasks.
+
+    Args:
+        user: Owner whose meetings and tasks are searched.
+        query: Free-text query string.
+        limit: Maximum number of hits per result type.
+
+    Returns:
+        Dict with "meetings" and "tasks" lists. Each hit holds the model
+        instance, a rank (higher is better) and HTML-safe highlighted text.
+    """
+    backend = get_search_backend()
+
+    meeting_rows = backend.search_meetings(query, user.id, limit)
+    meetings = Meeting.objects.in_bulk([row[0] for row in meeting_rows])
+    meeting_hits = [
+        {
+            "meeting": meetings[row[0]],
+            "rank": float(row[1]),
+            "title": _render_highlight(row[2]),
+            "snippet": _render_highlight(row[3]),
+        }
+        for row in meeting_rows if row[0] in meetings
+    ]
+
+    task_rows = backend.search_tasks(query, user.id, limit)
+    tasks = Task.objects.select_related("meeting").in_bulk([row[0] for row in task_rows])
+    task_hits = [
+        {
+            "task": tasks[row[0]],
+            "rank": float(row[1]),
+            "description": _render_highlight(row[2]),
+        }
+        for row in task_rows if row[0] in tasks
+    ]
+
+    return {"meetings": meeting_hits, "tasks": task_hits}
+
+
+def search_meeting_ids(query, limit=None):
+    """Ranked meeting ids matching `query` across all users (used by the admin); all of them by default."""
+    return [row[0] for row in get_search_backend().search_meetings(query, None, limit)]
+
+
+def search_task_ids(query, limit=None):
+    """Ranked task ids matching `query` across all users (used by the admin); all of them by default."""
+    return [row[0] for row in get_search_backend().search_tasks(query, None, limit)]
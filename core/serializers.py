@@ -0,0 +1,66 @@
+# Serializers for the REST API (core.api).
+# Fields listed in Meta.optional_fields (transcripts, Q&A insights, nested
+# tasks) are left out unless the client asks for them with `?fields=`, and
+# the API only reads the columns of the fields it returns.
+
+from rest_framework import serializers
+
+from .models import Meeting, Task
+
+
+class SparseFieldsMixin:
+    """
+    Serializer restricted to `fields` (names from ?fields=). Without it,
+    every field except Meta.optional_fields is returned.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        keep = set(fields) if fields else set(self.fields) - set(getattr(self.Meta, 'optional_fields', ()))
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+
+    @classmethod
+    def field_names(cls):
+        return tuple(cls.Meta.fields)
+
+
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    deadline = serializers.CharField(source='deadline_text', read_only=True)
+
+    class Meta:
+        model = Task
+        fields = ('id', 'meeting', 'description', 'assignee', 'deadline', 'status', 'created_at')
+        read_only_fields = ('id', 'meeting', 'description', 'assignee', 'created_at')
+        # Model columns behind each field, for Queryset.only()
+        columns = {'deadline': ('deadline_text',)}
+
+
+class MeetingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    audio_url = serializers.SerializerMethodField()
+    task_count = serializers.IntegerField(read_only=True)
+    tasks = TaskSerializer(source='task_set', many=True, read_only=True, fields=(
+        'id', 'description', 'assignee', 'deadline', 'status',
+    ))
+
+    class Meta:
+        model = Meeting
+        fields = (
+            'id', 'title', 'status', 'created_at', 'updated_at', 'summary', 'audio_url', 'audio_tier',
+            'task_count', 'transcript', 'insights', 'tasks',
+        )
+        read_only_fields = fields
+        optional_fields = ('transcript', 'insights', 'tasks')
+        columns = {'audio_url': ('audio_file',), 'task_count': (), 'tasks': ()}
+
+    def get_audio_url(self, meeting):
+        return meeting.audio_file.url if meeting.audio_file else None
+
+
+def columns_for(serializer_class, fields):
+    """Model columns needed to serialize `fields` with `serializer_class`."""
+    columns = getattr(serializer_class.Meta, 'columns', {})
+    needed = {'id'}
+    for name in fields:
+        needed.update(columns.get(name, (name,)))
+    return sorted(needed)
@@ -0,0 +1,92 @@
+# core/signals.py
+# Keeps the full-text search index (core.search) in sync with model writes,
+# removes stored Q&A embeddings (core.embeddings) with their meeting, and
+# invalidates the meeting page's cached fragments on meeting and task writes.
+import logging
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Meeting, Task
+from . import search, embeddings
+
+logger = logging.getLogger(__name__)
+
+# {% cache %} fragments of meeting_detail.html, keyed on (meeting.id, meeting.updated_at)
+MEETING_FRAGMENTS = ("meeting_tabs", "meeting_summary", "meeting_actions", "meeting_transcript")
+
+
+def _touches(update_fields, indexed_fields):
+    """True unless the save was restricted to fields the index doesn't use."""
+    return update_fields is None or bool(set(update_fields) & indexed_fields)
+
+
+@receiver(post_save, sender=Meeting)
+def index_meeting(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or not _touches(update_fields, search.MEETING_INDEXED_FIELDS):
+        return
+    try:
+        search.get_search_backend().index_meeting(instance)
+    except Exception as e:
+        logger.error(f"Failed to index meeting {instance.id}: {e}")
+
+
+@receiver(post_delete, sender=Meeting)
+def unindex_meeting(sender, instance, **kwargs):
+    try:
+        search.get_search_backend().remove_meeting(instance.id)
+    except Exception as e:
+        logger.error(f"Failed to remove meeting {instance.id} from index: {e}")
+
+
+@receiver(post_delete, sender=Meeting)
+def delete_meeting_embeddings(sender, instance, **kwargs):
+    try:
+        embeddings.delete_embeddings(instance.id)
+    except Exception as e:
+        logger.error(f"Failed to delete embeddings for meeting {instance.id}: {e}")
+
+
+@receiver(post_save, sender=Task)
+def index_task(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or not _touches(update_fields, search.TASK_INDEXED_FIELDS):
+        return
+    try:
+        search.get_search_backend().index_task(instance)
+    except Exception as e:
+        logger.error(f"Failed to index task {instance.id}: {e}")
+
+
+@receiver(post_delete, sender=Task)
+def unindex_task(sender, instance, **kwargs):
+    try:
+        search.get_search_backend().remove_task(instance.id)
+    except Exception as e:
+        logger.error(f"Failed to remove task {instance.id} from index: {e}")
+
+
+def meeting_fragment_keys(meeting_id, updated_at):
+    return [
+        make_template_fragment_key(name, [meeting_id, updated_at.timestamp()])
+        for name in MEETING_FRAGMENTS
+    ]
+
+
+@receiver(post_delete, sender=Meeting)
+def delete_meeting_fragments(sender, instance, **kwargs):
+    # Saves need nothing: auto_now moves updated_at, so the old keys are never read again
+    if instance.updated_at:
+        cache.delete_many(meeting_fragment_keys(instance.id, instance.updated_at))
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def touch_task_meeting(sender, instance, raw=False, origin=None, **kwargs):
+    """Bump the meeting's updated_at so fragments showing its tasks are re-rendered."""
+    if raw or isinstance(origin, Meeting):
+        # Fixture loads, or tasks cascading with their meeting's own delete
+        return
+    Meeting.objects.filter(pk=instance.meeting_id).update(updated_at=timezone.now())
@@ -0,0 +1,112 @@
+# Worker startup: import-time profiling and optional preloading.
+# Heavy dependencies (NumPy, SciPy, scikit-learn, the Groq/HTTP clients) are
+# imported lazily inside the processors, so a worker that only serves pages
+# never loads them. Under `gunicorn --preload`, PRELOAD_AI_MODULES imports
+# them once in the master instead, so forked workers share those pages.
+
+import re
+import sys
+import json
+import logging
+import subprocess
+from importlib import import_module
+
+logger = logging.getLogger(__name__)
+
+# Modules that must not be imported just by loading settings + URLconf
+HEAVY_MODULES = ("numpy", "scipy", "sklearn", "groq", "httpx", "requests")
+
+# Imported by preload(); clients and processors are still created per worker
+PRELOAD_MODULES = (
+    "numpy",
+    "scipy.sparse",
+    "sklearn.feature_extraction.text",
+    "sklearn.decomposition",
+    "requests",
+    "httpx",
+    "groq",
+    "core.audio_processing",
+    "core.ai_processor",
+    "core.retrieval",
+    "core.rag_processor",
+)
+
+# Loads settings, apps and the URLconf, i.e. what a worker does at boot
+BOOT_STATEMENT = "import django; django.setup(); import meeting_summarizer.urls"
+
+_PROBE = (
+    "import sys, json, resource; {statement}; "
+    "print(json.dumps({{'modules': sorted(sys.modules), "
+    "'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))"
+)
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def preload():
+    """
+    Import the heavy modules now (in the gunicorn master with --preload).
+    Nothing that owns sockets or threads is created here: API clients are
+    built lazily in each worker after the fork.
+
+    Returns:
+        Tuple of modules that failed to import (missing optional dependencies).
+    """
+    from django.conf import settings
+
+    failed = []
+    for name in (settings.ROOT_URLCONF, *PRELOAD_MODULES):
+        try:
+            import_module(name)
+        except ImportError as e:
+            failed.append(name)
+            logger.warning(f"Preload skipped {name}: {e}")
+    logger.info(f"Preloaded {len(PRELOAD_MODULES) + 1 - len(failed)}/{len(PRELOAD_MODULES) + 1} modules.")
+    return tuple(failed)
+
+
+def import_profile(statement=BOOT_STATEMENT, python=None, env=None, cwd=None):
+    """
+    Run `statement` in a fresh interpreter under `-X importtime`.
+
+    Args:
+        statement: Python code to profile (defaults to a worker boot).
+        python: Interpreter path (defaults to the current one).
+        env: Environment for the child process (defaults to the current one).
+        cwd: Working directory (defaults to the project's BASE_DIR).
+
+    Returns:
+        Dict with total_ms (cumulative import time of top-level imports),
+        imports (list of (module, self_ms, cumulative_ms), slowest first),
+        heavy (HEAVY_MODULES that got imported) and rss_mb (peak RSS).
+    """
+    from django.conf import settings
+
+    result = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", _PROBE.format(statement=statement)],
+        capture_output=True, text=True, env=env, cwd=cwd or settings.BASE_DIR, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup probe failed:\n{result.stderr[-2000:]}")
+
+    imports = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        imports.append((name, int(self_us) / 1000, int(cumulative_us) / 1000))
+        if not indent:
+            total_us += int(cumulative_us)
+
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    loaded = set(probe["modules"])
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss_kb = probe["rss_kb"] / 1024 if sys.platform == "darwin" else probe["rss_kb"]
+    return {
+        "total_ms": total_us / 1000,
+        "imports": sorted(imports, key=lambda item: item[2], reverse=True),
+        "heavy": [name for name in HEAVY_MODULES if name in loaded],
+        "rss_mb": rss_kb / 1024,
+    }
@@ -143,13 +143,22 @@ const Cmd = {
     const query = q.toLowerCase();
     const filtered = this.nav.filter(n => n.label.toLowerCase().includes(query));
 
-    results.innerHTML = filtered.length
+    // Full-text search over meetings and tasks (server-side index)
+    const searchItem = q.trim()
+      ? `<div class="cmd-group-label">Search</div>
+         <a class="cmd-item" href="/search/?q=${encodeURIComponent(q.trim())}">
+           <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="11" cy="11" r="8"/><line x1="21" y1="21" x2="16.65" y2="16.65"/></svg>
+           Search meetings for "${escapeHtml(q.trim())}"
+         </a>`
+      : '';
+
+    results.innerHTML = searchItem + (filtered.length
       ? `<div class="cmd-group-label">Navigation</div>` + filtered.map(n =>
           `<a class="cmd-item" href="${n.href}">
              <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="3" y="3" width="7" height="7"/><rect x="14" y="3" width="7" height="7"/><rect x="14" y="14" width="7" height="7"/><rect x="3" y="14" width="7" height="7"/></svg>
              ${n.label}
            </a>`).join('')
-      : `<div style="padding:24px;text-align:center;color:var(--text-subtle);font-size:13px;">No results for "${q}"</div>`;
+      : (searchItem ? '' : `<div style="padding:24px;text-align:center;color:var(--text-subtle);font-size:13px;">No results for "${escapeHtml(q)}"</div>`));
     this.selectedIndex = -1;
   }
 };
@@ -0,0 +1,101 @@
+# Audio I/O through Django's storage API.
+# Stored audio is addressed only by its storage name, never by a path under
+# MEDIA_ROOT, so uploads can live in an object store (settings.FILE_STORAGE)
+# and a worker on another node can process them. ffmpeg and the WAV reader
+# need a local file: local_audio() uses the file in place when the storage
+# is a local disk, and otherwise streams it chunk by chunk into a temporary
+# file, so no full copy is ever held in memory.
+
+import os
+import logging
+import tempfile
+from contextlib import contextmanager
+
+from django.core.files.storage import FileSystemStorage, Storage, default_storage
+from django.utils.deconstruct import deconstructible
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024   # bytes per storage read
+
+
+def iter_chunks(name, storage=None, chunk_size=CHUNK_SIZE):
+    """Bytes of a stored file, `chunk_size` at a time."""
+    storage = storage or default_storage
+    with storage.open(name, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            yield chunk
+
+
+def local_path(storage, name):
+    """Filesystem path of a stored file, or None when the storage has none (object stores)."""
+    try:
+        return storage.path(name)
+    except NotImplementedError:
+        return None
+
+
+@contextmanager
+def local_audio(field_file, chunk_size=CHUNK_SIZE):
+    """
+    A local path to a stored file (e.g. meeting.audio_file) for the
+    duration of the `with` block. Downloaded copies are deleted afterwards.
+    """
+    path = local_path(field_file.storage, field_file.name)
+    if path is not None:
+        yield path
+        return
+
+    fd, tmp_path = tempfile.mkstemp(prefix='meetingly-', suffix=os.path.splitext(field_file.name)[1])
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in iter_chunks(field_file.name, field_file.storage, chunk_size):
+                out.write(chunk)
+        logger.info(f"Fetched {field_file.name} from storage ({os.path.getsize(tmp_path) / 1e6:.1f} MB).")
+        yield tmp_path
+    finally:
+        os.remove(tmp_path)
+
+
+@deconstructible
+class LocalObjectStorage(Storage):
+    """
+    Stand-in for an S3-compatible object store (FILE_STORAGE=object), for
+    development and tests. Objects are kept in MEDIA_ROOT but, as with S3,
+    have no filesystem path (path() raises NotImplementedError): they can
+    only be read, written and deleted through the storage API. Code that
+    runs against it runs against FILE_STORAGE=s3.
+    """
+
+    def __init__(self, location=None, base_url=None):
+        self._disk = FileSystemStorage(location=location, base_url=base_url)
+
+    def _open(self, name, mode='rb'):
+        return self._disk._open(name, mode)
+
+    def _save(self, name, content):
+        return self._disk._save(name, content)
+
+    def delete(self, name):
+        self._disk.delete(name)
+
+    def exists(self, name):
+        return self._disk.exists(name)
+
+    def listdir(self, path):
+        return self._disk.listdir(path)
+
+    def size(self, name):
+        return self._disk.size(name)
+
+    def url(self, name):
+        return self._disk.url(name)
+
+    def get_modified_time(self, name):
+        return self._disk.get_modified_time(name)
+
+    def get_created_time(self, name):
+        return self._disk.get_created_time(name)
+
+    def get_accessed_time(self, name):
+        return self._disk.get_accessed_time(name)
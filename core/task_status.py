@@ -0,0 +1,73 @@
+# Task status changes for many tasks at once (the meeting page's checkboxes
+# and "Mark all complete", and the API's tasks/bulk/ action).
+# Ownership of every task is checked in one query and the new statuses are
+# written with one bulk UPDATE. Queryset writes skip post_save, so the
+# meetings' updated_at is bumped here, as signals.touch_task_meeting does for
+# single saves. Status isn't in the search index, so nothing else needs
+# refreshing.
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Meeting, Task
+
+STATUSES = tuple(key for key, _ in Task.STATUS_CHOICES)
+MAX_BULK_UPDATES = 500
+
+
+def parse_updates(items):
+    """
+    Validate [{"id": <task id>, "status": <status>}, ...].
+
+    Returns:
+        Dict of task id -> status (a repeated id keeps its last status).
+
+    Raises:
+        ValueError: The list is empty, too long, or has a malformed entry.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError("Expected a non-empty list of {id, status} objects.")
+    if len(items) > MAX_BULK_UPDATES:
+        raise ValueError(f"At most {MAX_BULK_UPDATES} tasks per request.")
+    updates = {}
+    for number, item in enumerate(items, 1):
+        if not isinstance(item, dict):
+            raise ValueError(f"Entry {number} is not an object.")
+        task_id, status = item.get("id"), item.get("status")
+        if not isinstance(task_id, int) or isinstance(task_id, bool):
+            raise ValueError(f"Entry {number} has no integer id.")
+        if status not in STATUSES:
+            raise ValueError(f"Entry {number}: status must be one of {', '.join(STATUSES)}.")
+        updates[task_id] = status
+    return updates
+
+
+def apply_statuses(user, updates):
+    """
+    Set the statuses in `updates` (task id -> status) on `user`'s tasks.
+    Nothing is written unless every task exists and belongs to `user`.
+
+    Returns:
+        (tasks, missing): [{"id", "meeting", "status"}] in id order, and the
+        ids that were not found (in which case tasks is empty).
+    """
+    with transaction.atomic():
+        owned = dict(
+            Task.objects.select_for_update()
+            .filter(id__in=updates, meeting__user=user)
+            .values_list('id', 'meeting_id')
+        )
+        missing = sorted(set(updates) - set(owned))
+        if missing:
+            return [], missing
+
+        Task.objects.bulk_update(
+            [Task(id=task_id, status=status) for task_id, status in updates.items()],
+            ['status'],
+        )
+        Meeting.objects.filter(id__in=set(owned.values())).update(updated_at=timezone.now())
+
+    return [
+        {"id": task_id, "meeting": owned[task_id], "status": updates[task_id]}
+        for task_id in sorted(updates)
+    ], []
@@ -1,3 +1,1598 @@
-from django.test import TestCase
+import io
+import os
+import csv
+import gzip
+import json
+import time
+import wave
+import base64
+import shutil
+import asyncio
+import tempfile
+import threading
+from types import SimpleNamespace
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+import groq
+import httpx
+import numpy as np
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core import (
+    audio_processing, batch, context_packer, export, extractive, hf_client, insights, llm_gateway, ratelimit,
+    reprocess, retention, search, transcripts, uploads, views,
+)
+from core import progress as progress_store
+from core import storage as file_storage
+from core.ai_processor import MeetingAIProcessor
+from core.context_packer import estimate_tokens
+from core.coreference import PronounResolver
+from core.models import Meeting, Task, TranscriptSegment
+from core.startup import import_profile
+
+TRANSCRIPT = (
+    "Alice: Welcome everyone, the agenda today covers the budget review and the launch timeline. "
+    "Bob said the numbers look good overall but marketing costs went up this quarter. "
+    "Alice will send the revised budget to the finance team by Friday. "
+    "Bob will book the venue for the launch event next week. "
+    "We agreed to meet again on Monday to confirm the final plan."
+)
+PEOPLE = [{"entity_group": "PER", "word": "Alice"}, {"entity_group": "PER", "word": "Bob"}]
+
+# Pages render without `collectstatic` (the manifest storage needs its manifest)
+plain_static_files = override_settings(STORAGES={
+    **settings.STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+
+
+class StartupImportTests(SimpleTestCase):
+    """Worker boot stays light: heavy AI dependencies are imported on first use."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.profile = import_profile()
+
+    def test_heavy_modules_not_imported_at_boot(self):
+        self.assertEqual(self.profile['heavy'], [])
+
+    def test_import_time_within_budget(self):
+        self.assertLessEqual(self.profile['total_ms'], settings.STARTUP_IMPORT_BUDGET_MS)
+
+
+@mock.patch.object(hf_client, 'extract_entities', return_value=PEOPLE)
+@mock.patch.object(hf_client, 'summarize_text', return_value="The budget and launch were reviewed.")
+class ReprocessTests(TestCase):
+    """Reprocessing runs only stale stages and keeps task rows (core.reprocess)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice')
+
+    def setUp(self):
+        self.meeting = Meeting.objects.create(
+            title="Budget sync", user=self.user, transcript=TRANSCRIPT, summary="Old summary.", status='completed',
+        )
+        self.processor = MeetingAIProcessor()
+
+    def test_second_run_changes_nothing(self, summarize_text, extract_entities):
+        first = reprocess.reprocess(self.meeting, ('summary', 'tasks'), processor=self.processor)
+        self.assertEqual(first['summary']['status'], 'updated')
+        self.assertEqual(first['tasks']['added'], 2)
+        task_ids = set(Task.objects.filter(meeting=self.meeting).values_list('id', flat=True))
+
+        self.meeting.refresh_from_db()
+        second = reprocess.reprocess(self.meeting, ('summary', 'tasks'), processor=self.processor)
+        self.assertEqual(second['summary'], {'status': 'unchanged'})
+        self.assertEqual(second['tasks'], {'status': 'unchanged'})
+        self.assertEqual(summarize_text.call_count, 1)
+        self.assertEqual(set(Task.objects.filter(meeting=self.meeting).values_list('id', flat=True)), task_ids)
+
+    def test_completed_task_keeps_its_row_when_assignee_changes(self, summarize_text, extract_entities):
+        task = Task.objects.create(
+            meeting=self.meeting, description="Send the revised budget to the finance team by Friday.",
+            assignee="Carol", status='completed',
+        )
+        report = reprocess.reprocess(self.meeting, ('tasks',), processor=self.processor)
+
+        self.assertEqual(report['tasks']['kept'], 1)
+        self.assertEqual(report['tasks']['updated'], 1)
+        self.assertEqual(report['tasks']['removed'], 0)
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'completed')
+        self.assertEqual(task.assignee, 'Alice')
+        self.assertEqual(task.deadline_text, 'Friday')
+
+    def test_fallback_summary_is_not_recorded(self, summarize_text, extract_entities):
+        summarize_text.side_effect = RuntimeError("API down")
+        report = reprocess.reprocess(self.meeting, ('summary',), processor=self.processor)
+
+        self.assertEqual(report['summary']['status'], 'failed')
+        self.meeting.refresh_from_db()
+        self.assertEqual(self.meeting.summary, "Old summary.")
+        self.assertNotIn('summary', self.meeting.pipeline)
+        self.assertIn('summary', reprocess.stale_stages(self.meeting))
+
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS={'ask': {'user': '2/hour', 'global': ''}})
+class RateLimitTests(TestCase):
+    """Token buckets refuse requests once spent (core.ratelimit)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice')
+        cls.meeting = Meeting.objects.create(
+            title="Budget sync", user=cls.user, transcript=TRANSCRIPT, summary="Budget review.",
+            status='completed', insights={'owners': "Alice sends the budget; Bob books the venue."},
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def ask(self, question):
+        return self.client.post(
+            reverse('ask_question', args=[self.meeting.id]), {'question': question}, content_type='application/json',
+        )
+
+    def test_user_bucket_refuses_when_empty(self):
+        self.assertTrue(ratelimit.check('ask', self.user.id)['allowed'])
+        self.assertTrue(ratelimit.check('ask', self.user.id)['allowed'])
+        decision = ratelimit.check('ask', self.user.id)
+        self.assertFalse(decision['allowed'])
+        self.assertEqual(decision['scope'], 'user')
+        self.assertGreaterEqual(decision['retry_after'], 1)
+        # Another user's bucket is untouched
+        self.assertTrue(ratelimit.check('ask', self.user.id + 1)['allowed'])
+
+    @override_settings(RATE_LIMITS={'ask': {'user': '', 'global': '2/hour'}})
+    def test_global_bucket_is_shared(self):
+        self.assertTrue(ratelimit.check('ask', 1)['allowed'])
+        self.assertTrue(ratelimit.check('ask', 2)['allowed'])
+        decision = ratelimit.check('ask', 3)
+        self.assertFalse(decision['allowed'])
+        self.assertEqual(decision['scope'], 'global')
+
+    def test_oversized_request_is_charged_a_full_bucket(self):
+        self.assertTrue(ratelimit.check('ask', self.user.id, cost=50)['allowed'])
+        self.assertFalse(ratelimit.check('ask', self.user.id)['allowed'])
+
+    # Questions cost a little over 1 token (their body size counts too)
+    @override_settings(RATE_LIMITS={'ask': {'user': '3/hour', 'global': ''}})
+    @mock.patch('core.views.get_rag_processor')
+    def test_ask_returns_429_with_retry_after(self, get_rag_processor):
+        get_rag_processor.return_value.ask_question.return_value = {'answer': "Friday.", 'sources': []}
+        self.assertEqual(self.ask("When is the budget due?").status_code, 200)
+        self.assertEqual(self.ask("Who books the venue?").status_code, 200)
+
+        response = self.ask("What did Bob say?")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['scope'], 'user')
+        self.assertEqual(response['Retry-After'], str(response.json()['retry_after']))
+        self.assertEqual(get_rag_processor.return_value.ask_question.call_count, 2)
+
+    @plain_static_files
+    @override_settings(RATE_LIMITS={'upload': {'user': '2/hour', 'global': ''}})
+    def test_invalid_uploads_are_not_charged(self):
+        ratelimit.check('upload', self.user.id, cost=50)   # spend the whole bucket
+        url = reverse('upload_meeting')
+
+        response = self.client.post(url, {'title': "Call", 'audio_file': ContentFile(b'text', name='notes.exe')})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Unsupported file type')
+        self.assertEqual(self.client.post(url, {'title': "Call"}).status_code, 200)
+
+        response = self.client.post(url, {'title': "Call", 'audio_file': ContentFile(b'RIFF', name='call.wav')})
+        self.assertEqual(response.status_code, 429)
+
+    @plain_static_files
+    @override_settings(RATE_LIMITS={'process_text': {'user': '2/hour', 'global': ''}})
+    def test_incomplete_text_is_not_charged(self):
+        ratelimit.check('process_text', self.user.id, cost=50)
+        url = reverse('process_text_meeting')
+
+        self.assertEqual(self.client.post(url, {'title': "Call", 'meeting_text': ''}).status_code, 200)
+        self.assertEqual(self.client.post(url, {'title': "Call", 'meeting_text': TRANSCRIPT}).status_code, 429)
+
+    @mock.patch('core.views.get_rag_processor')
+    def test_precomputed_answers_are_free(self, get_rag_processor):
+        get_rag_processor.return_value.ask_question.return_value = {'answer': "Alice and Bob.", 'sources': []}
+        for _ in range(3):
+            self.assertEqual(self.ask("Who has action items?").status_code, 200)
+
+
+class APITests(TestCase):
+    """REST API routing, ownership, field selection and conditional GETs (core.api)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice')
+        cls.other = User.objects.create_user('bob')
+        cls.meeting = Meeting.objects.create(
+            title="Budget sync", user=cls.user, transcript=TRANSCRIPT, summary="Budget review.", status='completed',
+        )
+        cls.task = Task.objects.create(meeting=cls.meeting, description="Send the budget", assignee="Alice")
+        cls.others_meeting = Meeting.objects.create(title="Private", user=cls.other, status='completed')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def detail_url(self, pk):
+        return reverse('api-meeting-detail', kwargs={'version': 'v1', 'pk': pk})
+
+    def test_meeting_detail(self):
+        response = self.client.get(self.detail_url(self.meeting.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], "Budget sync")
+        self.assertNotIn('transcript', response.json())
+
+    def test_non_numeric_id_is_404(self):
+        self.assertEqual(self.client.get('/api/v1/meetings/abc/').status_code, 404)
+        self.assertEqual(self.client.get('/api/v1/tasks/abc/').status_code, 404)
+
+    def test_other_users_objects_are_404(self):
+        self.assertEqual(self.client.get(self.detail_url(self.others_meeting.id)).status_code, 404)
+        self.client.force_login(self.other)
+        url = reverse('api-task-detail', kwargs={'version': 'v1', 'pk': self.task.id})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_unknown_version_is_404(self):
+        self.assertEqual(self.client.get(f'/api/v2/meetings/{self.meeting.id}/').status_code, 404)
+
+    def test_anonymous_requests_are_refused(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.detail_url(self.meeting.id)).status_code, 403)
+
+    def test_sparse_fields(self):
+        response = self.client.get(self.detail_url(self.meeting.id), {'fields': 'id,transcript'})
+        self.assertEqual(response.json(), {'id': self.meeting.id, 'transcript': TRANSCRIPT})
+
+    def test_unknown_field_is_400(self):
+        response = self.client.get(self.detail_url(self.meeting.id), {'fields': 'id,nope'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nope', response.json()['fields'])
+        list_url = reverse('api-meeting-list', kwargs={'version': 'v1'})
+        self.assertEqual(self.client.get(list_url, {'fields': 'nope'}).status_code, 400)
+
+    def test_matching_etag_is_304_until_the_meeting_changes(self):
+        url = self.detail_url(self.meeting.id)
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        # Changing a task bumps the meeting's updated_at, and so its ETag
+        self.task.status = 'completed'
+        self.task.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_etag_is_304(self):
+        url = reverse('api-task-list', kwargs={'version': 'v1'})
+        response = self.client.get(url)
+        self.assertEqual([task['id'] for task in response.json()['results']], [self.task.id])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+
+@override_settings(PROGRESS_POLL_SECONDS=0.01)
+class ProgressStatusTests(TestCase):
+    """Progress events behind the status polling and SSE endpoints (core.progress)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice')
+        cls.other = User.objects.create_user('bob')
+        cls.meeting = Meeting.objects.create(title="Budget sync", user=cls.user, status='processing')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.url = reverse('meeting_status', args=[self.meeting.id])
+
+    def test_status_follows_published_events(self):
+        progress_store.record_stage('summarize', 10.0)
+        progress_store.record_stage('extract', 4.0)
+        tracker = progress_store.ProgressTracker(self.meeting.id, self.user.id, progress_store.TEXT_STAGES)
+        tracker.start('summarize', total=3)
+
+        payload = self.client.get(self.url).json()
+        self.assertEqual((payload['status'], payload['stage'], payload['stage_index'], payload['stage_count']),
+                         ('processing', 'summarize', 0, 3))
+        self.assertEqual(payload['stage_label'], "Generating summary")
+        # History for this stage and the next; insights never ran
+        self.assertEqual(payload['eta_seconds'], 14)
+        self.assertNotIn('user_id', payload)
+
+        tracker.advance(1)
+        payload = self.client.get(self.url).json()
+        self.assertEqual((payload['done'], payload['total'], payload['version']), (1, 3, 2))
+
+        tracker.complete()
+        payload = self.client.get(self.url).json()
+        self.assertEqual((payload['status'], payload['stage'], payload['eta_seconds']), ('completed', None, None))
+        self.assertEqual(progress_store.stage_history('summarize')['runs'], 2)
+
+    def test_weak_etag_is_304_until_the_next_event(self):
+        tracker = progress_store.ProgressTracker(self.meeting.id, self.user.id)
+        tracker.start('transcribe')
+        etag = self.client.get(self.url)['ETag']
+
+        for header in (etag, f'W/{etag}', f'"stale", W/{etag}'):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag.strip('"')).status_code, 200)
+
+        tracker.advance(1, 2)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=f'W/{etag}').status_code, 200)
+
+    def test_status_falls_back_to_the_database(self):
+        payload = self.client.get(self.url).json()
+        self.assertEqual((payload['meeting_id'], payload['status']), (self.meeting.id, 'processing'))
+
+    def test_other_users_progress_is_404(self):
+        progress_store.ProgressTracker(self.meeting.id, self.user.id).start('transcribe')
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_upload_progress_by_token(self):
+        tracker = progress_store.ProgressTracker(self.meeting.id, self.user.id)
+        url = reverse('upload_progress', args=['0b6e1c5e-upload'])
+        self.assertEqual(self.client.get(url).json(), {'status': 'pending'})
+
+        tracker.bind_token('0b6e1c5e-upload')
+        tracker.start('transcribe')
+        self.assertEqual(self.client.get(url).json()['stage'], 'transcribe')
+
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    async def read_events(self, tracker=None):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        response = await views.meeting_events(request, self.meeting.id)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = []
+        async for chunk in response.streaming_content:
+            event = chunk.decode() if isinstance(chunk, bytes) else chunk
+            events.append(json.loads(event.split('data: ', 1)[1]))
+            if tracker is not None and len(events) == 1:
+                tracker.complete()
+        return events
+
+    async def test_event_stream_ends_when_processing_completes(self):
+        tracker = progress_store.ProgressTracker(self.meeting.id, self.user.id)
+        tracker.start('transcribe')
+
+        events = await self.read_events(tracker)
+        self.assertEqual([event['status'] for event in events], ['processing', 'completed'])
+        self.assertEqual([event['version'] for event in events], [1, 2])
+
+    async def test_event_stream_of_a_finished_meeting_sends_one_event(self):
+        await Meeting.objects.filter(pk=self.meeting.pk).aupdate(status='failed')
+        events = await self.read_events()
+        self.assertEqual([event['status'] for event in events], ['failed'])
+
+
+class TaskStatusTests(TestCase):
+    """Bulk task status changes check ownership and validate first (core.task_status)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice')
+        cls.other = User.objects.create_user('bob')
+        cls.meeting = Meeting.objects.create(title="Budget sync", user=cls.user, status='completed')
+        cls.tasks = [
+            Task.objects.create(meeting=cls.meeting, description="Send the budget"),
+            Task.objects.create(meeting=cls.meeting, description="Book the venue"),
+        ]
+        others_meeting = Meeting.objects.create(title="Private", user=cls.other, status='completed')
+        cls.others_task = Task.objects.create(meeting=others_meeting, description="Hire a designer")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def post(self, body, url=None):
+        return self.client.post(url or reverse('update_task_statuses'), body, content_type='application/json')
+
+    def statuses(self):
+        return list(Task.objects.order_by('id').values_list('status', flat=True))
+
+    def test_updates_every_task_and_bumps_the_meeting(self):
+        before = Meeting.objects.get(pk=self.meeting.pk).updated_at
+        response = self.post({'tasks': [
+            {'id': self.tasks[0].id, 'status': 'completed'},
+            {'id': self.tasks[1].id, 'status': 'cancelled'},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['tasks'], [
+            {'id': self.tasks[0].id, 'meeting': self.meeting.id, 'status': 'completed'},
+            {'id': self.tasks[1].id, 'meeting': self.meeting.id, 'status': 'cancelled'},
+        ])
+        self.assertEqual(self.statuses(), ['completed', 'cancelled', 'pending'])
+        self.assertGreater(Meeting.objects.get(pk=self.meeting.pk).updated_at, before)
+
+    def test_another_users_task_changes_nothing(self):
+        response = self.post({'tasks': [
+            {'id': self.tasks[0].id, 'status': 'completed'},
+            {'id': self.others_task.id, 'status': 'completed'},
+        ]})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['missing'], [self.others_task.id])
+        self.assertEqual(self.statuses(), ['pending', 'pending', 'pending'])
+
+    def test_invalid_requests_are_400(self):
+        bodies = [
+            'not json',
+            {'tasks': []},
+            {'tasks': [{'id': self.tasks[0].id, 'status': 'done'}]},
+            {'tasks': [{'id': str(self.tasks[0].id), 'status': 'completed'}]},
+            {'tasks': [{'id': True, 'status': 'completed'}]},
+            {'tasks': [{'id': i, 'status': 'completed'} for i in range(501)]},
+        ]
+        for body in bodies:
+            with self.subTest(body=str(body)[:60]):
+                self.assertEqual(self.post(body).status_code, 400)
+        self.assertEqual(self.statuses(), ['pending', 'pending', 'pending'])
+
+    def test_api_bulk_action(self):
+        url = reverse('api-task-bulk', kwargs={'version': 'v1'})
+        response = self.post({'tasks': [{'id': self.tasks[1].id, 'status': 'completed'}]}, url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.statuses(), ['pending', 'completed', 'pending'])
+        response = self.post({'tasks': [{'id': self.others_task.id, 'status': 'cancelled'}]}, url)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.post({'tasks': 'all'}, url).status_code, 400)
+
+
+class ExportTests(TestCase):
+    """Meeting exports in each format, limited to the user's meetings (core.export)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice')
+        cls.meeting = Meeting.objects.create(
+            title="Budget sync", user=cls.user, transcript=TRANSCRIPT, summary="Budget review.", status='completed',
+        )
+        Task.objects.create(
+            meeting=cls.meeting, description="Send the budget", assignee="Alice", deadline_text="Friday",
+            status='completed',
+        )
+        Task.objects.create(meeting=cls.meeting, description="Book the venue")
+        Meeting.objects.create(title="Planning", user=cls.user, status='completed')
+        Meeting.objects.create(title="Private", user=User.objects.create_user('bob'), status='completed')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def export(self, **params):
+        response = self.client.get(reverse('export_meetings'), params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_jsonl(self):
+        response, body = self.export()
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        self.assertIn('.jsonl"', response['Content-Disposition'])
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([record['title'] for record in records], ["Budget sync", "Planning"])
+        self.assertEqual(records[0]['owner'], 'alice')
+        self.assertEqual(records[0]['tasks'][0], {
+            'id': records[0]['tasks'][0]['id'], 'description': "Send the budget", 'assignee': "Alice",
+            'deadline': "Friday", 'status': 'completed',
+        })
+        self.assertEqual(records[1]['tasks'], [])
+        self.assertNotIn('transcript', records[0])
+
+    def test_transcript_on_request(self):
+        _, body = self.export(transcript='1')
+        self.assertEqual(json.loads(body.splitlines()[0])['transcript'], TRANSCRIPT)
+
+    def test_csv(self):
+        response, body = self.export(format='csv')
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([row['title'] for row in rows], ["Budget sync", "Planning"])
+        self.assertEqual(rows[0]['tasks'], "[completed] Send the budget (Alice, Friday)\n[pending] Book the venue")
+        self.assertEqual(rows[1]['tasks'], "")
+
+    def test_markdown(self):
+        response, body = self.export(format='md')
+        self.assertTrue(response['Content-Type'].startswith('text/markdown'))
+        self.assertIn("# Budget sync\n", body)
+        self.assertIn("## Summary\n\nBudget review.\n", body)
+        self.assertIn("- [x] Send the budget — Alice, Friday\n", body)
+        self.assertIn("- [ ] Book the venue\n", body)
+        self.assertNotIn("Private", body)
+
+    def test_unknown_format_is_400(self):
+        self.assertEqual(self.client.get(reverse('export_meetings'), {'format': 'xml'}).status_code, 400)
+
+    def test_small_chunks_export_everything(self):
+        body = "".join(export.export('jsonl', self.user, chunk_size=1))
+        self.assertEqual(len(body.splitlines()), 2)
+
+
+def write_archive(path, out_path, bitrate):
+    """Stand-in for audio_processing.archive_audio: a 10-byte copy."""
+    with open(out_path, 'wb') as f:
+        f.write(b'x' * 10)
+    return '.ogg'
+
+
+class AudioRetentionTests(TestCase):
+    """Old audio is archived, then deleted, a whole stored file at a time (core.retention)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice')
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def meeting(self, days_old, audio_file=None, status='completed'):
+        name = audio_file or default_storage.save('meetings/call.wav', ContentFile(b'\0' * 1000))
+        meeting = Meeting.objects.create(title="Call", user=self.user, status=status, audio_file=name)
+        Meeting.objects.filter(pk=meeting.pk).update(created_at=timezone.now() - timedelta(days=days_old))
+        return Meeting.objects.get(pk=meeting.pk)
+
+    def test_due_files(self):
+        old = self.meeting(40)
+        young = self.meeting(5)
+        processing = self.meeting(40, status='processing')
+        shared = self.meeting(40)
+        self.meeting(5, audio_file=shared.audio_file.name)   # a young meeting uses the same file
+
+        due = retention.due_files(('original',), 30)
+        self.assertEqual(due, {old.audio_file.name: [old.id]})
+        self.assertNotIn(young.audio_file.name, due)
+        self.assertNotIn(processing.audio_file.name, due)
+
+    def test_delete_clears_every_meeting_using_the_file(self):
+        first = self.meeting(400)
+        second = self.meeting(400, audio_file=first.audio_file.name)
+        name = first.audio_file.name
+
+        self.assertEqual(retention.delete_file(name, [first.id, second.id]), 1000)
+        self.assertFalse(default_storage.exists(name))
+        for meeting in (first, second):
+            updated = Meeting.objects.get(pk=meeting.pk)
+            self.assertEqual(updated.audio_tier, 'deleted')
+            self.assertFalse(updated.audio_file)
+            self.assertIsNotNone(updated.audio_tiered_at)
+            self.assertGreater(updated.updated_at, meeting.updated_at)
+
+    def test_limit_counts_only_due_files(self):
+        blocked = self.meeting(50)
+        self.meeting(5, audio_file=blocked.audio_file.name)   # the oldest file is still in use
+        self.meeting(45, status='processing')
+        due_first = self.meeting(40)
+        due_second = self.meeting(35)
+
+        for batch_size in (1, 2, 500):
+            with self.subTest(batch_size=batch_size), mock.patch.object(retention, 'CHECK_BATCH', batch_size):
+                self.assertEqual(retention.due_files(('original',), 30, limit=1),
+                                 {due_first.audio_file.name: [due_first.id]})
+                self.assertEqual(list(retention.due_files(('original',), 30, limit=5)),
+                                 [due_first.audio_file.name, due_second.audio_file.name])
+
+    def test_file_picked_up_by_a_new_meeting_is_kept(self):
+        old = self.meeting(400)
+        due = retention.due_files(('original',), 365)
+        self.meeting(0, audio_file=old.audio_file.name)
+
+        self.assertEqual(retention.delete_file(old.audio_file.name, due[old.audio_file.name]), 0)
+        self.assertTrue(default_storage.exists(old.audio_file.name))
+        self.assertEqual(Meeting.objects.get(pk=old.pk).audio_tier, 'original')
+
+    @mock.patch('core.audio_processing.archive_audio', side_effect=write_archive)
+    def test_archive_replaces_the_original(self, archive_audio):
+        meeting = self.meeting(40)
+        name = meeting.audio_file.name
+
+        self.assertEqual(retention.archive_file(name, [meeting.id]), 990)
+        meeting.refresh_from_db()
+        self.assertEqual(meeting.audio_tier, 'archived')
+        self.assertTrue(meeting.audio_file.name.startswith(f"{retention.ARCHIVE_DIR}/"))
+        self.assertTrue(meeting.audio_file.name.endswith('.ogg'))
+        self.assertTrue(default_storage.exists(meeting.audio_file.name))
+        self.assertFalse(default_storage.exists(name))
+
+    @mock.patch('core.audio_processing.archive_audio', side_effect=write_archive)
+    def test_archive_copy_that_is_not_smaller_is_dropped(self, archive_audio):
+        name = default_storage.save('meetings/tiny.opus', ContentFile(b'\0' * 5))
+        meeting = self.meeting(40, audio_file=name)
+
+        self.assertEqual(retention.archive_file(name, [meeting.id]), 0)
+        meeting.refresh_from_db()
+        self.assertEqual((meeting.audio_tier, meeting.audio_file.name), ('original', name))
+        self.assertFalse(default_storage.exists(retention.ARCHIVE_DIR))
+
+    @mock.patch('core.audio_processing.archive_audio', side_effect=write_archive)
+    def test_command_deletes_before_archiving(self, archive_audio):
+        recent = self.meeting(40)
+        ancient = self.meeting(400)
+        young = self.meeting(5)
+
+        out = io.StringIO()
+        call_command('apply_audio_retention', archive_after=30, delete_after=365, dry_run=True, stdout=out)
+        self.assertIn("[dry run] Deleted 1 file(s), archived 1", out.getvalue())
+        self.assertEqual(set(Meeting.objects.values_list('audio_tier', flat=True)), {'original'})
+
+        call_command('apply_audio_retention', archive_after=30, delete_after=365, stdout=io.StringIO())
+        tiers = dict(Meeting.objects.values_list('id', 'audio_tier'))
+        self.assertEqual(tiers, {recent.id: 'archived', ancient.id: 'deleted', young.id: 'original'})
+        self.assertEqual(archive_audio.call_count, 2)   # the dry run transcodes too, to measure
+
+
+class PronounResolutionTests(SimpleTestCase):
+    """
+    Pronoun subjects of action items resolve only when the transcript makes
+    the person clear; otherwise the assignee is left empty (core.coreference).
+    """
+
+    def assignees(self, text, names):
+        entities = [{"entity_group": "PER", "word": name} for name in names]
+        with mock.patch.object(hf_client, 'extract_entities', return_value=entities):
+            items = MeetingAIProcessor().extract_action_items(text)
+        return [item['assignee'] for item in items]
+
+    def test_single_person_mentioned(self):
+        text = "Carol mentioned the budget numbers are late. She will update the spreadsheet before the review."
+        self.assertEqual(self.assignees(text, ["Carol"]), ["Carol"])
+
+    def test_first_person_is_the_speaker(self):
+        text = "Alice: Thanks everyone for coming today.\nAlice: I'll send the revised deck by Friday."
+        self.assertEqual(self.assignees(text, ["Alice"]), ["Alice"])
+
+    def test_honorific_shows_pronouns(self):
+        text = "Ms. Lee met Mr. Park about the launch. She will draft the press release this week."
+        self.assertEqual(self.assignees(text, ["Lee", "Park"]), ["Lee"])
+
+    def test_they_for_someone_known_to_use_they(self):
+        text = "Sam presented their roadmap draft today. They will share the slides by Friday."
+        self.assertEqual(self.assignees(text, ["Sam"]), ["Sam"])
+
+    def test_two_candidates_are_ambiguous(self):
+        text = "Alice will email Bob the contract today. He will also book the room for Friday."
+        self.assertEqual(self.assignees(text, ["Alice", "Bob"]), ["Alice", ""])
+
+    def test_plural_they_is_not_resolved(self):
+        text = "Dana and Eli met the client yesterday. They will send the revised quote tomorrow."
+        self.assertEqual(self.assignees(text, ["Dana", "Eli"]), [""])
+
+    def test_pronoun_that_disagrees_is_not_resolved(self):
+        text = "Sarah shared her notes with everyone. Sarah said that he will fix the build tonight."
+        self.assertEqual(self.assignees(text, ["Sarah"]), [""])
+
+    def test_we_and_you_are_not_resolved(self):
+        text = "Alice: The launch is close.\nAlice: We will review the plan on Monday. You will send the notes."
+        self.assertEqual(self.assignees(text, ["Alice"]), ["", ""])
+
+    def test_mentions_expire_after_the_window(self):
+        resolver = PronounResolver(["Carol"], window=1)
+        for sentence in ("Carol joined late.", "The budget was discussed.", "Nothing else came up."):
+            resolver.finish(resolver.start(sentence))
+        resolver.start("She will send the notes.")
+        self.assertEqual(resolver.resolve("she", "She will send the notes."), "")
+
+    def test_name_alone_does_not_set_pronouns(self):
+        resolver = PronounResolver(["Alex"])
+        resolver.finish(resolver.start("Alex presented the numbers."))
+        sentence = resolver.start("He will send them round.")
+        self.assertEqual(resolver.resolve("he", sentence), "Alex")
+        self.assertEqual(resolver.resolve("she", sentence), "Alex")
+        self.assertEqual(resolver.resolve("they", sentence), "")
+
+
+@plain_static_files
+class SearchTests(TestCase):
+    """The full-text index follows meeting and task writes and stays per user (core.search)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice')
+        cls.other = User.objects.create_user('bob')
+        # Created in this order so id order differs from rank order
+        cls.private = Meeting.objects.create(
+            title="Secret project", user=cls.other, transcript="Budget, budget.", status='completed',
+        )
+        Task.objects.create(meeting=cls.private, description="Hide the budget")
+        cls.mention = Meeting.objects.create(
+            title="Standup", user=cls.user, transcript="Someone mentioned the budget briefly.", status='completed',
+        )
+        cls.review = Meeting.objects.create(
+            title="Quarterly <b>budget</b> review", user=cls.user, summary="The budget was approved.",
+            transcript="We went over the budget line by line.", status='completed',
+        )
+        cls.task = Task.objects.create(meeting=cls.review, description="Send the budget spreadsheet", assignee="Alice")
+
+    def meeting_ids(self, query):
+        return [hit['meeting'].id for hit in search.search(self.user, query)['meetings']]
+
+    def task_ids(self, query):
+        return [hit['task'].id for hit in search.search(self.user, query)['tasks']]
+
+    def test_ranked_hits_with_escaped_highlighting(self):
+        results = search.search(self.user, "budget")
+        self.assertEqual([hit['meeting'].id for hit in results['meetings']], [self.review.id, self.mention.id])
+        self.assertGreater(results['meetings'][0]['rank'], results['meetings'][1]['rank'])
+        self.assertEqual(results['meetings'][0]['title'], "Quarterly &lt;b&gt;<mark>budget</mark>&lt;/b&gt; review")
+        self.assertIn("<mark>budget</mark>", results['meetings'][1]['snippet'])
+        self.assertEqual([hit['description'] for hit in results['tasks']], ["Send the <mark>budget</mark> spreadsheet"])
+
+    def test_last_term_matches_as_a_prefix(self):
+        self.assertEqual(self.meeting_ids("quarterly bud"), [self.review.id])
+
+    def test_other_users_meetings_never_match(self):
+        self.assertNotIn(self.private.id, self.meeting_ids("secret"))
+        self.assertEqual(self.meeting_ids("secret project"), [])
+        self.assertEqual(self.task_ids("hide"), [])
+
+    def test_operators_in_the_query_are_inert(self):
+        self.assertEqual(self.meeting_ids('budget" OR title:*'), [])
+        self.assertEqual(self.meeting_ids("NEAR("), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.review.title = "Quarterly roadmap"
+        self.review.summary = ""
+        self.review.transcript = "We went over the roadmap."
+        self.review.save()
+        self.assertEqual(self.meeting_ids("budget"), [self.mention.id])
+        self.assertEqual(self.meeting_ids("roadmap"), [self.review.id])
+
+        self.task.description = "Send the roadmap slides"
+        self.task.save()
+        self.assertEqual(self.task_ids("budget"), [])
+        self.assertEqual(self.task_ids("slides"), [self.task.id])
+
+        self.task.delete()
+        self.assertEqual(self.task_ids("slides"), [])
+        self.review.delete()
+        self.assertEqual(self.meeting_ids("roadmap"), [])
+
+    def test_search_page(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('search'), {'q': 'budget'})
+        self.assertContains(response, "Quarterly &lt;b&gt;<mark>budget</mark>&lt;/b&gt; review", html=False)
+        self.assertNotContains(response, "Secret project")
+        self.assertNotContains(response, "<b>budget</b>", html=False)
+
+    def test_admin_keeps_rank_order(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='x'))
+        response = self.client.get(reverse('admin:core_meeting_changelist'), {'q': 'budget'})
+        ranked = search.search_meeting_ids("budget")
+        self.assertEqual(ranked, [self.review.id, self.private.id, self.mention.id])
+        self.assertEqual([meeting.id for meeting in response.context['cl'].result_list], ranked)
+
+        response = self.client.get(reverse('admin:core_meeting_changelist'), {'q': 'nothingmatches'})
+        self.assertEqual(list(response.context['cl'].result_list), [])
+
+
+class VoiceActivityTests(SimpleTestCase):
+    """Silence is cut before upload and times map back to the recording (core.audio_processing)."""
+
+    rate = audio_processing.TARGET_SAMPLE_RATE
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def silence(self, seconds):
+        return self.rng.normal(0, 3, int(seconds * self.rate))
+
+    def tone(self, seconds, frequency=440):
+        t = np.arange(int(seconds * self.rate)) / self.rate
+        return 8000 * np.sin(2 * np.pi * frequency * t) + self.silence(seconds)
+
+    def recording(self, *parts):
+        return np.concatenate(parts).astype(np.int16)
+
+    def test_tone_regions_are_found_with_padding(self):
+        samples = self.recording(self.silence(1), self.tone(2), self.silence(2), self.tone(1), self.silence(1))
+        regions = [(start / self.rate, end / self.rate) for start, end in audio_processing.detect_speech(samples)]
+        self.assertEqual(len(regions), 2)
+        # 200 ms padding either side, to within one 30 ms frame
+        for (start, end), (expected_start, expected_end) in zip(regions, [(0.8, 3.2), (4.8, 6.2)]):
+            self.assertAlmostEqual(start, expected_start, delta=0.03)
+            self.assertAlmostEqual(end, expected_end, delta=0.03)
+
+    def test_short_pause_is_kept(self):
+        samples = self.recording(self.silence(1), self.tone(1), self.silence(0.3), self.tone(1), self.silence(1))
+        self.assertEqual(len(audio_processing.detect_speech(samples)), 1)
+        # Syllable-length bursts are bridged into one region too
+        syllables = [part for _ in range(6) for part in (self.tone(0.15), self.silence(0.1))]
+        samples = self.recording(self.silence(1), *syllables, self.silence(1))
+        self.assertEqual(len(audio_processing.detect_speech(samples)), 1)
+
+    def test_silence_and_hiss_are_not_speech(self):
+        self.assertEqual(audio_processing.detect_speech(self.recording(self.silence(3))), [])
+        hiss = self.rng.normal(0, 8000, 2 * self.rate)
+        self.assertEqual(audio_processing.detect_speech(self.recording(self.silence(1), hiss, self.silence(1))), [])
+
+    def test_removed_silence_maps_back_to_original_time(self):
+        samples = self.recording(self.silence(1), self.tone(2), self.silence(2), self.tone(1), self.silence(1))
+        speech, timestamp_map = audio_processing.remove_silence(samples)
+
+        self.assertEqual(len(speech), sum(round(duration * self.rate) for _, _, duration in timestamp_map))
+        self.assertLess(len(speech), len(samples) * 0.6)
+        second_start = timestamp_map[1][0]
+        self.assertAlmostEqual(audio_processing.map_to_original_time(second_start + 0.5, timestamp_map),
+                               timestamp_map[1][1] + 0.5)
+        self.assertAlmostEqual(audio_processing.map_to_original_time(0.1, timestamp_map), timestamp_map[0][1] + 0.1)
+
+    def test_audio_without_speech_is_kept_whole(self):
+        samples = self.recording(self.silence(2))
+        speech, timestamp_map = audio_processing.remove_silence(samples)
+        self.assertEqual(len(speech), len(samples))
+        self.assertEqual(timestamp_map, [(0.0, 0.0, 2.0)])
+
+
+class TranscriptSegmentTests(TestCase):
+    """Whisper timestamp chunks become segments indexing into the transcript (core.hf_client)."""
+
+    CHUNKS = [
+        {"text": " Welcome to the budget review.", "timestamp": [0.0, 2.5]},
+        {"text": "  ", "timestamp": [2.5, 3.0]},
+        {"text": "Alice will send the numbers.", "timestamp": [3.0, None]},
+        {"text": "Bob agreed.", "timestamp": [None, 7.0]},
+    ]
+
+    def test_segments_index_into_the_joined_transcript(self):
+        text, segments = hf_client._build_segments(self.CHUNKS, None)
+        self.assertEqual(text, "Welcome to the budget review. Alice will send the numbers. Bob agreed.")
+        self.assertEqual([text[s['char_start']:s['char_end']] for s in segments], [
+            "Welcome to the budget review.", "Alice will send the numbers.", "Bob agreed.",
+        ])
+        # A missing end is the start; a missing start is the previous end
+        self.assertEqual([(s['start'], s['end']) for s in segments], [(0.0, 2.5), (3.0, 3.0), (3.0, 7.0)])
+
+    def test_times_map_back_through_removed_silence(self):
+        # 2 s of speech at 10 s, then 5 s of speech at 30 s of the recording
+        timestamp_map = [(0.0, 10.0, 2.0), (2.0, 30.0, 5.0)]
+        _, segments = hf_client._build_segments(self.CHUNKS, timestamp_map)
+        self.assertEqual([(s['start'], s['end']) for s in segments], [(10.0, 30.5), (31.0, 31.0), (31.0, 35.0)])
+
+    def test_timestamped_request_reports_the_base64_bytes_sent(self):
+        rate = audio_processing.TARGET_SAMPLE_RATE
+        t = np.arange(3 * rate) / rate
+        tone = (8000 * np.sin(2 * np.pi * 440 * t)).astype('<i2')
+        with tempfile.NamedTemporaryFile(suffix='.wav') as f:
+            with wave.open(f.name, 'wb') as out:
+                out.setnchannels(2)
+                out.setsampwidth(2)
+                out.setframerate(44100)
+                out.writeframes(np.repeat(np.interp(np.arange(3 * 44100) / 44100, t, tone), 2).astype('<i2').tobytes())
+
+            response = {"text": "Hello there.", "chunks": [{"text": "Hello there.", "timestamp": [0.0, 1.0]}]}
+            with mock.patch.object(hf_client, 'call_hf_api', return_value=response) as call_hf_api, \
+                    mock.patch.object(audio_processing, 'ffmpeg_available', return_value=False), \
+                    self.assertLogs('core.audio_processing', 'INFO') as logs:
+                text, segments = hf_client.transcribe_audio(f.name, return_segments=True)
+            original_bytes = os.path.getsize(f.name)
+
+        self.assertEqual((text, len(segments)), ("Hello there.", 1))
+        payload = call_hf_api.call_args.kwargs['payload']
+        self.assertEqual(payload['parameters'], {'return_timestamps': True})
+        sent = len(payload['inputs'])
+        self.assertEqual(sent, audio_processing.base64_size(len(base64.b64decode(payload['inputs']))))
+        self.assertIn(f"{original_bytes / 1e6:.2f} MB -> {sent / 1e6:.2f} MB sent as base64 "
+                      f"({original_bytes / sent:.1f}x", "\n".join(logs.output))
+
+    def test_offset_lookups(self):
+        meeting = Meeting.objects.create(title="Budget review", status='completed')
+        text, segments = hf_client._build_segments(self.CHUNKS, None)
+        uploads.save_results(meeting, text, "", [], segments)
+
+        first, second, third = TranscriptSegment.objects.filter(meeting=meeting)
+        self.assertEqual(second.text, "Alice will send the numbers.")
+        self.assertEqual(list(meeting.segments_for_span(first.char_end, second.char_start + 1)), [second])
+        self.assertEqual(list(meeting.segments_for_span(0, len(text))), [first, second, third])
+        self.assertEqual(list(meeting.segments_between(2.0, 3.0)), [first])
+        self.assertEqual(list(meeting.segments_between(3.0, 3.5)), [third])
+        self.assertEqual(list(meeting.segments_between(8.0, 9.0)), [])
+
+
+class DuplicateAudioTests(TestCase):
+    """Identical uploads share one stored file and reuse results (core.uploads)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', password='pw')
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.name = default_storage.save('meetings/call.wav', ContentFile(b'\0' * 1000))
+        self.first = self.meeting('completed')
+        self.second = self.meeting('processing')
+
+    def meeting(self, status, **fields):
+        return Meeting.objects.create(title="Call", user=self.user, status=status, audio_file=self.name,
+                                      content_hash='abc', **fields)
+
+    def test_shared_file_outlives_all_but_the_last_meeting(self):
+        self.assertFalse(self.first.release_audio_file())
+        self.first.delete()
+        self.assertTrue(default_storage.exists(self.name))
+
+        self.assertTrue(self.second.release_audio_file())
+        self.assertFalse(default_storage.exists(self.name))
+
+    def test_delete_view_keeps_a_shared_file(self):
+        self.client.login(username='alice', password='pw')
+        self.client.post(reverse('delete_meeting', args=[self.first.id]))
+        self.assertTrue(default_storage.exists(self.name))
+
+        self.client.post(reverse('delete_meeting', args=[self.second.id]))
+        self.assertFalse(default_storage.exists(self.name))
+        self.assertFalse(Meeting.objects.exists())
+
+    def test_find_duplicate_prefers_completed_original_audio(self):
+        self.assertEqual(uploads.find_duplicate('abc'), self.first)
+
+        Meeting.objects.filter(pk=self.first.pk).update(audio_tier='archived')
+        self.assertEqual(uploads.find_duplicate('abc'), self.second)
+
+        Meeting.objects.filter(pk=self.second.pk).update(audio_file='')
+        self.assertIsNone(uploads.find_duplicate('abc'))
+        self.assertIsNone(uploads.find_duplicate('other'))
+
+    def test_copy_results(self):
+        text, segments = hf_client._build_segments(TranscriptSegmentTests.CHUNKS, None)
+        uploads.save_results(self.first, text, "Budget agreed.", [
+            {'description': "Send the numbers", 'assignee': "Alice", 'deadline': "Friday", 'status': 'completed'},
+            {'description': "Book the room", 'assignee': "Bob"},
+        ], segments)
+
+        uploads.copy_results(self.first, self.second)
+
+        self.second.refresh_from_db()
+        self.assertEqual((self.second.transcript, self.second.summary, self.second.status),
+                         (text, "Budget agreed.", 'completed'))
+        self.assertEqual(self.second.pipeline, self.first.pipeline)
+        self.assertEqual(
+            list(self.second.segments.values_list('position', 'start', 'end', 'char_start', 'char_end')),
+            list(self.first.segments.values_list('position', 'start', 'end', 'char_start', 'char_end')),
+        )
+        self.assertEqual(
+            list(Task.objects.filter(meeting=self.second).order_by('id').values_list('description', 'assignee', 'status')),
+            [("Send the numbers", "Alice", 'pending'), ("Book the room", "Bob", 'pending')],
+        )
+        # The source keeps its own tasks
+        self.assertEqual(Task.objects.filter(meeting=self.first).count(), 2)
+
+
+class ExtractiveSummaryTests(SimpleTestCase):
+    """TextRank sentence selection (core.extractive) and the insights context budget (core.insights)."""
+
+    SENTENCES = [
+        "The budget review covers the marketing budget.",
+        "Lunch was late again.",
+        "Marketing needs a bigger budget next quarter.",
+        "The budget for marketing was approved.",
+        "Someone parked in the wrong spot.",
+    ]
+
+    def test_central_sentences_rank_first(self):
+        scores = extractive.rank_sentences(self.SENTENCES)
+        order = list(np.argsort(-scores, kind="stable"))
+        self.assertEqual(set(order[:3]), {0, 2, 3})
+        self.assertEqual(set(order[3:]), {1, 4})
+
+    def test_summary_keeps_document_order(self):
+        summary = extractive.extract_summary(" ".join(self.SENTENCES), ratio=0.5)
+        kept = extractive.split_sentences(summary)
+        self.assertTrue(kept)
+        self.assertTrue(set(kept) <= {self.SENTENCES[i] for i in (0, 2, 3)})
+        self.assertEqual(kept, sorted(kept, key=self.SENTENCES.index))
+
+    def test_max_words_is_a_hard_cap(self):
+        text = " ".join(self.SENTENCES)
+        for max_words in (3, 8, 10, 15):
+            with self.subTest(max_words=max_words):
+                summary = extractive.extract_summary(text, ratio=1.0, max_words=max_words)
+                self.assertLessEqual(len(summary.split()), max_words)
+                self.assertTrue(summary)
+
+    def test_oversized_sentence_is_cut_to_the_context_budget(self):
+        transcript = "We agreed " + " and ".join(["the marketing budget grows"] * 200) + ". Short one."
+        context = insights.build_context(transcript, "Budget agreed.", budget_tokens=50)
+        self.assertLessEqual(estimate_tokens(context), 50 + estimate_tokens("Transcript:\n"))
+        self.assertTrue(context.startswith("Summary:\nBudget agreed.\n\nTranscript:\nWe agreed the marketing"))
+
+    def test_short_transcript_is_kept_whole(self):
+        self.assertEqual(insights.build_context("Hi all.", "", budget_tokens=50), "Transcript:\nHi all.")
+
+
+def groq_error(error_class, status, headers=None):
+    response = httpx.Response(status, headers=headers, request=httpx.Request('POST', 'https://api.groq.com'))
+    return error_class(f"HTTP {status}", response=response, body=None)
+
+
+class LLMGatewayTests(TestCase):
+    """Fair admission, retries and metrics of the Groq gateway (core.llm_gateway)."""
+
+    def fill_queue(self, limiter, labels, granted):
+        """Queue one blocked thread per (key, label) in order; each records its turn and releases."""
+        threads = []
+        for key, label in labels:
+            def worker(key=key, label=label):
+                limiter.acquire(key, timeout=5)
+                granted.append(label)
+                limiter.release()
+            thread = threading.Thread(target=worker)
+            thread.start()
+            threads.append(thread)
+            while limiter.queued < len(threads):
+                time.sleep(0.001)
+        return threads
+
+    def test_waiters_are_admitted_round_robin_by_user(self):
+        limiter = llm_gateway.FairLimiter(max_concurrency=1, max_queue=10)
+        limiter.acquire('busy', timeout=1)
+        granted = []
+        threads = self.fill_queue(limiter, [('a', 'a1'), ('a', 'a2'), ('a', 'a3'), ('b', 'b1')], granted)
+
+        limiter.release()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(granted, ['a1', 'b1', 'a2', 'a3'])
+        self.assertEqual((limiter.active, limiter.queued), (0, 0))
+
+    def test_full_queue_and_wait_timeout_are_rejected(self):
+        limiter = llm_gateway.FairLimiter(max_concurrency=1, max_queue=1)
+        limiter.acquire('a', timeout=1)
+        with self.assertRaises(llm_gateway.LLMGatewayBusy):
+            limiter.acquire('b', timeout=0.01)
+        self.assertEqual(limiter.queued, 0)
+
+        threads = self.fill_queue(limiter, [('b', 'b1')], [])
+        with self.assertRaises(llm_gateway.LLMGatewayBusy):
+            limiter.acquire('c', timeout=1)
+        limiter.release()
+        threads[0].join(5)
+
+    async def test_async_waiters_are_admitted_round_robin_by_user(self):
+        limiter = llm_gateway.AsyncFairLimiter(max_concurrency=1, max_queue=10)
+        await limiter.acquire('busy', timeout=1)
+        granted = []
+
+        async def worker(key, label):
+            await limiter.acquire(key, timeout=5)
+            granted.append(label)
+            limiter.release()
+
+        tasks = []
+        for key, label in [('a', 'a1'), ('a', 'a2'), ('a', 'a3'), ('b', 'b1')]:
+            tasks.append(asyncio.create_task(worker(key, label)))
+            await asyncio.sleep(0)
+        self.assertEqual(limiter.queued, 4)
+
+        limiter.release()
+        await asyncio.gather(*tasks)
+        self.assertEqual(granted, ['a1', 'b1', 'a2', 'a3'])
+
+        await limiter.acquire('busy', timeout=1)
+        with self.assertRaises(llm_gateway.LLMGatewayBusy):
+            await limiter.acquire('a', timeout=0.01)
+        self.assertEqual((limiter.active, limiter.queued), (1, 0))
+
+    def test_slot_is_released_when_the_request_fails(self):
+        client = mock.Mock()
+        client.chat.completions.create.side_effect = groq_error(groq.BadRequestError, 400)
+        gateway = llm_gateway.LLMGateway(client, max_concurrency=1)
+
+        for _ in range(2):
+            with self.assertRaises(groq.BadRequestError):
+                gateway.chat('a', model='m', messages=[])
+        self.assertEqual(client.chat.completions.create.call_count, 2)   # not retried
+        metrics = gateway.metrics()
+        self.assertEqual((metrics['in_flight'], metrics['requests'], metrics['errors'], metrics['retries']),
+                         (0, 2, 2, 0))
+
+    def test_rate_limits_and_server_errors_are_retried_with_backoff(self):
+        client = mock.Mock()
+        client.chat.completions.create.side_effect = [
+            groq_error(groq.RateLimitError, 429, {'retry-after': '2'}),
+            groq_error(groq.InternalServerError, 503),
+            'completion',
+        ]
+        gateway = llm_gateway.LLMGateway(client, timeout=7.0)
+
+        with mock.patch.object(llm_gateway.time, 'sleep') as sleep, \
+                mock.patch.object(llm_gateway.random, 'random', return_value=0.5), \
+                self.assertLogs('core.llm_gateway', 'WARNING'):
+            self.assertEqual(gateway.chat('a', model='m', messages=[]), 'completion')
+
+        # Retry-After is honoured; otherwise 0.5 s doubling per attempt
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [2.0, 1.0])
+        self.assertEqual(client.chat.completions.create.call_args.kwargs['timeout'], 7.0)
+        metrics = gateway.metrics()
+        self.assertEqual((metrics['requests'], metrics['retries'], metrics['errors'], metrics['in_flight']),
+                         (1, 2, 0, 0))
+        self.assertIsNotNone(metrics['latency_p50_s'])
+
+    def test_retries_give_up_after_max_retries(self):
+        client = mock.Mock()
+        client.chat.completions.create.side_effect = groq_error(groq.InternalServerError, 502)
+        gateway = llm_gateway.LLMGateway(client, max_retries=2)
+
+        with mock.patch.object(llm_gateway.time, 'sleep'), self.assertLogs('core.llm_gateway', 'WARNING'):
+            with self.assertRaises(groq.InternalServerError):
+                gateway.chat('a', model='m', messages=[])
+        self.assertEqual(client.chat.completions.create.call_count, 3)
+        metrics = gateway.metrics()
+        self.assertEqual((metrics['retries'], metrics['errors'], metrics['in_flight']), (2, 1, 0))
+
+    async def test_async_gateway_retries_and_releases(self):
+        client = mock.Mock()
+        client.chat.completions.create = mock.AsyncMock(side_effect=[
+            groq_error(groq.RateLimitError, 429, {'retry-after': '0'}),
+            'completion',
+        ])
+        gateway = llm_gateway.AsyncLLMGateway(client)
+
+        with self.assertLogs('core.llm_gateway', 'WARNING'):
+            self.assertEqual(await gateway.achat('a', model='m', messages=[]), 'completion')
+        metrics = gateway.metrics()
+        self.assertEqual((metrics['requests'], metrics['retries'], metrics['in_flight']), (1, 1, 0))
+
+    def test_metrics_view(self):
+        url = reverse('llm_metrics')
+        User.objects.create_user('alice', password='pw')
+        User.objects.create_user('admin', password='pw', is_staff=True)
+
+        self.client.login(username='alice', password='pw')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.login(username='admin', password='pw')
+        with mock.patch.object(views, '_rag_processor', None):
+            self.assertEqual(self.client.get(url).json(), {'initialized': False})
+
+        client = mock.Mock()
+        client.chat.completions.create.return_value = 'completion'
+        gateway = llm_gateway.LLMGateway(client, max_concurrency=2)
+        gateway.chat('a', model='m', messages=[])
+        rag = mock.Mock(gateway=gateway, _async_gateways={})
+        with mock.patch.object(views, '_rag_processor', rag):
+            metrics = self.client.get(url).json()
+        self.assertTrue(metrics['initialized'])
+        self.assertEqual((metrics['requests'], metrics['in_flight'], metrics['max_concurrency']), (1, 0, 2))
+        self.assertNotIn('async', metrics)
+
+
+class ContextPackerTests(SimpleTestCase):
+    """Retrieved chunks are merged, de-duplicated and cut to the token budget (core.context_packer)."""
+
+    DOCUMENTS = {
+        'meeting': "Alice owns the budget. Bob books the venue. Carol writes the agenda.".split(),
+        'notes': "Bob books the venue. Dave checks the catering.".split(),
+    }
+
+    def hit(self, source, start, end, score):
+        return {'source': source, 'start': start, 'end': end, 'score': score}
+
+    def test_overlapping_hits_are_merged(self):
+        spans = context_packer.merge_hits([
+            self.hit('meeting', 0, 4, 0.2), self.hit('meeting', 3, 8, 0.9),
+            self.hit('meeting', 8, 12, 0.4), self.hit('notes', 0, 4, 0.5),
+        ])
+        self.assertEqual(spans, [self.hit('meeting', 0, 12, 0.9), self.hit('notes', 0, 4, 0.5)])
+
+        spans = context_packer.merge_hits([self.hit('meeting', 0, 4, 0.2), self.hit('meeting', 6, 8, 0.9)], gap=2)
+        self.assertEqual(spans, [self.hit('meeting', 0, 8, 0.9)])
+
+    def test_repeated_sentences_are_sent_once(self):
+        hits = [self.hit('meeting', 4, 8, 0.9), self.hit('notes', 0, 8, 0.5)]
+        blocks, stats = context_packer.pack_context(hits, self.DOCUMENTS, budget_tokens=100)
+
+        self.assertEqual(blocks, [
+            {'text': "Bob books the venue.", 'score': 0.9, 'source': 'meeting'},
+            {'text': "Dave checks the catering.", 'score': 0.5, 'source': 'notes'},
+        ])
+        used = sum(estimate_tokens(text) + 1 for text in ("Bob books the venue.", "Dave checks the catering."))
+        naive = estimate_tokens("Bob books the venue.") + estimate_tokens("Bob books the venue. Dave checks the catering.")
+        self.assertEqual(stats, {'tokens_used': used, 'tokens_naive': naive, 'tokens_saved': naive - used})
+
+    def test_context_stops_at_the_budget(self):
+        hits = [self.hit('meeting', 0, 12, 0.9), self.hit('notes', 4, 8, 0.5)]
+        blocks, stats = context_packer.pack_context(hits, self.DOCUMENTS, budget_tokens=15)
+
+        # Two sentences cost 6 tokens each; the third is cut to the 3 left and the notes are never reached
+        self.assertEqual(blocks, [
+            {'text': "Alice owns the budget. Bob books the venue. Carol", 'score': 0.9, 'source': 'meeting'},
+        ])
+        self.assertEqual(stats['tokens_used'], 14)
+
+    def test_unpunctuated_transcript_is_cut_to_the_budget(self):
+        words = ("and then we talked about the venue " * 40).split()
+        blocks, stats = context_packer.pack_context([self.hit('asr', 0, len(words), 1.0)], {'asr': words}, 20)
+
+        self.assertEqual(len(blocks), 1)
+        self.assertTrue(" ".join(words).startswith(blocks[0]['text']))
+        self.assertLessEqual(stats['tokens_used'], 20)
+        self.assertEqual(stats['tokens_saved'], stats['tokens_naive'] - stats['tokens_used'])
+
+    def test_nothing_fits_in_a_tiny_budget(self):
+        blocks, stats = context_packer.pack_context([self.hit('meeting', 0, 4, 0.9)], self.DOCUMENTS, 1)
+        self.assertEqual((blocks, stats['tokens_used']), ([], 0))
+
+
+class InsightRoutingTests(SimpleTestCase):
+    """Only whole-question matches are served from precomputed insights (core.insights)."""
+
+    def test_canonical_questions_match(self):
+        for key, (canonical, _) in insights.INSIGHT_QUESTIONS.items():
+            with self.subTest(key=key):
+                self.assertEqual(insights.match_insight(canonical), key)
+
+    def test_paraphrases_match(self):
+        paraphrases = {
+            "what were the key points discussed in this meeting?": 'topics',
+            "Can you tell me what was discussed?": 'topics',
+            "please list the action items and their owners": 'owners',
+            "Who is responsible for what?": 'owners',
+            "What was decided?": 'decisions',
+            "  List the key decisions  ": 'decisions',
+            "When is everything due?": 'deadlines',
+            "any upcoming deadlines?": 'deadlines',
+            "What blockers were mentioned during the meeting?": 'risks',
+            "what are the open risks": 'risks',
+        }
+        for question, key in paraphrases.items():
+            with self.subTest(question=question):
+                self.assertEqual(insights.match_insight(question), key)
+
+    def test_near_misses_fall_through(self):
+        for question in [
+            "Who approves the budget?",
+            "What were the main topics about hiring?",
+            "What decisions were made about the venue?",
+            "Is the deadline for the report Friday?",
+            "What risks does Alice see in the launch?",
+            "action items for Bob",
+            "Summarize the meeting",
+            "",
+        ]:
+            with self.subTest(question=question):
+                self.assertIsNone(insights.match_insight(question))
+
+    @override_settings(GROQ_API_KEY='test-key')
+    def test_only_matching_questions_skip_the_llm(self):
+        from core.rag_processor import MeetingRAGProcessor
+
+        processor = MeetingRAGProcessor()
+        stored = {'decisions': "Ship on Friday."}
+        transcript = "Alice said we ship on Friday. Bob approves the budget for the venue."
+
+        with mock.patch.object(processor, 'generate_answer', return_value="Bob does.") as generate_answer:
+            result = processor.ask_question(transcript, "", "What decisions were made?", insights=stored)
+            self.assertEqual((result['answer'], result['insight']), ("Ship on Friday.", 'decisions'))
+            generate_answer.assert_not_called()
+
+            for question in ["Who approves the budget?", "What decisions were made about the venue?",
+                             "What are the deadlines?"]:   # the last has no stored answer
+                with self.subTest(question=question):
+                    result = processor.ask_question(transcript, "", question, insights=stored)
+                    self.assertEqual(result['answer'], "Bob does.")
+                    self.assertNotIn('insight', result)
+        self.assertEqual(generate_answer.call_count, 3)
+
+
+class InlinePool(ThreadPoolExecutor):
+    """ProcessPoolExecutor stand-in: same submit/wait API, worker state set up by the test."""
+
+    def __init__(self, max_workers, mp_context=None, initializer=None, initargs=()):
+        super().__init__(max_workers=max_workers)
+
+
+@override_settings(RAG_RETRIEVER='hybrid')
+class IngestCommandTests(TestCase):
+    """Bulk import with in-batch duplicates, checkpoint resume and a throughput report (ingest_meetings)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice')
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.source = tempfile.mkdtemp()
+        for path in (media_root, self.source):
+            self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.write('a.wav', b'RIFF' + b'\1' * 500)
+        self.write('b.wav', b'RIFF' + b'\1' * 500)   # same bytes as a.wav
+        self.write('c.wav', b'RIFF' + b'\2' * 500)
+        self.write('notes.txt', b"Alice will send the notes.")
+
+        self.failing = {'c.wav'}
+        self.processor = mock.Mock()
+        self.processor.process_meeting.side_effect = self.transcribe
+        self.processor.process_text_only.return_value = (None, "Notes summary.", [])
+        for patcher in (
+            mock.patch('core.management.commands.ingest_meetings.ProcessPoolExecutor', InlinePool),
+            mock.patch.dict(batch._worker, {'processor': self.processor, 'rag': None}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write(self, name, content):
+        with open(os.path.join(self.source, name), 'wb') as f:
+            f.write(content)
+
+    def transcribe(self, path, chunk_cache=None):
+        if os.path.basename(path) in self.failing:
+            return None, None, [], []
+        return f"Transcript of {os.path.basename(path)}.", "Summary.", [{'description': "Send the notes"}], []
+
+    def ingest(self, *args):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('ingest_meetings', self.source, '--user', 'alice', '--workers', '2', *args, stdout=out, stderr=err)
+        return out.getvalue()
+
+    def test_duplicates_checkpoint_and_resume(self):
+        output = self.ingest()
+
+        # Identical audio is transcribed once; the twin shares the stored file and the results
+        self.assertEqual(self.processor.process_meeting.call_count, 2)
+        self.processor.process_text_only.assert_called_once()
+        first, twin = Meeting.objects.filter(title__in=['a', 'b'])
+        self.assertEqual(first.audio_file.name, twin.audio_file.name)
+        self.assertEqual(twin.transcript, first.transcript)
+        self.assertEqual(Task.objects.filter(meeting=twin).count(), 1)
+        self.assertFalse(Meeting.objects.filter(title='c').exists())
+        self.assertIn("c.wav: failed: Transcription failed", output)
+        self.assertIn("Processed 2, reused 1, failed 1, already done 0", output)
+        self.assertIn("Throughput:", output)
+        self.assertIn("Per-file processing: p50", output)
+
+        with open(os.path.join(self.source, '.ingest-checkpoint.json')) as f:
+            statuses = sorted(entry['status'] for entry in json.load(f)['items'].values())
+        self.assertEqual(statuses, ['done', 'done', 'done', 'failed'])
+
+        # Resume: finished files are skipped, the failed one is retried, new files are imported
+        self.failing = set()
+        self.processor.process_meeting.reset_mock()
+        self.write('d.wav', b'RIFF' + b'\3' * 500)
+        output = self.ingest()
+
+        self.assertEqual(sorted(os.path.basename(c.args[0]) for c in self.processor.process_meeting.call_args_list),
+                         ['c.wav', 'd.wav'])
+        self.assertIn("Processed 2, reused 0, failed 0, already done 3", output)
+        self.assertEqual(Meeting.objects.count(), 5)
+
+    def test_audio_of_an_earlier_meeting_is_reused(self):
+        self.ingest()
+        self.write('e.wav', b'RIFF' + b'\1' * 500)
+        output = self.ingest()
+
+        self.assertIn("e.wav: meeting", output)
+        self.assertIn("reused 1", output)
+        self.assertEqual(Meeting.objects.get(title='e').transcript, Meeting.objects.get(title='a').transcript)
+
+    def test_dry_run_imports_nothing(self):
+        output = self.ingest('--dry-run')
+
+        self.assertIn("4 file(s), 4 supported", output)
+        plan = [line.split() for line in output.splitlines()[1:]]
+        self.assertEqual([(action, os.path.basename(path)) for action, path in plan],
+                         [('audio', 'a.wav'), ('twin', 'b.wav'), ('audio', 'c.wav'), ('text', 'notes.txt')])
+        self.assertFalse(Meeting.objects.exists())
+        self.processor.process_meeting.assert_not_called()
+
+
+@plain_static_files
+class MeetingFragmentTests(TestCase):
+    """Stored results write tasks in bulk, and task writes re-render the cached page fragments (core.signals)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.meeting = Meeting.objects.create(title="Budget sync", user=self.user)
+        uploads.save_results(self.meeting, TRANSCRIPT, "Budget review.", [
+            {'description': "Send the budget", 'assignee': "Alice"},
+            {'description': "Book the venue", 'assignee': "Bob", 'deadline': "Friday"},
+        ])
+        self.url = reverse('meeting_detail', args=[self.meeting.id])
+
+    def test_results_are_stored_with_one_meeting_update(self):
+        meeting = Meeting.objects.create(title="Planning", user=self.user)
+        items = [{'description': f"Task {i}", 'assignee': "Carol"} for i in range(5)]
+        with CaptureQueriesContext(connection) as queries:
+            uploads.save_results(meeting, "Carol plans.", "Plans.", items)
+
+        statements = [q['sql'] for q in queries.captured_queries]
+        self.assertEqual(sum(sql.startswith('INSERT INTO "core_task"') for sql in statements), 1)
+        self.assertEqual(sum(sql.startswith('UPDATE "core_meeting"') for sql in statements), 1)
+        self.assertEqual(Task.objects.filter(meeting=meeting).count(), 5)
+        # bulk_create skips post_save, so the tasks are indexed explicitly
+        self.assertEqual(len(search.search(self.user, "Task")['tasks']), 5)
+
+    def test_task_writes_re_render_the_page(self):
+        self.assertContains(self.client.get(self.url), "Book the venue")
+        task = Task.objects.get(description="Book the venue")
+
+        task.description = "Book the bigger venue"
+        task.save()
+        self.assertContains(self.client.get(self.url), "Book the bigger venue")
+
+        self.client.post(reverse('toggle_task_status', args=[task.id]))
+        self.assertContains(self.client.get(self.url), f'data-task-id="{task.id}" checked')
+
+        task.delete()
+        response = self.client.get(self.url)
+        self.assertNotContains(response, "Book the bigger venue")
+        self.assertContains(response, "1 task extracted")
+
+    def test_meeting_writes_re_render_the_page(self):
+        self.assertContains(self.client.get(self.url), "Budget review.")
+        self.meeting.summary = "Budget approved."
+        self.meeting.save()
+        self.assertContains(self.client.get(self.url), "Budget approved.")
+
+
+class TranscriptPageTests(TestCase):
+    """Paged transcript reads (core.transcripts) and the gzipped, ETagged transcript endpoint."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice')
+        cls.other = User.objects.create_user('bob')
+        # About 2 500 characters of plain text, no segments
+        cls.text = Meeting.objects.create(
+            title="Notes", user=cls.user, status='completed', transcript=" ".join(["budget"] * 357),
+        )
+        chunks = [
+            {'text': f"Segment {i:02d} is about the marketing budget and the venue.", 'timestamp': [5 * i, 5 * i + 4]}
+            for i in range(30)
+        ]
+        text, segments = hf_client._build_segments(chunks, None)
+        cls.timed = Meeting.objects.create(title="Call", user=cls.user, status='completed')
+        uploads.save_results(cls.timed, text, "", [], segments)
+        cls.chunk_texts = [chunk['text'] for chunk in chunks]
+
+    def read_all(self, meeting_id):
+        pages, start = [], 0
+        while start is not None:
+            page = transcripts.read_page(meeting_id, start, 1000)
+            pages.append(page)
+            start = page['next']
+        return pages
+
+    def test_plain_text_pages_cover_the_transcript(self):
+        pages = self.read_all(self.text.id)
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual("".join(page['items'][0]['text'] for page in pages), self.text.transcript)
+        for page in pages[:-1]:
+            self.assertLessEqual(len(page['items'][0]['text']), 1000)
+            self.assertTrue(page['items'][0]['text'].endswith(" "))   # cut at whitespace
+        last = pages[-1]
+        total = len(self.text.transcript)
+        self.assertEqual((last['next'], last['total_chars'], last['timestamps']), (None, total, False))
+        self.assertEqual(last['start'] + len(last['items'][0]['text']), total)
+
+    def test_segment_pages_end_on_segment_boundaries(self):
+        pages = self.read_all(self.timed.id)
+
+        items = [item for page in pages for item in page['items']]
+        self.assertEqual([item['text'] for item in items], self.chunk_texts)
+        self.assertEqual([item['label'] for item in items[:3]], ["0:00", "0:05", "0:10"])
+        self.assertTrue(all(page['timestamps'] for page in pages))
+        # Segments start every 57 characters: 17 end within 1 000; the last page holds the rest
+        self.assertEqual([len(page['items']) for page in pages], [17, 13])
+        self.assertEqual(pages[1]['start'], pages[0]['next'])
+        self.assertIsNone(pages[-1]['next'])
+
+    def test_out_of_range_page_is_empty(self):
+        for meeting in (self.text, self.timed):
+            with self.subTest(meeting=meeting.title):
+                page = transcripts.read_page(meeting.id, 10 ** 6, 1000)
+                self.assertEqual((page['items'], page['next']), ([], None))
+        self.assertEqual(transcripts.read_page(self.text.id, -5, 1000)['start'], 0)
+
+    def test_transcript_view_is_gzipped_with_a_weak_etag(self):
+        self.client.force_login(self.user)
+        url = reverse('meeting_transcript', args=[self.text.id])
+
+        response = self.client.get(url, {'size': 1000}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(response['ETag'].startswith('W/"transcript-'))
+        page = json.loads(gzip.decompress(response.content))
+        self.assertEqual(page['next'], len(page['items'][0]['text']))
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, {'size': 1000}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Another page, or a changed meeting, is a new version
+        self.assertEqual(self.client.get(url, {'size': 1000, 'start': 990}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.text.save()
+        self.assertEqual(self.client.get(url, {'size': 1000}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_transcript_view_validates_and_checks_ownership(self):
+        self.client.force_login(self.user)
+        url = reverse('meeting_transcript', args=[self.text.id])
+        self.assertEqual(self.client.get(url, {'start': 'x'}).status_code, 400)
+
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class AudioStorageTests(SimpleTestCase):
+    """Stored audio is read only through the storage API (core.storage)."""
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+        self.data = b'RIFF' + bytes(range(256)) * 4
+
+    def stored(self, storage):
+        name = storage.save('meetings/call.wav', ContentFile(self.data))
+        return SimpleNamespace(storage=storage, name=name)   # the parts of a FieldFile local_audio uses
+
+    def test_object_storage_round_trip(self):
+        storage = file_storage.LocalObjectStorage(location=self.location)
+        name = storage.save('meetings/call.wav', ContentFile(self.data))
+
+        self.assertTrue(storage.exists(name))
+        self.assertEqual(storage.size(name), len(self.data))
+        with storage.open(name) as f:
+            self.assertEqual(f.read(), self.data)
+        chunks = list(file_storage.iter_chunks(name, storage, chunk_size=100))
+        self.assertEqual((b''.join(chunks), len(chunks)), (self.data, 11))
+        # Like S3, objects have no filesystem path
+        self.assertIsNone(file_storage.local_path(storage, name))
+        self.assertNotEqual(storage.save('meetings/call.wav', ContentFile(b'other')), name)
+
+        storage.delete(name)
+        self.assertFalse(storage.exists(name))
+
+    def test_downloaded_copy_is_removed(self):
+        field_file = self.stored(file_storage.LocalObjectStorage(location=self.location))
+
+        with file_storage.local_audio(field_file, chunk_size=100) as path:
+            self.assertFalse(path.startswith(self.location))
+            self.assertTrue(path.endswith('.wav'))
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), self.data)
+        self.assertFalse(os.path.exists(path))
+
+        with self.assertRaises(RuntimeError):
+            with file_storage.local_audio(field_file) as path:
+                raise RuntimeError("transcription failed")
+        self.assertFalse(os.path.exists(path))
+
+    def test_local_disk_is_used_in_place(self):
+        storage = FileSystemStorage(location=self.location)
+        field_file = self.stored(storage)
+
+        with file_storage.local_audio(field_file) as path:
+            self.assertEqual(path, storage.path(field_file.name))
+        self.assertTrue(os.path.exists(path))
@@ -0,0 +1,95 @@
+# Paged transcript reads for the meeting page's transcript tab.
+# A page is addressed by character offset into Meeting.transcript and only
+# that range is read from the database (SUBSTR), so the cost of a request
+# doesn't grow with the meeting's length. Meetings with Whisper timestamps
+# are paged on segment boundaries; text-only meetings on whitespace.
+
+from django.db.models.functions import Length, Substr
+
+from .conf import get_setting
+from .models import Meeting, TranscriptSegment
+
+MIN_PAGE_CHARS = 1000
+MAX_PAGE_CHARS = 100000
+SEGMENT_LOOKAHEAD = 2000   # segment rows read per page at most (a few bytes each)
+
+
+def format_timestamp(seconds):
+    """Format seconds as M:SS, or H:MM:SS for long recordings."""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+def page_size(requested=None):
+    """`requested` characters clamped to [MIN_PAGE_CHARS, MAX_PAGE_CHARS], or the TRANSCRIPT_PAGE_CHARS default."""
+    size = requested or get_setting('TRANSCRIPT_PAGE_CHARS', 20000)
+    return max(MIN_PAGE_CHARS, min(int(size), MAX_PAGE_CHARS))
+
+
+def _read_range(meeting_id, start, length):
+    """(transcript[start:start + length], total transcript length) in one query."""
+    row = Meeting.objects.filter(pk=meeting_id).annotate(
+        total_chars=Length('transcript'),
+        text=Substr('transcript', start + 1, length),
+    ).values('total_chars', 'text').get()
+    return row['text'] or "", row['total_chars'] or 0
+
+
+def read_page(meeting_id, start=0, size=None):
+    """
+    One page of a meeting's transcript, starting at character `start`.
+
+    Returns:
+        Dict with start, next (offset of the following page, None at the
+        end), total_chars, timestamps (whether items carry segment times)
+        and items: [{"start", "label", "text"}] per segment, or a single
+        {"text"} item for transcripts without segments.
+    """
+    size = page_size(size)
+    start = max(0, int(start))
+
+    rows = list(
+        TranscriptSegment.objects.filter(meeting_id=meeting_id, char_start__gte=start)
+        .order_by('char_start')
+        .values_list('start', 'char_start', 'char_end')[:SEGMENT_LOOKAHEAD]
+    )
+    if rows:
+        # Whole segments up to the page size (at least one, however long)
+        count = 1
+        while count < len(rows) and rows[count][2] <= rows[0][1] + size:
+            count += 1
+        page = rows[:count]
+        low, high = page[0][1], page[-1][2]
+        text, total = _read_range(meeting_id, low, high - low)
+        following = rows[count] if count < len(rows) else None
+        return {
+            "start": start,
+            "next": following[1] if following else (high if len(rows) == SEGMENT_LOOKAHEAD else None),
+            "total_chars": total,
+            "timestamps": True,
+            "items": [
+                {
+                    "start": seconds,
+                    "label": format_timestamp(seconds),
+                    "text": text[char_start - low:char_end - low],
+                }
+                for seconds, char_start, char_end in page
+            ],
+        }
+
+    # No segments (text uploads, older meetings): plain text, cut at whitespace
+    text, total = _read_range(meeting_id, start, size)
+    if start + len(text) < total:
+        cut = max(text.rfind("\n"), text.rfind(" "))
+        if cut >= size // 2:
+            text = text[:cut + 1]
+    end = start + len(text)
+    return {
+        "start": start,
+        "next": end if end < total else None,
+        "total_chars": total,
+        "timestamps": False,
+        "items": [{"start": None, "label": "", "text": text}] if text else [],
+    }
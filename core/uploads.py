@@ -0,0 +1,154 @@
+# Content hashing and de-duplication for uploaded audio.
+# HashingUploadHandler (first in settings.FILE_UPLOAD_HANDLERS) hashes each
+# file while it streams in, so identical recordings can be detected without
+# reading the stored file back.
+
+import hashlib
+import logging
+
+from django.core.files.uploadhandler import FileUploadHandler
+
+from .models import Meeting, Task, TranscriptSegment
+from . import search
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.ogg', '.flac', '.webm')
+MAX_AUDIO_SIZE = 100 * 1024 * 1024  # bytes
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Pass-through upload handler that computes a SHA-256 of each file.
+
+    Chunks are handed on unchanged to the next handler (memory/temp file),
+    and the digests are stored on `request.upload_hashes` by field name.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self._hasher.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not hasattr(self.request, 'upload_hashes'):
+            self.request.upload_hashes = {}
+        self.request.upload_hashes[self.field_name] = self._hasher.hexdigest()
+        return None
+
+
+def get_content_hash(request, field_name, uploaded_file):
+    """SHA-256 of an uploaded file, from the upload handler when it ran."""
+    digest = getattr(request, 'upload_hashes', {}).get(field_name)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        hasher.update(chunk)
+    uploaded_file.seek(0)
+    return hasher.hexdigest()
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file on disk, read in chunks."""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def find_duplicate(content_hash):
+    """
+    Return an existing meeting holding the same audio bytes, or None.
+    Completed meetings are preferred so their results can be reused.
+    Archived audio (core.retention) no longer holds those bytes and isn't matched.
+    """
+    candidates = Meeting.objects.filter(content_hash=content_hash, audio_tier='original').exclude(audio_file='')
+    return (
+        candidates.filter(status='completed').order_by('created_at').first()
+        or candidates.order_by('created_at').first()
+    )
+
+
+def _create_tasks(meeting, tasks):
+    """
+    Insert a finished meeting's tasks in one query. bulk_create sends no
+    post_save, so the tasks are indexed here, and the caller's meeting.save()
+    afterwards moves updated_at once for all of them (see core.signals).
+    """
+    Task.objects.bulk_create(tasks)
+    search.index_tasks(tasks)
+
+
+def save_results(meeting, transcript, summary, action_items, segments=(), chunk_summaries=None,
+                 summary_fell_back=False):
+    """
+    Store a finished pipeline run on `meeting`: transcript, summary,
+    timestamped segments, extracted tasks and the reprocessing fingerprints
+    (see core.reprocess). Marks the meeting completed. An extractive
+    fallback summary (`summary_fell_back`) gets no fingerprint, so
+    reprocess_meetings summarizes the meeting again.
+    """
+    from . import reprocess
+
+    TranscriptSegment.objects.bulk_create([
+        TranscriptSegment(meeting=meeting, position=i, **segment)
+        for i, segment in enumerate(segments)
+    ])
+    _create_tasks(meeting, [
+        Task(
+            meeting=meeting,
+            description=item.get('description', ''),
+            assignee=item.get('assignee', ''),
+            deadline_text=item.get('deadline', ''),
+            status=item.get('status', 'pending')
+        )
+        for item in action_items
+    ])
+
+    meeting.transcript = transcript
+    meeting.summary = summary
+    meeting.status = 'completed'
+    if not summary_fell_back:
+        reprocess.record(meeting, 'summary', chunk_summaries)
+    reprocess.record(meeting, 'tasks')
+    meeting.save()
+
+
+def copy_results(source, target):
+    """
+    Link `target` to the transcript, summary, insights, pipeline state,
+    segments and tasks already produced for `source`, so identical audio is
+    never processed twice. Task statuses start fresh as pending on the new
+    meeting.
+    """
+    TranscriptSegment.objects.bulk_create([
+        TranscriptSegment(
+            meeting=target, position=seg.position, start=seg.start, end=seg.end,
+            char_start=seg.char_start, char_end=seg.char_end,
+        )
+        for seg in source.segments.all()
+    ])
+    _create_tasks(target, [
+        Task(
+            meeting=target,
+            description=task.description,
+            assignee=task.assignee,
+            deadline_text=task.deadline_text,
+            status='pending',
+        )
+        for task in Task.objects.filter(meeting=source).order_by('id')
+    ])
+
+    target.transcript = source.transcript
+    target.summary = source.summary
+    target.insights = source.insights
+    target.pipeline = source.pipeline
+    target.status = source.status
+    target.save()
+
+    logger.info(f"Meeting {target.id} reuses results of meeting {source.id} (identical audio).")
@@ -1,5 +1,6 @@
 # core/urls.py
-from django.urls import path
+from django.conf import settings
+from django.urls import include, path
 from . import views
 
 urlpatterns = [
@@ -8,8 +9,23 @@ urlpatterns = [
     path('process/', views.process_text_meeting, name='process_text_meeting'),
     path('meetings/', views.meeting_list, name='meeting_list'),
     path('meeting/<int:meeting_id>/', views.meeting_detail, name='meeting_detail'),
-    path('meeting/<int:meeting_id>/ask/', views.ask_question, name='ask_question'),
+    path('meeting/<int:meeting_id>/ask/',
+         views.ask_question_async if settings.ASYNC_VIEWS else views.ask_question, name='ask_question'),
+    path('meeting/<int:meeting_id>/transcript/', views.meeting_transcript, name='meeting_transcript'),
+    path('meeting/<int:meeting_id>/status/', views.meeting_status, name='meeting_status'),
+    path('upload/progress/<str:token>/', views.upload_progress, name='upload_progress'),
+    path('meeting/<int:meeting_id>/reprocess/', views.reprocess_meeting, name='reprocess_meeting'),
     path('meeting/<int:meeting_id>/delete/', views.delete_meeting, name='delete_meeting'),
     path('task/<int:task_id>/toggle/', views.toggle_task_status, name='toggle_task_status'),
+    path('tasks/status/', views.update_task_statuses, name='update_task_statuses'),
+    path('search/', views.search, name='search'),
+    path('export/', views.export_meetings, name='export_meetings'),
+    path('llm/metrics/', views.llm_metrics, name='llm_metrics'),
     path('settings/', views.settings_page, name='settings'),
+    # REST API, versioned in the URL (settings.REST_FRAMEWORK); DRF loads on first use
+    path('api/<str:version>/', include('core.api_urls')),
 ]
+
+if settings.ASYNC_VIEWS:
+    # Server-sent progress events need an event loop (ASGI); WSGI pages poll meeting_status instead
+    urlpatterns.append(path('meeting/<int:meeting_id>/events/', views.meeting_events, name='meeting_events'))
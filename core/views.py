@@ -1,22 +1,43 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, Http404, HttpResponseNotAllowed, HttpResponseNotModified, StreamingHttpResponse
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from django.views.decorators.http import require_POST
+from django.views.decorators.gzip import gzip_page
+from django.contrib.admin.views.decorators import staff_member_required
+from asgiref.sync import sync_to_async
 import json
 import os
+import time
+import asyncio
+import logging
+import functools
 
 from .models import Meeting, Task
-from .ai_processor import MeetingAIProcessor 
-
-# Lazy-load AI processors (only initialized when first used)
+from . import search as search_index
+from . import uploads
+from .llm_gateway import LLMGatewayBusy
+from . import progress as progress_store
+from . import reprocess as reprocess_pipeline
+from . import ratelimit
+from . import transcripts
+from . import task_status
+from . import export
+from . import storage as file_storage
+
+logger = logging.getLogger(__name__)
+
+# Lazy-load AI processors (only imported and initialized when first used,
+# so workers boot without requests/NumPy/scikit-learn/Groq; see core.startup)
 _ai_processor = None
 _rag_processor = None
 
 def get_ai_processor():
     global _ai_processor
     if _ai_processor is None:
+        from .ai_processor import MeetingAIProcessor
         _ai_processor = MeetingAIProcessor()
     return _ai_processor
 
@@ -27,6 +48,77 @@ def get_rag_processor():
         _rag_processor = MeetingRAGProcessor()
     return _rag_processor
 
+def _post_process(meeting, progress=None):
+    """
+    Post-processing once a meeting has completed: precomputed Q&A insights
+    (one batched Groq call) and, with a dense RAG_RETRIEVER, stored chunk
+    embeddings. Failures are only logged; Q&A then falls back to live RAG.
+    """
+    want_insights = getattr(settings, 'RAG_INSIGHTS', True) and not meeting.insights
+    want_embeddings = 'dense' in getattr(settings, 'RAG_RETRIEVER', 'hybrid')
+    if not (want_insights or want_embeddings):
+        return
+    if progress:
+        progress.start('insights')
+    try:
+        rag = get_rag_processor()
+    except Exception as e:
+        logger.warning(f"Skipping post-processing for meeting {meeting.id}: {e}")
+        return
+
+    if want_embeddings:
+        try:
+            rag.index_meeting(meeting)
+        except Exception as e:
+            logger.warning(f"Could not precompute embeddings for meeting {meeting.id}: {e}")
+
+    if want_insights:
+        try:
+            meeting.insights = rag.generate_insights(meeting.transcript, meeting.summary, user_key=meeting.user_id)
+            reprocess_pipeline.record(meeting, 'insights')
+            meeting.save(update_fields=['insights', 'pipeline'])
+        except Exception as e:
+            logger.warning(f"Could not precompute insights for meeting {meeting.id}: {e}")
+
+def async_login_required(view):
+    """login_required for async views (Django 4.2's decorator only wraps sync views)."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        # request.user is lazy and loads the session synchronously
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path(), 'login')
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+def _throttled_response(refusal, template=None, request=None):
+    """429 for a rate-limit refusal: JSON, or `template` re-rendered with the message."""
+    if template:
+        messages.error(request, refusal['message'])
+        response = render(request, template, status=429)
+    else:
+        response = JsonResponse(
+            {'error': refusal['message'], 'retry_after': refusal['retry_after'], 'scope': refusal['scope']},
+            status=429,
+        )
+    response['Retry-After'] = str(refusal['retry_after'])
+    return response
+
+
+def _mark_failed(meeting, progress, error):
+    """
+    After a crash mid-processing, mark the meeting failed (in the database and
+    the progress store, which status polls read first) so it doesn't show as
+    processing until the progress entry expires.
+    """
+    if progress is not None:
+        progress.fail(f'Processing failed: {error}')
+    if meeting is not None and meeting.pk and meeting.status == 'processing':
+        logger.error(f"Processing meeting {meeting.id} failed: {error}")
+        meeting.status = 'failed'
+        meeting.save(update_fields=['status', 'updated_at'])
+
+
 @login_required(login_url='login')
 def home(request):
     recent_meetings = Meeting.objects.filter(user=request.user).order_by('-created_at')[:5]
@@ -48,58 +140,81 @@ def upload_meeting(request):
 
         if title and audio_file:
             # Validate file extension
-            allowed_extensions = ['.mp3', '.wav', '.m4a', '.ogg', '.flac', '.webm']
             file_ext = os.path.splitext(audio_file.name)[1].lower()
-            if file_ext not in allowed_extensions:
-                messages.error(request, f'Unsupported file type "{file_ext}". Allowed: {', '.join(allowed_extensions)}')
+            if file_ext not in uploads.ALLOWED_AUDIO_EXTENSIONS:
+                messages.error(request, f'Unsupported file type "{file_ext}". Allowed: {', '.join(uploads.ALLOWED_AUDIO_EXTENSIONS)}')
                 return render(request, 'core/upload.html')
 
             # Validate file size (max 100 MB)
-            max_size = 100 * 1024 * 1024
-            if audio_file.size > max_size:
+            if audio_file.size > uploads.MAX_AUDIO_SIZE:
                 messages.error(request, 'File is too large. Maximum size is 100 MB.')
                 return render(request, 'core/upload.html')
 
-            try:
-                meeting = Meeting.objects.create(
-                    title=title,
-                    audio_file=audio_file,
-                    status='processing',
-                    user=request.user
-                )
+            # Only valid uploads are charged; larger files cost more (1 unit per 10 MB)
+            refusal = ratelimit.throttle(request, 'upload', ratelimit.request_cost(request, 10 * 1024 * 1024))
+            if refusal:
+                return _throttled_response(refusal, 'core/upload.html', request)
 
-                # Full file path
-                audio_path = os.path.join(settings.MEDIA_ROOT, str(meeting.audio_file))
+            meeting = progress = None
+            try:
+                content_hash = uploads.get_content_hash(request, 'audio_file', audio_file)
+                duplicate = uploads.find_duplicate(content_hash)
+
+                if duplicate:
+                    # Identical bytes already stored — share the file instead of writing a copy
+                    meeting = Meeting.objects.create(
+                        title=title,
+                        audio_file=duplicate.audio_file.name,
+                        content_hash=content_hash,
+                        status='processing',
+                        user=request.user
+                    )
+                    if duplicate.status == 'completed':
+                        uploads.copy_results(duplicate, meeting)
+                        _post_process(meeting)
+                        messages.success(request, f'Meeting "{title}" matches an earlier upload — reused its results.')
+                        return redirect('meeting_detail', meeting_id=meeting.id)
+                else:
+                    meeting = Meeting.objects.create(
+                        title=title,
+                        audio_file=audio_file,
+                        content_hash=content_hash,
+                        status='processing',
+                        user=request.user
+                    )
 
-                # Run AI processing
-                transcript, summary, action_items = get_ai_processor().process_meeting(audio_path)
+                # Progress events for the upload overlay and the detail page (see core.progress)
+                progress = progress_store.ProgressTracker(meeting.id, request.user.id, progress_store.AUDIO_STAGES)
+                progress.bind_token(request.POST.get('progress_token'))
+
+                # Run AI processing; chunk summaries are kept for incremental reprocessing.
+                # The upload is read back through the storage API (see core.storage)
+                from .ai_processor import SummaryChunkCache
+                chunk_cache = SummaryChunkCache()
+                with file_storage.local_audio(meeting.audio_file) as audio_path:
+                    transcript, summary, action_items, segments = get_ai_processor().process_meeting(
+                        audio_path, progress, chunk_cache,
+                    )
 
                 if not transcript:
                     meeting.status = 'failed'
                     meeting.save()
+                    progress.fail('Transcription failed.')
                     messages.error(request, f'Failed to process "{title}". Please try again.')
                     return redirect('meeting_detail', meeting_id=meeting.id)
 
-                # Save results
-                meeting.transcript = transcript
-                meeting.summary = summary
-                meeting.status = 'completed'
-                meeting.save()
-
-                # Save extracted tasks
-                for item in action_items:
-                    Task.objects.create(
-                        meeting=meeting,
-                        description=item.get('description', ''),
-                        assignee=item.get('assignee', ''),
-                        deadline_text=item.get('deadline', ''),
-                        status=item.get('status', 'pending')
-                    )
+                # Save results, timestamped transcript segments and extracted tasks
+                uploads.save_results(meeting, transcript, summary, action_items, segments, chunk_cache.used,
+                                     summary_fell_back=chunk_cache.fell_back)
+
+                _post_process(meeting, progress)
+                progress.complete()
 
                 messages.success(request, f'Meeting "{title}" processed successfully!')
                 return redirect('meeting_detail', meeting_id=meeting.id)
 
             except Exception as e:
+                _mark_failed(meeting, progress, e)
                 messages.error(request, f'Error processing meeting: {str(e)}')
 
         else:
@@ -114,6 +229,11 @@ def process_text_meeting(request):
         meeting_text = request.POST.get('meeting_text')
 
         if title and meeting_text:
+            refusal = ratelimit.throttle(request, 'process_text', ratelimit.request_cost(request, 20000))
+            if refusal:
+                return _throttled_response(refusal, 'core/process_text.html', request)
+
+            meeting = progress = None
             try:
                 meeting = Meeting.objects.create(
                     title=title,
@@ -122,27 +242,28 @@ def process_text_meeting(request):
                     user=request.user
                 )
 
+                progress = progress_store.ProgressTracker(meeting.id, request.user.id, progress_store.TEXT_STAGES)
+                progress.bind_token(request.POST.get('progress_token'))
+
                 # Use AI processor for text input
-                transcript, summary, action_items = get_ai_processor().process_text_only(meeting_text)
-
-                meeting.summary = summary
-                meeting.status = 'completed'
-                meeting.save()
-
-                # Add tasks
-                for item in action_items:
-                    Task.objects.create(
-                        meeting=meeting,
-                        description=item.get('description', ''),
-                        assignee=item.get('assignee', ''),
-                        deadline_text=item.get('deadline', ''),
-                        status=item.get('status', 'pending')
-                    )
+                from .ai_processor import SummaryChunkCache
+                chunk_cache = SummaryChunkCache()
+                transcript, summary, action_items = get_ai_processor().process_text_only(
+                    meeting_text, progress, chunk_cache,
+                )
+
+                # Save summary and tasks (the pasted text is the transcript)
+                uploads.save_results(meeting, meeting_text, summary, action_items, chunk_summaries=chunk_cache.used,
+                                     summary_fell_back=chunk_cache.fell_back)
+
+                _post_process(meeting, progress)
+                progress.complete()
 
                 messages.success(request, f'Meeting "{title}" processed successfully!')
                 return redirect('meeting_detail', meeting_id=meeting.id)
 
             except Exception as e:
+                _mark_failed(meeting, progress, e)
                 messages.error(request, f'Error processing meeting: {str(e)}')
 
         else:
@@ -166,9 +287,19 @@ def meeting_list(request):
 
 @login_required(login_url='login')
 def meeting_detail(request, meeting_id):
-    meeting = get_object_or_404(Meeting, id=meeting_id, user=request.user)
+    # The transcript tab loads its text in pages from meeting_transcript
+    meeting = get_object_or_404(
+        Meeting.objects.defer('transcript', 'insights', 'pipeline'), id=meeting_id, user=request.user,
+    )
+    # Stays unevaluated when the page's fragments come from the cache
     tasks = Task.objects.filter(meeting=meeting)
-    return render(request, 'core/meeting_detail.html', {'meeting': meeting, 'tasks': tasks})
+    return render(request, 'core/meeting_detail.html', {
+        'meeting': meeting,
+        'tasks': tasks,
+        'fragment_timeout': settings.FRAGMENT_CACHE_SECONDS,
+        # Server-sent progress events when served under ASGI; polling otherwise
+        'progress_events': settings.ASYNC_VIEWS,
+    })
 
 
 @login_required(login_url='login')
@@ -177,16 +308,73 @@ def delete_meeting(request, meeting_id):
     """Delete a meeting owned by the current user."""
     meeting = get_object_or_404(Meeting, id=meeting_id, user=request.user)
     title = meeting.title
-    # Delete associated audio file from disk
-    if meeting.audio_file:
-        file_path = meeting.audio_file.path
-        if os.path.exists(file_path):
-            os.remove(file_path)
+    # Delete the stored audio, unless another meeting shares it
+    meeting.release_audio_file()
     meeting.delete()
     messages.success(request, f'Meeting "{title}" deleted successfully.')
     return redirect('meeting_list')
 
 
+@login_required(login_url='login')
+@require_POST
+def reprocess_meeting(request, meeting_id):
+    """
+    Re-run selected stages (summary, tasks, index, insights) of a completed
+    meeting from its stored transcript; unchanged stages and chunk
+    summaries are reused (see core.reprocess). Accepts a JSON body
+    {"stages": [...], "force": bool} and answers with the per-stage report,
+    or a form post (stages as a repeated field) and redirects back.
+    """
+    meeting = get_object_or_404(Meeting, id=meeting_id, user=request.user)
+    is_json = request.content_type == 'application/json'
+    if is_json:
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'Invalid request body.'}, status=400)
+        stages = data.get('stages') or reprocess_pipeline.STAGES
+        force = bool(data.get('force'))
+    else:
+        stages = request.POST.getlist('stages') or reprocess_pipeline.STAGES
+        force = request.POST.get('force') == 'true'
+
+    if meeting.status != 'completed' or not meeting.transcript:
+        error = 'Only processed meetings with a transcript can be reprocessed.'
+    elif not isinstance(stages, (list, tuple)) or not set(stages) <= set(reprocess_pipeline.STAGES):
+        error = f'Stages must be among: {", ".join(reprocess_pipeline.STAGES)}.'
+    else:
+        error = None
+    if error:
+        if is_json:
+            return JsonResponse({'error': error}, status=400)
+        messages.error(request, error)
+        return redirect('meeting_detail', meeting_id=meeting.id)
+
+    refusal = ratelimit.throttle(request, 'reprocess', 1 + len(meeting.transcript) / 20000)
+    if refusal:
+        if is_json:
+            return _throttled_response(refusal)
+        messages.error(request, refusal['message'])
+        return redirect('meeting_detail', meeting_id=meeting.id)
+
+    report = reprocess_pipeline.reprocess(
+        meeting, stages, force=force, processor=get_ai_processor(),
+        rag=get_rag_processor() if {'index', 'insights'} & set(stages) else None,
+    )
+    if is_json:
+        return JsonResponse({'meeting_id': meeting.id, 'stages': report})
+
+    updated = [stage for stage in reprocess_pipeline.STAGES if report.get(stage, {}).get('status') == 'updated']
+    failed = [stage for stage in reprocess_pipeline.STAGES if report.get(stage, {}).get('status') == 'failed']
+    if failed:
+        messages.error(request, f'Reprocessing failed for: {", ".join(failed)}.')
+    elif updated:
+        messages.success(request, f'Updated {", ".join(updated)}.')
+    else:
+        messages.success(request, 'Everything was already up to date.')
+    return redirect('meeting_detail', meeting_id=meeting.id)
+
+
 @login_required(login_url='login')
 @require_POST
 def toggle_task_status(request, task_id):
@@ -197,30 +385,293 @@ def toggle_task_status(request, task_id):
     return JsonResponse({'status': task.status})
 
 
+@login_required(login_url='login')
+@require_POST
+def update_task_statuses(request):
+    """
+    Set the status of several tasks in one AJAX request:
+    {"tasks": [{"id": 1, "status": "completed"}, ...]} -> the new states.
+    """
+    try:
+        data = json.loads(request.body)
+        updates = task_status.parse_updates(data.get('tasks') if isinstance(data, dict) else None)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid request body.'}, status=400)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    tasks, missing = task_status.apply_statuses(request.user, updates)
+    if missing:
+        return JsonResponse({'error': 'Some tasks were not found; nothing was changed.', 'missing': missing}, status=404)
+    return JsonResponse({'tasks': tasks})
+
+
 @login_required(login_url='login')
 @require_POST
 def ask_question(request, meeting_id):
     """RAG-powered Q&A endpoint for a specific meeting."""
     meeting = get_object_or_404(Meeting, id=meeting_id, user=request.user)
 
+    question, error = _parse_question(request, meeting)
+    if error:
+        return error
+    refusal = ratelimit.throttle(request, 'ask', ratelimit.question_cost(request, meeting, question))
+    if refusal:
+        return _throttled_response(refusal)
+
+    try:
+        rag = get_rag_processor()
+        result = rag.ask_question(
+            meeting.transcript, meeting.summary, question,
+            user_key=request.user.id, meeting_id=meeting.id, insights=meeting.insights,
+        )
+        return JsonResponse(result)
+    except LLMGatewayBusy as e:
+        return _busy_response(e)
+    except Exception as e:
+        return JsonResponse({'error': f'Error generating answer: {str(e)}'}, status=500)
+
+
+@async_login_required
+async def ask_question_async(request, meeting_id):
+    """
+    Async Q&A endpoint, routed instead of ask_question when ASYNC_VIEWS is on
+    (ASGI deployments). Waiting on Groq doesn't hold a worker thread.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        meeting = await Meeting.objects.aget(id=meeting_id, user=request.user)
+    except Meeting.DoesNotExist:
+        raise Http404('No Meeting matches the given query.')
+
+    question, error = _parse_question(request, meeting)
+    if error:
+        return error
+    refusal = await sync_to_async(ratelimit.throttle, thread_sensitive=False)(
+        request, 'ask', ratelimit.question_cost(request, meeting, question),
+    )
+    if refusal:
+        return _throttled_response(refusal)
+
+    try:
+        rag = await sync_to_async(get_rag_processor)()
+        result = await rag.aask_question(
+            meeting.transcript, meeting.summary, question,
+            user_key=request.user.id, meeting_id=meeting.id, insights=meeting.insights,
+        )
+        return JsonResponse(result)
+    except LLMGatewayBusy as e:
+        return _busy_response(e)
+    except Exception as e:
+        return JsonResponse({'error': f'Error generating answer: {str(e)}'}, status=500)
+
+
+def _parse_question(request, meeting):
+    """Validate a Q&A request; returns (question, None) or (None, error response)."""
     if meeting.status != 'completed':
-        return JsonResponse({'error': 'Meeting has not been processed yet.'}, status=400)
+        return None, JsonResponse({'error': 'Meeting has not been processed yet.'}, status=400)
 
     try:
         data = json.loads(request.body)
         question = data.get('question', '').strip()
     except json.JSONDecodeError:
-        return JsonResponse({'error': 'Invalid request body.'}, status=400)
+        return None, JsonResponse({'error': 'Invalid request body.'}, status=400)
 
     if not question:
-        return JsonResponse({'error': 'Please enter a question.'}, status=400)
+        return None, JsonResponse({'error': 'Please enter a question.'}, status=400)
+    return question, None
+
+
+def _busy_response(error):
+    response = JsonResponse({'error': str(error)}, status=429)
+    response['Retry-After'] = str(error.retry_after)
+    return response
+
+
+async def _status_payload(meeting_id, user_id):
+    """
+    Status for the polling/SSE endpoints as (payload, etag), or None if the
+    meeting doesn't exist or isn't the user's. While a meeting is processing
+    the answer comes from the progress store (no database query).
+    """
+    state = await progress_store.aget_state(meeting_id)
+    if state is not None:
+        if state['user_id'] != user_id:
+            return None
+        payload = {k: v for k, v in state.items() if k != 'user_id'}
+        return payload, f'"{meeting_id}-{state["run"]}-{state["version"]}"'
+
+    meeting = await (
+        Meeting.objects.filter(id=meeting_id, user_id=user_id)
+        .values('id', 'status', 'updated_at')
+        .afirst()
+    )
+    if meeting is None:
+        return None
+    payload = {
+        'meeting_id': meeting['id'],
+        'status': meeting['status'],
+        'updated_at': meeting['updated_at'].isoformat(),
+    }
+    return payload, f'"{meeting_id}-{meeting["status"]}-{meeting["updated_at"].timestamp()}"'
+
+
+def _etag_matches(request, etag):
+    # gzip_page weakens the ETag it sends ("W/..."), so compare weakly
+    known = request.headers.get('If-None-Match', '').split(',')
+    return etag in [tag.strip().removeprefix('W/') for tag in known]
+
+
+def _conditional_json(request, payload, etag):
+    """JSON response with an ETag; 304 when the client already has this version."""
+    if _etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(payload)
+    response['ETag'] = etag
+    # Always revalidate: the browser then sends If-None-Match on every poll
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
+
+@gzip_page
+@login_required(login_url='login')
+def meeting_transcript(request, meeting_id):
+    """
+    One page of a meeting's transcript as JSON, for the transcript tab.
+    `?start=` is a character offset (each page returns the next one) and
+    `?size=` the page size in characters.
+    """
+    meeting = get_object_or_404(Meeting.objects.only('id', 'updated_at'), id=meeting_id, user=request.user)
     try:
-        rag = get_rag_processor()
-        result = rag.ask_question(meeting.transcript, meeting.summary, question)
-        return JsonResponse(result)
-    except Exception as e:
-        return JsonResponse({'error': f'Error generating answer: {str(e)}'}, status=500)
+        start = max(0, int(request.GET.get('start', 0)))
+        size = transcripts.page_size(int(request.GET['size']) if request.GET.get('size') else None)
+    except ValueError:
+        return JsonResponse({'error': 'start and size must be integers.'}, status=400)
+    etag = f'"transcript-{meeting.id}-{meeting.updated_at.timestamp()}-{start}-{size}"'
+    if _etag_matches(request, etag):
+        return _conditional_json(request, None, etag)
+    return _conditional_json(request, transcripts.read_page(meeting.id, start, size), etag)
+
+
+@async_login_required
+async def meeting_status(request, meeting_id):
+    """
+    Processing status of a meeting (stage, chunk i/N, ETA while processing),
+    for conditional-GET polling from the detail page.
+    """
+    result = await _status_payload(meeting_id, request.user.id)
+    if result is None:
+        raise Http404('No Meeting matches the given query.')
+    return _conditional_json(request, *result)
+
+
+@async_login_required
+async def upload_progress(request, token):
+    """Progress of the meeting created by an in-flight upload, by the page's progress token."""
+    binding = await progress_store.ameeting_for_token(token)
+    result = None
+    if binding is not None and binding[1] == request.user.id:
+        result = await _status_payload(binding[0], request.user.id)
+    if result is None:
+        return JsonResponse({'status': 'pending'}, status=404)
+    return _conditional_json(request, *result)
+
+
+@async_login_required
+async def meeting_events(request, meeting_id):
+    """
+    Server-sent events stream of a meeting's progress (ASGI only: the
+    stream waits on an event loop instead of holding a worker thread).
+    Ends once the meeting is no longer processing; EventSource reconnects
+    after PROGRESS_STREAM_SECONDS.
+    """
+    if await _status_payload(meeting_id, request.user.id) is None:
+        raise Http404('No Meeting matches the given query.')
+    interval = getattr(settings, 'PROGRESS_POLL_SECONDS', 1.0)
+    lifetime = getattr(settings, 'PROGRESS_STREAM_SECONDS', 300)
+    user_id = request.user.id
+
+    async def stream():
+        last_etag = None
+        idle = 0.0
+        deadline = time.monotonic() + lifetime
+        while time.monotonic() < deadline:
+            result = await _status_payload(meeting_id, user_id)
+            if result is None:
+                return
+            payload, etag = result
+            if etag != last_etag:
+                last_etag = etag
+                idle = 0.0
+                yield f"id: {etag.strip(chr(34))}\nevent: progress\ndata: {json.dumps(payload)}\n\n"
+                if payload['status'] != 'processing':
+                    return
+            elif idle >= 15:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(interval)
+            idle += interval
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def _aiter_pieces(pieces):
+    # Under ASGI a sync iterator would be read to the end before sending;
+    # pull one piece at a time on the sync thread (where its cursor lives)
+    next_piece = sync_to_async(lambda: next(pieces, None))
+    while (piece := await next_piece()) is not None:
+        yield piece
+
+
+@login_required(login_url='login')
+def export_meetings(request):
+    """
+    Download all of the user's meetings and tasks, streamed as they are read.
+    `?format=` is jsonl (default), csv or md; `?transcript=1` adds transcripts.
+    """
+    fmt = request.GET.get('format', 'jsonl')
+    if fmt not in export.FORMATS:
+        return JsonResponse({'error': f"format must be one of {', '.join(export.FORMATS)}."}, status=400)
+    include_transcript = request.GET.get('transcript', '').lower() in ('1', 'true', 'yes')
+
+    pieces = export.export(fmt, request.user, include_transcript)
+    content_type, extension = export.FORMATS[fmt]
+    response = StreamingHttpResponse(
+        _aiter_pieces(pieces) if settings.ASYNC_VIEWS else pieces,
+        content_type=f'{content_type}; charset=utf-8',
+    )
+    filename = f"meetings-{time.strftime('%Y-%m-%d')}.{extension}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required(login_url='login')
+def search(request):
+    """Full-text search over the user's meetings and tasks."""
+    query = request.GET.get('q', '').strip()
+    results = search_index.search(request.user, query) if query else {'meetings': [], 'tasks': []}
+    return render(request, 'core/search.html', {
+        'query': query,
+        'meeting_hits': results['meetings'],
+        'task_hits': results['tasks'],
+    })
+
+
+@staff_member_required
+def llm_metrics(request):
+    """Queue depth, in-flight requests and latency of the Groq gateway (this process)."""
+    if _rag_processor is None:
+        return JsonResponse({'initialized': False})
+    metrics = {'initialized': True, **_rag_processor.gateway.metrics()}
+    async_gateways = list(_rag_processor._async_gateways.values())
+    if async_gateways:
+        metrics['async'] = [gateway.metrics() for gateway in async_gateways]
+    return JsonResponse(metrics)
 
 
 @login_required(login_url='login')
@@ -0,0 +1,13 @@
+# gunicorn settings, picked up automatically by `gunicorn meeting_summarizer.wsgi`.
+import os
+
+# PRELOAD_AI_MODULES=true loads the app (and the AI dependencies, see
+# core.startup) once in the master; workers then share those pages instead
+# of each importing NumPy/scikit-learn/Groq on their first request.
+preload_app = os.environ.get('PRELOAD_AI_MODULES', 'false').lower() == 'true'
+
+# ASGI profile: `ASYNC_VIEWS=true gunicorn meeting_summarizer.asgi:application`.
+# Uvicorn workers run the async views on an event loop, so one process can
+# keep hundreds of Q&A requests waiting on Groq without a thread each.
+if os.environ.get('ASYNC_VIEWS', 'false').lower() == 'true':
+    worker_class = 'uvicorn.workers.UvicornWorker'
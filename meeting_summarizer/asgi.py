@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meeting_summarizer.settings')
 
 application = get_asgi_application()
+
+# Same optional preloading as wsgi.py (see core.startup)
+from django.conf import settings  # noqa: E402
+
+if settings.PRELOAD_AI_MODULES:
+    from core.startup import preload
+    preload()
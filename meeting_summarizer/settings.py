@@ -11,8 +11,10 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+from importlib.util import find_spec
 import os
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -49,7 +51,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.WhiteNoiseMiddleware',  # async-capable WhiteNoise (see core/middleware.py)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -128,18 +130,53 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    # /api/v1/... (core/api.py); a new version gets its own entry here
+    'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.URLPathVersioning',
+    'DEFAULT_VERSION': 'v1',
+    'ALLOWED_VERSIONS': ('v1',),
 }
 
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Media files (User uploads like audio files)  
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Storage for uploads and stored embeddings. Code only uses storage names and the
+# storage API (core/storage.py), never paths under MEDIA_ROOT:
+#   local  - MEDIA_ROOT on this node (default)
+#   object - core.storage.LocalObjectStorage, an S3-style stand-in without local paths
+#   s3     - django-storages' S3 backend (in requirements.txt); any S3-compatible
+#            service via AWS_S3_ENDPOINT_URL, credentials from AWS_* variables
+FILE_STORAGE = os.environ.get('FILE_STORAGE', 'local')
+FILE_STORAGE_BACKENDS = {
+    'local': 'django.core.files.storage.FileSystemStorage',
+    'object': 'core.storage.LocalObjectStorage',
+    's3': 'storages.backends.s3.S3Storage',
+}
+if FILE_STORAGE not in FILE_STORAGE_BACKENDS:
+    raise ImproperlyConfigured(f"FILE_STORAGE must be one of {', '.join(FILE_STORAGE_BACKENDS)}, not {FILE_STORAGE!r}.")
+if FILE_STORAGE == 's3' and not (find_spec('storages') and find_spec('boto3')):
+    raise ImproperlyConfigured('FILE_STORAGE=s3 needs django-storages with boto3: pip install "django-storages[s3]"')
+STORAGES = {
+    'default': {'BACKEND': FILE_STORAGE_BACKENDS[FILE_STORAGE]},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+if FILE_STORAGE == 's3':
+    AWS_STORAGE_BUCKET_NAME = os.environ.get('AWS_STORAGE_BUCKET_NAME', '')
+    AWS_S3_ENDPOINT_URL = os.environ.get('AWS_S3_ENDPOINT_URL') or None
+    AWS_S3_REGION_NAME = os.environ.get('AWS_S3_REGION_NAME') or None
+
+# Hash uploads while they stream in so duplicate recordings are detected (core/uploads.py)
+FILE_UPLOAD_HANDLERS = [
+    'core.uploads.HashingUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
 # Use DATABASE_URL if provided (e.g. PostgreSQL on Render), else fallback to SQLite
 if os.environ.get('DATABASE_URL'):
     DATABASES['default'] = dj_database_url.config(
@@ -147,5 +184,118 @@ if os.environ.get('DATABASE_URL'):
         conn_max_age=600
     )
 
+# Cache shared by all workers: progress events, rate-limit buckets and rendered
+# page fragments. REDIS_URL (e.g. redis://localhost:6379/0, or any Redis-compatible
+# server) selects Django's Redis backend; without it each process has its own
+# local-memory cache, which is only correct with a single worker.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'meetingly',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'meetingly',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+# Lifetime of cached meeting-page fragments; they are keyed on Meeting.updated_at,
+# which task writes bump too, so edits never show stale content
+FRAGMENT_CACHE_SECONDS = int(os.environ.get('FRAGMENT_CACHE_SECONDS', str(24 * 60 * 60)))
+
+# Characters per page of the transcript tab (loaded on demand as JSON)
+TRANSCRIPT_PAGE_CHARS = int(os.environ.get('TRANSCRIPT_PAGE_CHARS', '20000'))
+
 # Groq API Key for RAG Q&A feature
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY', '')
+
+# Groq gateway limits (per worker process, see core/llm_gateway.py)
+GROQ_MAX_CONCURRENCY = int(os.environ.get('GROQ_MAX_CONCURRENCY', '4'))
+GROQ_TIMEOUT = float(os.environ.get('GROQ_TIMEOUT', '30'))
+GROQ_MAX_RETRIES = int(os.environ.get('GROQ_MAX_RETRIES', '3'))
+GROQ_MAX_QUEUE = int(os.environ.get('GROQ_MAX_QUEUE', '50'))
+GROQ_QUEUE_TIMEOUT = float(os.environ.get('GROQ_QUEUE_TIMEOUT', '20'))
+
+# Rate limits on the expensive endpoints (token buckets in the default cache, see
+# core/ratelimit.py), as "<cost units>/<second|minute|hour|day>". Requests cost
+# 1 unit plus a share for large inputs. Each endpoint has a per-user bucket and
+# a global bucket shared by everyone; an empty value disables that bucket.
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+RATE_LIMITS = {
+    'upload': {
+        'user': os.environ.get('RATE_LIMIT_UPLOAD_USER', '40/hour'),
+        'global': os.environ.get('RATE_LIMIT_UPLOAD_GLOBAL', '400/hour'),
+    },
+    'process_text': {
+        'user': os.environ.get('RATE_LIMIT_TEXT_USER', '30/hour'),
+        'global': os.environ.get('RATE_LIMIT_TEXT_GLOBAL', '300/hour'),
+    },
+    'reprocess': {
+        'user': os.environ.get('RATE_LIMIT_REPROCESS_USER', '20/hour'),
+        'global': os.environ.get('RATE_LIMIT_REPROCESS_GLOBAL', '200/hour'),
+    },
+    'ask': {
+        'user': os.environ.get('RATE_LIMIT_ASK_USER', '30/minute'),
+        'global': os.environ.get('RATE_LIMIT_ASK_GLOBAL', '300/minute'),
+    },
+}
+# Share of each global bucket that users who already spent over half of their own
+# bucket can't use, so light users still get through while heavy users drain it
+RATE_LIMIT_GLOBAL_RESERVE = float(os.environ.get('RATE_LIMIT_GLOBAL_RESERVE', '0.2'))
+
+# Audio preprocessing before Whisper upload (see core/audio_processing.py)
+# Codec for the 16 kHz mono upload: 'opus' (smallest), 'flac' (lossless) or 'wav'
+AUDIO_TARGET_CODEC = os.environ.get('AUDIO_TARGET_CODEC', 'opus')
+
+# Strip silence/non-speech locally before transcription (voice-activity detection)
+AUDIO_VAD_ENABLED = os.environ.get('AUDIO_VAD', 'true').lower() == 'true'
+
+# Retention of processed recordings (manage.py apply_audio_retention, see core/retention.py).
+# Days after upload before a completed meeting's audio is transcoded to low-bitrate
+# mono Opus, and before it is deleted; 0 turns a step off. Transcripts, summaries
+# and tasks are always kept.
+AUDIO_ARCHIVE_AFTER_DAYS = int(os.environ.get('AUDIO_ARCHIVE_AFTER_DAYS', '0'))
+AUDIO_DELETE_AFTER_DAYS = int(os.environ.get('AUDIO_DELETE_AFTER_DAYS', '0'))
+AUDIO_ARCHIVE_BITRATE = os.environ.get('AUDIO_ARCHIVE_BITRATE', '16k')
+
+# Summarization: 'hybrid' (local extractive pre-pass + BART), 'abstractive'
+# (BART only) or 'extractive' (fully offline, no API calls)
+SUMMARY_MODE = os.environ.get('SUMMARY_MODE', 'hybrid')
+# Fraction of words the extractive pre-pass keeps for long transcripts
+SUMMARY_EXTRACTIVE_RATIO = float(os.environ.get('SUMMARY_EXTRACTIVE_RATIO', '0.3'))
+
+# RAG context assembly: retrieved chunks considered, and the token budget they're packed into
+RAG_CANDIDATE_CHUNKS = int(os.environ.get('RAG_CANDIDATE_CHUNKS', '6'))
+RAG_CONTEXT_TOKENS = int(os.environ.get('RAG_CONTEXT_TOKENS', '900'))
+
+# Retriever: 'hybrid' (BM25 + char n-gram TF-IDF), 'hybrid-dense' (hybrid + local LSA embeddings),
+# 'dense', 'bm25' or 'tfidf'; RAG_RERANK adds a local reranking pass
+RAG_RETRIEVER = os.environ.get('RAG_RETRIEVER', 'hybrid')
+RAG_RERANK = os.environ.get('RAG_RERANK', 'true').lower() == 'true'
+# Dimensions of the dense (LSA) embeddings stored per meeting
+RAG_EMBEDDING_DIM = int(os.environ.get('RAG_EMBEDDING_DIM', '128'))
+# Answer the common Q&A questions (topics, owners, decisions, deadlines, risks) in one
+# batched Groq call after processing, and serve them without a live LLM call
+RAG_INSIGHTS = os.environ.get('RAG_INSIGHTS', 'true').lower() == 'true'
+RAG_INSIGHTS_CONTEXT_TOKENS = int(os.environ.get('RAG_INSIGHTS_CONTEXT_TOKENS', '6000'))
+
+# Serve I/O-bound endpoints (Q&A) with async views; turn on when running under ASGI
+# (`gunicorn meeting_summarizer.asgi:application`, see gunicorn.conf.py)
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'false').lower() == 'true'
+
+# Processing progress (core.progress): SSE stream poll interval and lifetime
+# before the browser reconnects; progress is shared through the default cache
+PROGRESS_POLL_SECONDS = float(os.environ.get('PROGRESS_POLL_SECONDS', '1.0'))
+PROGRESS_STREAM_SECONDS = int(os.environ.get('PROGRESS_STREAM_SECONDS', '300'))
+
+# Import NumPy/scikit-learn/Groq at WSGI load (use with `gunicorn --preload` so
+# workers share them); otherwise they load on first use in each worker
+PRELOAD_AI_MODULES = os.environ.get('PRELOAD_AI_MODULES', 'false').lower() == 'true'
+# Worker boot import-time budget enforced by core.tests and `manage.py profile_startup`
+STARTUP_IMPORT_BUDGET_MS = int(os.environ.get('STARTUP_IMPORT_BUDGET_MS', '1500'))
@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meeting_summarizer.settings')
 
 application = get_wsgi_application()
+
+# With `gunicorn --preload`, import the AI dependencies once in the master so
+# forked workers share them (see core.startup)
+from django.conf import settings  # noqa: E402
+
+if settings.PRELOAD_AI_MODULES:
+    from core.startup import preload
+    preload()